@@ -0,0 +1,7 @@
+# Benchmarks for the opencc_rs / opencc_jieba_rs wrappers.
+# Run from the repository root, e.g.: python -m benchmarks.bench_handles
+#
+# The full suite (JSON report across engines, configs and sizes):
+#     python -m benchmarks.suite -o report.json
+# Without the real native libraries, add --stub to build and use benchmarks/stub/opencc_capi_stub.c.
+# Any other script can use a stub or custom build via OPENCC_RS_LIBRARY / OPENCC_JIEBA_RS_LIBRARY.
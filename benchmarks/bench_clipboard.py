@@ -0,0 +1,86 @@
+import argparse
+import time
+
+import clipboard_backends
+from benchmarks.common import generate_corpus
+
+try:
+    import tkinter as tk
+except ImportError:
+    tk = None
+
+
+class TkPerCallClipboard:
+    """What the GUIs did before: a whole new Tk root for every get and set."""
+    name = "tk, new root per call"
+
+    def get_text(self):
+        root = tk.Tk()
+        root.withdraw()
+        try:
+            return root.clipboard_get()
+        except tk.TclError:
+            return ""
+        finally:
+            root.update()
+            root.destroy()
+
+    def set_text(self, text):
+        root = tk.Tk()
+        root.withdraw()
+        root.clipboard_clear()
+        root.clipboard_append(text)
+        root.update()
+        root.destroy()
+
+
+def timed(func, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Set and get latency per clipboard backend available here.")
+    parser.add_argument('-s', '--sizes-kb', default='1,1024,4096', help='Payload sizes in KiB, UTF-8')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Best of this many runs')
+    args = parser.parse_args()
+
+    root = None
+    backends = []
+    if tk is not None:
+        try:
+            root = tk.Tk()
+            root.withdraw()
+            backends.append(TkPerCallClipboard())
+        except tk.TclError as e:
+            print(f"Tk unavailable: {e}")
+    backends += clipboard_backends.available_backends(root)
+    if not backends:
+        print("No clipboard backend available (no display, clipboard tool or pyperclip)")
+        return
+    print(f"selected by get_clipboard(): {clipboard_backends.get_clipboard(root).name}")
+
+    for size in (int(s) for s in args.sizes_kb.split(',')):
+        text = generate_corpus(size * 1024)
+        print(f"{size:,} KiB")
+        for backend in backends:
+            try:
+                set_seconds, _ = timed(lambda: backend.set_text(text), args.repeat)
+                get_seconds, pasted = timed(backend.get_text, args.repeat)
+            except clipboard_backends.ClipboardError as e:
+                print(f"    {backend.name:<24} failed: {e}")
+                continue
+            print(f"    {backend.name:<24} set {set_seconds * 1000:9.2f} ms   get {get_seconds * 1000:9.2f} ms"
+                  f"{'' if pasted == text else '   MISMATCH'}")
+
+    if root is not None:
+        root.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import filecmp
+import importlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import generate_corpus, mib, peak_rss
+
+
+def read_whole(cc, source, target):
+    # What the CLI did before convert_file: decode to str, encode again inside convert(), encode the result
+    with io.open(source, encoding='utf-8') as f:
+        text = f.read()
+    with io.open(target, 'w', encoding='utf-8') as f:
+        f.write(cc.convert(text))
+
+
+def child(engine, mode, source, target):
+    # Runs one conversion in this process and reports its own wall time and peak RSS
+    cc = importlib.import_module(engine).OpenCC('s2t')
+    start = time.perf_counter()
+    if mode == 'read':
+        read_whole(cc, source, target)
+    else:
+        cc.convert_file(source, target)
+    print(json.dumps({'seconds': time.perf_counter() - start, 'peak_rss': peak_rss()}))
+
+
+def run_child(engine, mode, source, target):
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_convert_file', '--child', engine, mode,
+                             source, target], check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="convert_file (memory-mapped bytes) versus reading the whole "
+                                                 "file into a str, by wall time and peak RSS.")
+    parser.add_argument('-e', '--engine', choices=['opencc_rs', 'opencc_jieba_rs'], default='opencc_rs')
+    parser.add_argument('-s', '--size-mb', type=int, default=256, help='Size of the synthetic input in MB')
+    parser.add_argument('--child', nargs=4, metavar=('ENGINE', 'MODE', 'SOURCE', 'TARGET'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(*args.child)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'input.txt')
+        with open(source, 'w', encoding='utf-8') as f:
+            piece = generate_corpus(8 * 1024 * 1024)
+            for _ in range(max(1, args.size_mb // 8)):
+                f.write(piece)
+        size = os.path.getsize(source)
+        print(f"{args.engine}: {mib(size):,.0f} MiB input")
+
+        outputs = []
+        for label, mode in (('read()', 'read'), ('convert_file', 'mmap')):
+            outputs.append(os.path.join(tmp, f'output-{mode}.txt'))
+            stats = run_child(args.engine, mode, source, outputs[-1])
+            print(f"{label:<13} {stats['seconds']:7.2f} s   {mib(size) / stats['seconds']:7.1f} MiB/s   "
+                  f"peak RSS {mib(stats['peak_rss']):8.1f} MiB")
+
+        identical = filecmp.cmp(*outputs, shallow=False)
+        print("outputs identical" if identical else "OUTPUTS DIFFER")
+        return 0 if identical else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import argparse
+import importlib
+import time
+
+SHORT_TEXTS = ["汉语简体标题", "东门书店", "我们说汉语。", "Product 这个 123", "后来的学生们", "“简体”引号"]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="convert_many() versus a Python loop over convert().")
+    parser.add_argument('-e', '--engine', choices=['opencc_rs', 'opencc_jieba_rs'], default='opencc_rs')
+    parser.add_argument('-c', '--config', default='s2t')
+    parser.add_argument('-n', '--count', type=int, default=200000, help='Number of short strings')
+    parser.add_argument('-b', '--batch-sizes', default='100,1000,10000')
+    args = parser.parse_args()
+
+    module = importlib.import_module(args.engine)
+    texts = [SHORT_TEXTS[i % len(SHORT_TEXTS)] + str(i) for i in range(args.count)]
+
+    with module.OpenCC(args.config) as cc:
+        expected, loop_time = timed(lambda: [cc.convert(text) for text in texts])
+        print(f"{args.engine} ({args.config}), {args.count:,} strings")
+        print(f"{'loop over convert()':<28} {loop_time:8.3f} s   {args.count / loop_time:12,.0f} items/s")
+        for batch_size in (int(size) for size in args.batch_sizes.split(',')):
+            result, batch_time = timed(lambda: cc.convert_many(texts, batch_size=batch_size))
+            assert result == expected, "convert_many() output differs from convert()"
+            print(f"{'convert_many(batch=' + str(batch_size) + ')':<28} {batch_time:8.3f} s   "
+                  f"{args.count / batch_time:12,.0f} items/s   x{loop_time / batch_time:.1f}")
+
+
+if __name__ == '__main__':
+    main()
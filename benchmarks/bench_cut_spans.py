@@ -0,0 +1,54 @@
+import argparse
+import gc
+import time
+import tracemalloc
+
+from benchmarks.common import generate_corpus, mib
+from opencc_jieba_rs import OpenCC
+
+
+def measure(func):
+    """(result, seconds, bytes still allocated by the result, peak bytes allocated during the call)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="jieba_cut (list of str) versus jieba_cut_spans (offset array).")
+    parser.add_argument('-s', '--sizes-mb', default='1,10')
+    args = parser.parse_args()
+
+    with OpenCC() as cc:
+        for size in (float(s) for s in args.sizes_mb.split(',')):
+            text = generate_corpus(int(size * 1024 * 1024))
+            # Timed separately, since tracemalloc slows down allocation-heavy code
+            timings = {}
+            for label, func in (('jieba_cut', lambda: cc.jieba_cut(text)),
+                                ('jieba_cut_spans', lambda: cc.jieba_cut_spans(text))):
+                start = time.perf_counter()
+                func()
+                timings[label] = time.perf_counter() - start
+
+            tokens, _, list_retained, list_peak = measure(lambda: cc.jieba_cut(text))
+            del tokens
+            spans, _, span_retained, span_peak = measure(lambda: cc.jieba_cut_spans(text))
+            print(f"{mib(len(text.encode('utf-8'))):6.1f} MiB, {len(spans):,} tokens")
+            print(f"    jieba_cut        {timings['jieba_cut'] * 1000:9.1f} ms   "
+                  f"retained {mib(list_retained):8.1f} MiB   peak {mib(list_peak):8.1f} MiB")
+            print(f"    jieba_cut_spans  {timings['jieba_cut_spans'] * 1000:9.1f} ms   "
+                  f"retained {mib(span_retained):8.1f} MiB   peak {mib(span_peak):8.1f} MiB")
+
+            start = time.perf_counter()
+            same = list(spans) == cc.jieba_cut(text)
+            print(f"    materialising all spans + compare {(time.perf_counter() - start) * 1000:9.1f} ms"
+                  f"{'' if same else '   MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
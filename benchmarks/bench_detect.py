@@ -0,0 +1,57 @@
+import argparse
+import re
+import time
+
+from benchmarks.common import generate_corpus, mib
+from opencc_rs import OpenCC
+
+HANT_SAMPLE = "時間會說明一切，國語與漢語的關係很長。東門的書店後來發了很多學生的書！\n"
+
+
+def legacy_check_text_code(text):
+    # The previous zho_helper.check_text_code: full-text regex pass plus two fresh converters per call
+    if not text:
+        return 0
+    strip_text = re.sub(r'[\WA-Za-z0-9_]', "", text)
+    test_text = strip_text if len(strip_text) < 30 else strip_text[0:30]
+    if test_text != OpenCC("t2s").convert(test_text):
+        return 1
+    if test_text != OpenCC("s2t").convert(test_text):
+        return 2
+    return 0
+
+
+def timed(func, text, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="zho_helper.detect_script versus the old check_text_code.")
+    parser.add_argument('-s', '--sizes-mb', default='1,10,50')
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    import zho_helper
+    start = time.perf_counter()
+    zho_helper.detect_script("汉")
+    print(f"one-off table build: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for size in (float(s) for s in args.sizes_mb.split(',')):
+        for label, sample in (('Hans', None), ('Hant', HANT_SAMPLE)):
+            text = generate_corpus(int(size * 1024 * 1024), *([sample] if sample else []))
+            # Push the script-specific part to the end, after a long ASCII preamble, for the worst case too
+            for layout, doc in (('leading', text), ('trailing', 'plain ascii line\n' * 20000 + text[:4096])):
+                old, old_time = timed(legacy_check_text_code, doc, args.repeat)
+                (new, confidence), new_time = timed(zho_helper.detect_script, doc, args.repeat)
+                print(f"{mib(len(doc.encode('utf-8'))):7.1f} MiB {label} {layout:<9} legacy {old_time * 1000:9.2f} ms "
+                      f"-> {old}   detect_script {new_time * 1000:7.3f} ms -> {new} ({confidence:.2f})"
+                      f"{'' if old == new else '   MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
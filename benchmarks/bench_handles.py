@@ -0,0 +1,88 @@
+import argparse
+import importlib
+import statistics
+import threading
+import time
+
+SAMPLE = "这个软件里有一个“简体中文”的句子，我们说汉语。"
+NATIVE_NAMES = {
+    'opencc_rs': ('opencc_new', 'opencc_free', 'opencc_convert'),
+    'opencc_jieba_rs': ('opencc_jieba_new', 'opencc_jieba_free', 'opencc_jieba_convert'),
+}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def report(label, samples):
+    print(f"{label:<28} mean {statistics.mean(samples) * 1e6:9.1f} us   "
+          f"p50 {percentile(samples, 50) * 1e6:9.1f} us   p99 {percentile(samples, 99) * 1e6:9.1f} us")
+
+
+def bench_per_call_handle(module, config, calls):
+    # The old behaviour: create and free a native instance around every conversion
+    cc = module.OpenCC(config)
+    new, free, convert = (getattr(cc.lib, name) for name in NATIVE_NAMES[module.__name__])
+    data, config_bytes = SAMPLE.encode('utf-8'), config.encode('utf-8')
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        opencc = new()
+        result = convert(opencc, data, config_bytes, False)
+        if result:
+            # Decoded and freed as OpenCC.convert does, so only the handle lifetime differs between the runs
+            cc._take_string(result)
+        free(opencc)
+        samples.append(time.perf_counter() - start)
+    cc.close()
+    return samples
+
+
+def bench_persistent_handle(module, config, calls):
+    samples = []
+    with module.OpenCC(config) as cc:
+        for _ in range(calls):
+            start = time.perf_counter()
+            cc.convert(SAMPLE)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_pool(module, config, calls, threads):
+    cc = module.OpenCC(config, pool_size=threads)
+
+    def worker():
+        for _ in range(calls // threads):
+            cc.convert(SAMPLE)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    cc.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call latency with and without persistent native handles.")
+    parser.add_argument('-e', '--engine', choices=['opencc_rs', 'opencc_jieba_rs'], default='opencc_rs')
+    parser.add_argument('-c', '--config', default='s2t')
+    parser.add_argument('-n', '--calls', type=int, default=2000)
+    parser.add_argument('-t', '--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    module = importlib.import_module(args.engine)
+    print(f"{args.engine} ({args.config}), {args.calls} calls of {len(SAMPLE)} chars")
+    report("new/free per call", bench_per_call_handle(module, args.config, args.calls))
+    report("persistent handle", bench_persistent_handle(module, args.config, args.calls))
+    elapsed = bench_pool(module, args.config, args.calls, args.threads)
+    print(f"{'pool, ' + str(args.threads) + ' threads':<28} {args.calls / elapsed:,.0f} calls/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import statistics
+import subprocess
+import sys
+
+TARGETS = ['opencc_rs', 'opencc_jieba_rs', 'opencc_rs.__main__', 'opencc_jieba_rs.__main__', 'zho_helper', 'main',
+           'main_window']
+
+FIRST_USE = """
+import time
+start = time.perf_counter()
+from {engine} import OpenCC
+imported = time.perf_counter()
+cc = OpenCC('s2t')
+created = time.perf_counter()
+cc.convert('汉语')
+converted = time.perf_counter()
+for _ in range(100):
+    OpenCC('t2s')
+repeated = time.perf_counter()
+print(imported - start, created - imported, converted - created, (repeated - converted) / 100)
+"""
+
+
+def import_time(module):
+    """Cumulative import time of `module` in microseconds, from a fresh `python -X importtime`."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        return None
+    for line in reversed(result.stderr.splitlines()):
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1])
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and first-use cost of the wrappers, CLIs and Tk apps.")
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print("python -X importtime, cumulative (median of runs)")
+    for module in TARGETS:
+        samples = [import_time(module) for _ in range(args.repeat)]
+        if None in samples:
+            print(f"  {module:<26} import failed (missing dependency?)")
+            continue
+        print(f"  {module:<26} {statistics.median(samples) / 1000:8.1f} ms")
+
+    print("first use")
+    for engine in ('opencc_rs', 'opencc_jieba_rs'):
+        result = subprocess.run([sys.executable, '-c', FIRST_USE.format(engine=engine)],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        if result.returncode != 0:
+            print(f"  {engine:<26} failed (native library missing?)")
+            continue
+        imported, created, converted, repeated = (float(v) * 1000 for v in result.stdout.split())
+        print(f"  {engine:<26} import {imported:6.2f} ms   OpenCC() {created:6.3f} ms   "
+              f"first convert {converted:6.2f} ms   further OpenCC() {repeated:6.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
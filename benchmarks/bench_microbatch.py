@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import SAMPLE_TEXT
+
+
+def short_texts(count, chars):
+    sentences = [s for s in SAMPLE_TEXT.replace('\n', '。').split('。') if s]
+    return [(sentences[i % len(sentences)] * (chars // 8 + 1))[:chars] for i in range(count)]
+
+
+def run_threads(convert, texts, threads):
+    # `threads` callers, each converting its share of `texts` one request at a time
+    def caller(share):
+        latencies = []
+        for text in share:
+            start = time.perf_counter()
+            convert(text)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return [latency for result in executor.map(caller, [texts[i::threads] for i in range(threads)])
+                for latency in result]
+
+
+async def run_tasks(convert_async, texts, tasks):
+    async def caller(share):
+        latencies = []
+        for text in share:
+            start = time.perf_counter()
+            await convert_async(text)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    results = await asyncio.gather(*(caller(texts[i::tasks]) for i in range(tasks)))
+    return [latency for result in results for latency in result]
+
+
+def report(label, latencies, elapsed, batcher=None):
+    latencies.sort()
+    per_batch = f"   {batcher.items / max(1, batcher.batches):6.1f} items/call" if batcher is not None else ''
+    print(f"    {label:<22} {len(latencies) / elapsed:9.0f} req/s   p50 {latencies[len(latencies) // 2] * 1000:7.3f} ms"
+          f"   p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.3f} ms{per_batch}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and latency of many concurrent short conversions, "
+                                                 "one native call each versus MicroBatcher across batch windows.")
+    parser.add_argument('-e', '--engine', choices=['opencc_rs', 'opencc_jieba_rs'], default='opencc_rs')
+    parser.add_argument('-n', '--requests', type=int, default=20000)
+    parser.add_argument('-t', '--threads', type=int, default=32, help='Concurrent callers')
+    parser.add_argument('--chars', type=int, default=24, help='Characters per request')
+    parser.add_argument('--windows-ms', default='0.2,0.5,1,2,5')
+    parser.add_argument('--max-items', type=int, default=256)
+    parser.add_argument('-w', '--workers', type=int, default=2, help='MicroBatcher worker threads')
+    args = parser.parse_args()
+
+    engine = importlib.import_module(args.engine)
+    microbatch = importlib.import_module(args.engine + '.microbatch')
+    texts = short_texts(args.requests, args.chars)
+    windows = [float(w) for w in args.windows_ms.split(',')]
+
+    print(f"{args.engine}: {args.requests} requests of {args.chars} chars, {args.threads} concurrent callers")
+    for mode in ('threads', 'asyncio'):
+        print(f"  {mode}")
+        with engine.OpenCC('s2t', pool_size=args.threads) as cc:
+            # Baseline: every caller makes its own native call
+            start = time.perf_counter()
+            if mode == 'threads':
+                latencies = run_threads(cc.convert, texts, args.threads)
+            else:
+                async_cc = engine.AsyncOpenCC('s2t', max_workers=args.threads)
+                latencies = asyncio.run(run_tasks(async_cc.convert, texts, args.threads))
+                async_cc.close()
+            report('direct', latencies, time.perf_counter() - start)
+
+        # Fixed windows, then eager dispatch with the largest window as the upper bound
+        for window, eager in [(window, False) for window in windows] + [(windows[-1], True)]:
+            with microbatch.MicroBatcher(args.max_items, window / 1000, args.workers, eager) as batcher:
+                start = time.perf_counter()
+                if mode == 'threads':
+                    latencies = run_threads(batcher.convert, texts, args.threads)
+                else:
+                    latencies = asyncio.run(run_tasks(batcher.convert_async, texts, args.threads))
+                label = f"{'eager' if eager else 'window'}, {window:g} ms"
+                report(label, latencies, time.perf_counter() - start, batcher)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+import argparse
+import importlib
+import os
+import time
+
+from benchmarks.common import generate_corpus, mib
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling of OpenCC.convert(text, workers=N) over thread counts.")
+    parser.add_argument('-e', '--engine', choices=['opencc_rs', 'opencc_jieba_rs'], default='opencc_rs')
+    parser.add_argument('-c', '--config', default='s2t')
+    parser.add_argument('-s', '--size-mb', type=int, default=32)
+    parser.add_argument('-t', '--max-threads', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    module = importlib.import_module(args.engine)
+    text = generate_corpus(args.size_mb * 1024 * 1024)
+    size = mib(len(text.encode('utf-8')))
+
+    with module.OpenCC(args.config) as cc:
+        expected = cc.convert(text)
+        baseline = None
+        print(f"{args.engine} ({args.config}), {size:,.0f} MiB")
+        for workers in range(1, args.max_threads + 1):
+            best = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = cc.convert(text, workers=workers)
+                best = min(best, time.perf_counter() - start)
+            assert result == expected, f"output with {workers} workers differs from the serial path"
+            baseline = baseline or best
+            print(f"workers {workers:2d}: {best:7.3f} s   {size / best:8.1f} MiB/s   speedup x{baseline / best:.2f}")
+
+
+if __name__ == '__main__':
+    main()
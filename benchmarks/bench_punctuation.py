@@ -0,0 +1,64 @@
+import argparse
+import re
+import time
+
+from benchmarks.common import generate_corpus, mib
+from opencc_rs import OpenCC
+
+QUOTE_SAMPLE = "他说：“今天的‘会议’取消了。”她回答：「知道了，『明天』再说。」\n"
+
+
+def legacy_convert_punctuation(input_text, config):
+    # The previous zho_helper.convert_punctuation: regex alternation rebuilt on every call
+    s2t_punctuation_chars = {
+        '“': '「',
+        '”': '」',
+        '‘': '『',
+        '’': '』'
+    }
+    if config[0] == "s":
+        mapping = s2t_punctuation_chars
+    else:
+        mapping = {v: k for k, v in s2t_punctuation_chars.items()}
+    pattern = f"[{''.join(map(re.escape, mapping.keys()))}]"
+    return re.sub(pattern, lambda m: mapping[m.group()], input_text)
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Punctuation: regex substitution versus the compiled replace chain, "
+                                                 "alone and fused into chunked conversion.")
+    parser.add_argument('-s', '--sizes-mb', default='1,8,32')
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    import zho_helper
+    converter = OpenCC("s2t")
+
+    for size in (float(s) for s in args.sizes_mb.split(',')):
+        text = generate_corpus(int(size * 1024 * 1024), QUOTE_SAMPLE)
+        size_mb = mib(len(text.encode('utf-8')))
+        for config in ("s2t", "t2s"):
+            old, old_time = best_of(lambda: legacy_convert_punctuation(text, config), args.repeat)
+            new, new_time = best_of(lambda: zho_helper.convert_punctuation(text, config), args.repeat)
+            print(f"{size_mb:7.1f} MiB {config} regex {old_time * 1000:8.1f} ms   compiled {new_time * 1000:8.1f} ms"
+                  f"   {old_time / new_time:5.1f}x{'' if old == new else '   MISMATCH'}")
+
+        two_pass, two_time = best_of(lambda: zho_helper.convert_punctuation(converter.convert(text), "s2t"),
+                                     args.repeat)
+        fused, fused_time = best_of(lambda: "".join(zho_helper.iter_convert(converter, text, "s2t")), args.repeat)
+        print(f"{size_mb:7.1f} MiB convert+punct  two passes {two_time * 1000:8.1f} ms   "
+              f"fused {fused_time * 1000:8.1f} ms{'' if two_pass == fused else '   MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.common import generate_corpus, mib
+from opencc_rs import OpenCC
+from opencc_rs import pure_opencc
+from opencc_rs.opencc_rs import native_available
+from opencc_rs.pure_opencc import PureOpenCC
+
+
+def load_times(config):
+    """(seconds to build the tables from the .txt dictionaries, seconds to load them from the marshal cache)"""
+    with tempfile.TemporaryDirectory() as cache:
+        previous = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = cache
+        try:
+            timings = []
+            for _ in range(2):
+                pure_opencc._tables.clear()
+                start = time.perf_counter()
+                PureOpenCC(config)._load()
+                timings.append(time.perf_counter() - start)
+        finally:
+            if previous is None:
+                del os.environ['XDG_CACHE_HOME']
+            else:
+                os.environ['XDG_CACHE_HOME'] = previous
+    return timings
+
+
+def parity(expected, actual):
+    """(identical lines, total lines, first differing line pair or None)"""
+    expected_lines, actual_lines = expected.splitlines(), actual.splitlines()
+    same = sum(a == b for a, b in zip(expected_lines, actual_lines))
+    first = next(((a, b) for a, b in zip(expected_lines, actual_lines) if a != b), None)
+    if first is None and len(expected_lines) != len(actual_lines):
+        first = (f"{len(expected_lines)} lines", f"{len(actual_lines)} lines")
+    return same, max(len(expected_lines), len(actual_lines)), first
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pure-Python engine: dictionary load time, throughput, and output "
+                                                 "parity with the native library when it is available.")
+    parser.add_argument('-c', '--configs', default='s2t,t2s,s2twp,tw2sp')
+    parser.add_argument('-s', '--size-mb', type=float, default=4)
+    parser.add_argument('-i', '--input', metavar='<file>', help='UTF-8 text to convert instead of the generated one')
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = generate_corpus(int(args.size_mb * 1024 * 1024))
+    native = native_available()
+    print(f"{mib(len(text.encode('utf-8'))):.1f} MiB input; dictionaries from "
+          f"{', '.join(sorted({path for path, _, _ in pure_opencc._dict_sources('STCharacters')}))}; "
+          f"native library {'available' if native else 'not available'}")
+
+    failed = False
+    for config in args.configs.split(','):
+        try:
+            build, cached = load_times(config)
+        except FileNotFoundError as e:
+            print(f"{config:<6} skipped: {e}")
+            continue
+        pure = PureOpenCC(config)
+        start = time.perf_counter()
+        output = pure.convert(text)
+        seconds = time.perf_counter() - start
+        line = (f"{config:<6} build {build * 1000:7.1f} ms   cached load {cached * 1000:6.1f} ms   "
+                f"pure {mib(len(text.encode('utf-8'))) / seconds:6.2f} MiB/s")
+        if native:
+            cc = OpenCC(config)
+            start = time.perf_counter()
+            expected = cc.convert(text)
+            native_seconds = time.perf_counter() - start
+            same, total, first = parity(expected, output)
+            line += (f"   native {mib(len(text.encode('utf-8'))) / native_seconds:7.2f} MiB/s   "
+                     f"parity {same}/{total} lines")
+            if first is not None:
+                failed = True
+                line += f"\n       native: {first[0][:60]!r}\n       pure:   {first[1][:60]!r}"
+        print(line)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import http.client
+import importlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import SAMPLE_TEXT
+
+
+def start_server(engine, workers):
+    """Run the engine's ConversionServer on a free localhost port in a background thread; returns the server."""
+    server_module = importlib.import_module(engine + '.server')
+    started = threading.Event()
+    holder = {}
+
+    def on_start(server):
+        holder['server'] = server
+        started.set()
+
+    thread = threading.Thread(target=asyncio.run, args=(server_module.serve('127.0.0.1', 0, workers,
+                                                                            on_start=on_start),), daemon=True)
+    thread.start()
+    started.wait()
+    return holder['server']
+
+
+def client(port, requests, body, keep_alive):
+    # One client thread: `requests` POSTs to /convert, over one connection or a new one for each
+    latencies = []
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    headers = {'Content-Type': 'application/json'} if keep_alive else {'Connection': 'close'}
+    for _ in range(requests):
+        start = time.perf_counter()
+        connection.request('POST', '/convert', body, headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+        latencies.append(time.perf_counter() - start)
+        if not keep_alive:
+            connection.close()
+    connection.close()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests per second and latency of the HTTP service on "
+                                                 "localhost, with and without keep-alive.")
+    parser.add_argument('-e', '--engine', choices=['opencc_rs', 'opencc_jieba_rs'], default='opencc_rs')
+    parser.add_argument('-w', '--workers', type=int, default=4)
+    parser.add_argument('-c', '--clients', type=int, default=8)
+    parser.add_argument('-n', '--requests', type=int, default=500, help='Requests per client')
+    parser.add_argument('--chars', type=int, default=200, help='Characters of text per request')
+    args = parser.parse_args()
+
+    server = start_server(args.engine, args.workers)
+    text = (SAMPLE_TEXT * (args.chars // len(SAMPLE_TEXT) + 1))[:args.chars]
+    body = json.dumps({'text': text, 'config': 's2t'}).encode('utf-8')
+    print(f"{args.engine}: {args.workers} workers, {args.clients} clients x {args.requests} requests "
+          f"of {args.chars} chars")
+
+    for label, keep_alive in (('keep-alive', True), ('new connection', False)):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as executor:
+            results = executor.map(client, [server.port] * args.clients, [args.requests] * args.clients,
+                                   [body] * args.clients, [keep_alive] * args.clients)
+            latencies = sorted(latency for result in results for latency in result)
+        elapsed = time.perf_counter() - start
+        print(f"    {label:<15} {len(latencies) / elapsed:9.0f} req/s   "
+              f"p50 {latencies[len(latencies) // 2] * 1000:6.2f} ms   "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
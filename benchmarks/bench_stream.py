@@ -0,0 +1,64 @@
+import argparse
+import filecmp
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import generate_corpus, mib, peak_rss
+
+
+def child(engine, cli_args):
+    # Runs one CLI conversion in this process and reports its own wall time and peak RSS
+    cli = importlib.import_module(engine + '.__main__')
+    start = time.perf_counter()
+    cli.main(cli_args)
+    print(json.dumps({'seconds': time.perf_counter() - start, 'peak_rss': peak_rss()}))
+
+
+def run_cli(engine, cli_args):
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_stream', '--child', engine, '--', *cli_args],
+                            check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of the CLI with --stream and without, where file to "
+                                                 "file UTF-8 conversion goes through the memory-mapped convert_file.")
+    parser.add_argument('-e', '--engine', choices=['opencc_rs', 'opencc_jieba_rs'], default='opencc_rs')
+    parser.add_argument('-s', '--size-mb', type=int, default=256, help='Size of the synthetic input in MB')
+    parser.add_argument('--chunk-size', type=int, default=1 << 20)
+    parser.add_argument('--child', metavar='ENGINE', help=argparse.SUPPRESS)
+    parser.add_argument('cli_args', nargs='*', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.child, args.cli_args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'input.txt')
+        with open(source, 'w', encoding='utf-8') as f:
+            # Write in pieces so the generator itself does not need the whole corpus in memory
+            piece = generate_corpus(8 * 1024 * 1024)
+            for _ in range(max(1, args.size_mb // 8)):
+                f.write(piece)
+        size = os.path.getsize(source)
+        print(f"{args.engine}: {mib(size):,.0f} MiB input")
+
+        outputs = {}
+        for label, extra in (('--stream', ['--stream', '--chunk-size', str(args.chunk_size)]), ('convert_file', [])):
+            outputs[label] = os.path.join(tmp, f'output-{len(outputs)}.txt')
+            stats = run_cli(args.engine, ['-i', source, '-o', outputs[label], '-c', 's2t', *extra])
+            print(f"{label:<12} {stats['seconds']:7.2f} s   {mib(size) / stats['seconds']:7.1f} MiB/s   "
+                  f"peak RSS {mib(stats['peak_rss']):8.1f} MiB")
+
+        identical = filecmp.cmp(*outputs.values(), shallow=False)
+        print("outputs identical" if identical else "OUTPUTS DIFFER")
+        return 0 if identical else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import argparse
+import io
+import time
+
+from benchmarks.common import mib
+from opencc_rs import OpenCC
+from opencc_rs.subtitles import DEFAULT_BATCH_SIZE, convert_subtitles, iter_convert_subtitles
+
+LINES = ("这个软件里有一个简体中文的句子。", "东门的书店后来发了很多学生的书！", "<i>我们说汉语</i>")
+ASS_HEADER = ("[Script Info]\nTitle: 简体字幕\n\n[V4+ Styles]\nStyle: 简体,微软雅黑,20\n\n[Events]\n"
+              "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n")
+
+
+def timestamp(seconds, separator):
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}{separator}000"
+
+
+def generate(fmt, size_bytes):
+    """A subtitle file of about `size_bytes` in format `fmt`, two dialogue lines per cue."""
+    out = io.StringIO()
+    if fmt == 'vtt':
+        out.write("WEBVTT\n\n")
+    elif fmt == 'ass':
+        out.write(ASS_HEADER)
+    elif fmt == 'ttml':
+        out.write('<?xml version="1.0"?>\n<tt><head><metadata><ttm:title>简体</ttm:title></metadata></head>\n'
+                  '<body><div>\n')
+    cue = 0
+    while out.tell() < size_bytes // 2:  # mostly 3-byte characters, so about half as many chars as bytes
+        first, second = LINES[cue % 3], LINES[(cue + 1) % 3]
+        if fmt == 'srt':
+            out.write(f"{cue + 1}\n{timestamp(cue, ',')} --> {timestamp(cue + 1, ',')}\n{first}\n{second}\n\n")
+        elif fmt == 'vtt':
+            out.write(f"{timestamp(cue, '.')} --> {timestamp(cue + 1, '.')} align:start\n{first}\n{second}\n\n")
+        elif fmt == 'ass':
+            out.write(f"Dialogue: 0,{timestamp(cue, '.')[1:-1]},{timestamp(cue + 1, '.')[1:-1]},简体,,0,0,0,,"
+                      f"{{\\fn微软雅黑}}{first}\\N{second}\n")
+        else:
+            out.write(f'<p begin="{cue}s" end="{cue + 1}s">{first}<br/>{second}</p>\n')
+        cue += 1
+    if fmt == 'ttml':
+        out.write('</div></body></tt>\n')
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dialogue-only subtitle conversion versus converting the whole "
+                                                 "file as plain text, on generated subtitle archives.")
+    parser.add_argument('-s', '--size-mb', type=float, default=32)
+    parser.add_argument('-f', '--formats', default='srt,vtt,ass,ttml')
+    parser.add_argument('-b', '--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    cc = OpenCC('s2t')
+    for fmt in args.formats.split(','):
+        text = generate(fmt, int(args.size_mb * 1024 * 1024))
+        size = mib(len(text.encode('utf-8')))
+
+        start = time.perf_counter()
+        cc.convert(text)
+        plain = time.perf_counter() - start
+
+        start = time.perf_counter()
+        aware = ''.join(iter_convert_subtitles(cc, io.StringIO(text, newline=''), fmt, batch_size=args.batch_size))
+        subtitle = time.perf_counter() - start
+
+        # Everything but the dialogue must come back byte for byte
+        untouched = all(src == out for src, out in zip(text.splitlines(), aware.splitlines())
+                        if '-->' in src or src.startswith(('[', 'Format:', 'Style:', '<?xml')))
+        same = aware == convert_subtitles(cc, text, fmt)
+        print(f"{fmt:<5} {size:7.1f} MiB   plain {plain * 1000:8.1f} ms ({size / plain:6.1f} MB/s)   "
+              f"subtitle-aware {subtitle * 1000:8.1f} ms ({size / subtitle:6.1f} MB/s)"
+              f"{'' if untouched and same else '   MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
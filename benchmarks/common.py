@@ -0,0 +1,47 @@
+import os
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+SAMPLE_TEXT = ("这个软件里有一个“简体中文”的句子，我们说汉语。东门的书店后来发了很多学生的书！\n"
+               "時間會說明一切，國語與漢語的關係很長。\n")
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None when it cannot be read."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None when it cannot be read."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == 'darwin' else peak * 1024
+    if psutil is not None:
+        return getattr(psutil.Process().memory_info(), 'peak_wset', None)
+    return None
+
+
+def generate_corpus(size_bytes, sample=SAMPLE_TEXT):
+    """Repeat the sample text until it is at least `size_bytes` long in UTF-8."""
+    unit = len(sample.encode('utf-8'))
+    return sample * max(1, -(-size_bytes // unit))
+
+
+def mib(n):
+    return n / (1024 * 1024)
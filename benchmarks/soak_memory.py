@@ -0,0 +1,48 @@
+import argparse
+import importlib
+import sys
+
+from benchmarks.common import current_rss, generate_corpus, mib
+
+
+def run(engine, rounds, size_mb, tolerance_mb):
+    module = importlib.import_module(engine)
+    text = generate_corpus(size_mb * 1024 * 1024)
+    cc = module.OpenCC("s2t")
+
+    def work():
+        cc.convert(text, True)
+        if engine == 'opencc_jieba_rs':
+            cc.jieba_cut_and_join(text[:65536])
+            cc.jieba_cut(text[:65536])
+            cc.jieba_keyword_extract_tfidf(text[:65536])
+
+    # Warm up so allocator pools and the native instance are in place before measuring
+    work()
+    baseline = current_rss()
+    if baseline is None:
+        print("Cannot read RSS on this platform.", file=sys.stderr)
+        return 2
+
+    for i in range(1, rounds + 1):
+        work()
+        print(f"round {i:3d}: rss {mib(current_rss()):8.1f} MiB")
+
+    growth = mib(current_rss() - baseline)
+    converted = mib(len(text.encode('utf-8')) * rounds)
+    print(f"{engine}: converted {converted:,.0f} MiB, RSS growth {growth:+.1f} MiB (tolerance {tolerance_mb} MiB)")
+    return 0 if growth <= tolerance_mb else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert many MB repeatedly and check that RSS stays flat.")
+    parser.add_argument('-e', '--engine', choices=['opencc_rs', 'opencc_jieba_rs'], default='opencc_rs')
+    parser.add_argument('-r', '--rounds', type=int, default=50)
+    parser.add_argument('-s', '--size-mb', type=int, default=8, help='Input size per round in MB')
+    parser.add_argument('--tolerance-mb', type=float, default=16.0, help='Allowed RSS growth in MB')
+    args = parser.parse_args()
+    return run(args.engine, args.rounds, args.size_mb, args.tolerance_mb)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+STUB_SOURCE = os.path.join(os.path.dirname(__file__), 'opencc_capi_stub.c')
+STUB_ENV_VARS = ('OPENCC_RS_LIBRARY', 'OPENCC_JIEBA_RS_LIBRARY')
+
+
+def build_stub(out_dir):
+    """Compile the stub C API into `out_dir` with $CC (default cc) and return the library path."""
+    if sys.platform == 'win32':
+        raise OSError("Building the stub library is not supported on Windows")
+    suffix = '.dylib' if sys.platform == 'darwin' else '.so'
+    path = os.path.join(out_dir, 'libopencc_capi_stub' + suffix)
+    compiler = os.environ.get('CC', 'cc')
+    subprocess.run([compiler, '-O2', '-shared', '-fPIC', '-o', path, STUB_SOURCE], check=True)
+    return path
+
+
+def use_stub(out_dir):
+    """Build the stub and point both wrappers at it for this process and its children."""
+    path = build_stub(out_dir)
+    for var in STUB_ENV_VARS:
+        os.environ[var] = path
+    return path
@@ -0,0 +1,227 @@
+/*
+ * Minimal stand-in for opencc_fmmseg_capi and opencc_jieba_capi.
+ *
+ * Exposes both C APIs with the same signatures as the real Rust libraries so
+ * the Python wrappers and benchmarks can run on machines without them.  The
+ * conversion is a tiny character table, and segmentation groups CJK characters
+ * in pairs; output is only meant to exercise the FFI paths, not to be correct.
+ *
+ * Build:  cc -O2 -shared -fPIC -o libopencc_stub.so opencc_capi_stub.c
+ */
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+static const char *PAIRS[][2] = {
+    {"汉", "漢"}, {"语", "語"}, {"简", "簡"}, {"体", "體"}, {"国", "國"},
+    {"这", "這"}, {"说", "說"}, {"门", "門"}, {"时", "時"}, {"们", "們"},
+    {"来", "來"}, {"个", "個"}, {"会", "會"}, {"为", "為"}, {"发", "發"},
+    {"后", "後"}, {"学", "學"}, {"长", "長"}, {"东", "東"}, {"书", "書"},
+};
+static const char *PUNCT[][2] = {
+    {"“", "「"}, {"”", "」"}, {"‘", "『"}, {"’", "』"},
+};
+#define NPAIRS (sizeof(PAIRS) / sizeof(PAIRS[0]))
+#define NPUNCT (sizeof(PUNCT) / sizeof(PUNCT[0]))
+
+static int utf8_len(unsigned char c) {
+    if (c < 0x80) return 1;
+    if ((c & 0xE0) == 0xC0) return 2;
+    if ((c & 0xF0) == 0xE0) return 3;
+    return 4;
+}
+
+static const char *lookup(const char *p, int n, const char *table[][2], size_t size, int from) {
+    for (size_t i = 0; i < size; i++) {
+        if ((int)strlen(table[i][from]) == n && memcmp(p, table[i][from], n) == 0) return table[i][1 - from];
+    }
+    return NULL;
+}
+
+static char *stub_convert(const char *input, const char *config, bool punctuation) {
+    if (input == NULL) return NULL;
+    int from = (config != NULL && config[0] == 's') ? 0 : 1;
+    size_t len = strlen(input);
+    char *out = malloc(len + 1);
+    size_t o = 0;
+    for (size_t i = 0; i < len;) {
+        int n = utf8_len((unsigned char)input[i]);
+        const char *rep = lookup(input + i, n, PAIRS, NPAIRS, from);
+        if (rep == NULL && punctuation) rep = lookup(input + i, n, PUNCT, NPUNCT, from);
+        if (rep != NULL && (int)strlen(rep) == n) {
+            memcpy(out + o, rep, n);
+        } else {
+            memcpy(out + o, input + i, n);
+        }
+        o += n;
+        i += n;
+    }
+    out[o] = '\0';
+    return out;
+}
+
+static int stub_zho_check(const char *input) {
+    if (input == NULL) return 0;
+    size_t len = strlen(input);
+    for (size_t i = 0; i < len;) {
+        int n = utf8_len((unsigned char)input[i]);
+        if (lookup(input + i, n, PAIRS, NPAIRS, 1) != NULL) return 1;
+        if (lookup(input + i, n, PAIRS, NPAIRS, 0) != NULL) return 2;
+        i += n;
+    }
+    return 0;
+}
+
+static char *dup_range(const char *p, size_t n) {
+    char *s = malloc(n + 1);
+    memcpy(s, p, n);
+    s[n] = '\0';
+    return s;
+}
+
+/* Tokens: ASCII runs stay whole, other characters are paired up. */
+static char **stub_cut(const char *input, size_t *count) {
+    size_t len = strlen(input), cap = 16, n = 0;
+    char **tokens = malloc(cap * sizeof(char *));
+    for (size_t i = 0; i < len;) {
+        size_t j = i;
+        if ((unsigned char)input[i] < 0x80) {
+            while (j < len && (unsigned char)input[j] < 0x80) j++;
+        } else {
+            for (int k = 0; k < 2 && j < len && (unsigned char)input[j] >= 0x80; k++) {
+                j += utf8_len((unsigned char)input[j]);
+            }
+        }
+        if (n + 1 >= cap) {
+            cap *= 2;
+            tokens = realloc(tokens, cap * sizeof(char *));
+        }
+        tokens[n++] = dup_range(input + i, j - i);
+        i = j;
+    }
+    tokens[n] = NULL;
+    if (count != NULL) *count = n;
+    return tokens;
+}
+
+/* ---- opencc_fmmseg_capi ---- */
+
+void *opencc_new(void) { return malloc(64); }
+void opencc_free(const void *instance) { free((void *)instance); }
+char *opencc_convert(const void *instance, const char *input, const char *config, bool punctuation) {
+    (void)instance;
+    return stub_convert(input, config, punctuation);
+}
+int opencc_zho_check(const void *instance, const char *input) {
+    (void)instance;
+    return stub_zho_check(input);
+}
+void opencc_string_free(const char *ptr) { free((void *)ptr); }
+bool opencc_get_parallel(const void *instance) { (void)instance; return false; }
+void opencc_set_parallel(const void *instance, bool parallel) { (void)instance; (void)parallel; }
+const char *opencc_last_error(void) { return NULL; }
+
+/* ---- opencc_jieba_capi ---- */
+
+void *opencc_jieba_new(void) { return malloc(64); }
+void opencc_jieba_free(const void *instance) { free((void *)instance); }
+char *opencc_jieba_convert(const void *instance, const char *input, const char *config, bool punctuation) {
+    (void)instance;
+    return stub_convert(input, config, punctuation);
+}
+int opencc_jieba_zho_check(const void *instance, const char *input) {
+    (void)instance;
+    return stub_zho_check(input);
+}
+void opencc_jieba_free_string(const char *ptr) { free((void *)ptr); }
+
+char **opencc_jieba_cut(const void *instance, const char *input, bool hmm) {
+    (void)instance;
+    (void)hmm;
+    if (input == NULL) return NULL;
+    return stub_cut(input, NULL);
+}
+
+void opencc_jieba_free_string_array(char **array) {
+    if (array == NULL) return;
+    for (size_t i = 0; array[i] != NULL; i++) free(array[i]);
+    free(array);
+}
+
+char *opencc_jieba_join_str(char **strings, const char *delimiter) {
+    if (strings == NULL) return NULL;
+    size_t dlen = delimiter ? strlen(delimiter) : 0, total = 1;
+    for (size_t i = 0; strings[i] != NULL; i++) total += strlen(strings[i]) + dlen;
+    char *out = malloc(total), *p = out;
+    for (size_t i = 0; strings[i] != NULL; i++) {
+        if (i > 0 && dlen) {
+            memcpy(p, delimiter, dlen);
+            p += dlen;
+        }
+        size_t n = strlen(strings[i]);
+        memcpy(p, strings[i], n);
+        p += n;
+    }
+    *p = '\0';
+    return out;
+}
+
+char *opencc_jieba_cut_and_join(const void *instance, const char *input, bool hmm, const char *delimiter) {
+    char **tokens = opencc_jieba_cut(instance, input, hmm);
+    char *joined = opencc_jieba_join_str(tokens, delimiter);
+    opencc_jieba_free_string_array(tokens);
+    return joined;
+}
+
+/* Keywords: the first top_k distinct multi-byte tokens, in order. */
+static size_t stub_keywords(const char *input, size_t top_k, char ***out) {
+    size_t count = 0, n = 0;
+    char **tokens = stub_cut(input, &count);
+    char **keywords = malloc((top_k + 1) * sizeof(char *));
+    for (size_t i = 0; i < count; i++) {
+        bool seen = (unsigned char)tokens[i][0] < 0x80;
+        for (size_t k = 0; k < n && !seen; k++) seen = strcmp(keywords[k], tokens[i]) == 0;
+        if (!seen && n < top_k) {
+            keywords[n++] = tokens[i];
+        } else {
+            free(tokens[i]);
+        }
+    }
+    free(tokens);
+    keywords[n] = NULL;
+    *out = keywords;
+    return n;
+}
+
+char **opencc_jieba_keywords(const void *instance, const char *input, int top_k, const char *method) {
+    (void)instance;
+    (void)method;
+    if (input == NULL || top_k < 0) return NULL;
+    char **keywords;
+    stub_keywords(input, (size_t)top_k, &keywords);
+    return keywords;
+}
+
+int32_t opencc_jieba_keywords_and_weights(const void *instance, const char *input, size_t top_k,
+                                          const char *method, size_t *out_len, char ***out_keywords,
+                                          double **out_weights) {
+    (void)instance;
+    (void)method;
+    if (input == NULL || out_len == NULL || out_keywords == NULL || out_weights == NULL) return -1;
+    size_t n = stub_keywords(input, top_k, out_keywords);
+    double *weights = malloc((n ? n : 1) * sizeof(double));
+    for (size_t i = 0; i < n; i++) weights[i] = 1.0 / (double)(i + 1);
+    *out_len = n;
+    *out_weights = weights;
+    return 0;
+}
+
+void opencc_jieba_free_keywords_and_weights(char **keywords, double *weights, size_t len) {
+    if (keywords != NULL) {
+        for (size_t i = 0; i < len; i++) free(keywords[i]);
+        free(keywords);
+    }
+    free(weights);
+}
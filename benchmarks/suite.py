@@ -0,0 +1,153 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import generate_corpus, peak_rss
+from benchmarks.stub import use_stub
+
+ENGINES = ('opencc_rs', 'opencc_jieba_rs')
+DEFAULT_SIZES = '1K,10K,100K,1M,10M,100M'
+# Per case, keep calling until this many bytes were processed (bounded by --max-calls)
+TARGET_BYTES = 16 * 1024 * 1024
+UNITS = {'K': 1024, 'M': 1024 * 1024, 'G': 1024 * 1024 * 1024}
+
+
+def parse_size(text):
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def measure(func, size_bytes, min_calls, max_calls):
+    calls = max(min_calls, min(max_calls, TARGET_BYTES // max(1, size_bytes)))
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    median = statistics.median(samples)
+    return {
+        'calls': calls,
+        'mb_per_s': size_bytes / (1024 * 1024) / median if median else None,
+        'latency_ms': {
+            'mean': statistics.mean(samples) * 1000,
+            'p50': percentile(samples, 50) * 1000,
+            'p90': percentile(samples, 90) * 1000,
+            'p99': percentile(samples, 99) * 1000,
+            'max': samples[-1] * 1000,
+        },
+    }
+
+
+def run_child(engine, size_bytes, configs, punctuations, jieba, min_calls, max_calls):
+    """Benchmark one engine at one input size in this process; returns a list of result records."""
+    module = importlib.import_module(engine)
+    text = generate_corpus(size_bytes)
+    text = text.encode('utf-8')[:size_bytes].decode('utf-8', 'ignore')
+    actual = len(text.encode('utf-8'))
+    records = []
+
+    with module.OpenCC() as cc:
+        for config in configs:
+            cc.config = config
+            for punctuation in punctuations:
+                record = {'engine': engine, 'operation': 'convert', 'config': config, 'punctuation': punctuation,
+                          'size_bytes': actual}
+                record.update(measure(lambda: cc.convert(text, punctuation), actual, min_calls, max_calls))
+                records.append(record)
+        if jieba and hasattr(cc, 'jieba_cut'):
+            operations = {
+                'jieba_cut': lambda: cc.jieba_cut(text),
+                'keywords_tfidf': lambda: cc.jieba_keyword_extract_tfidf(text),
+                'keywords_textrank': lambda: cc.jieba_keyword_extract_textrank(text),
+            }
+            for operation, func in operations.items():
+                record = {'engine': engine, 'operation': operation, 'size_bytes': actual}
+                record.update(measure(func, actual, min_calls, max_calls))
+                records.append(record)
+
+    # Peak RSS covers every case of this engine and size, since each pair runs in its own process
+    rss = peak_rss()
+    for record in records:
+        record['peak_rss_bytes'] = rss
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput, latency and memory of both engines across configs "
+                                                 "and input sizes, reported as JSON.")
+    parser.add_argument('-e', '--engines', default=','.join(ENGINES), help='Comma-separated engines')
+    parser.add_argument('-c', '--configs', default=None, help='Comma-separated configs (default: all)')
+    parser.add_argument('-s', '--sizes', default=DEFAULT_SIZES, help='Comma-separated input sizes, e.g. 1K,10M')
+    parser.add_argument('--punct', choices=['both', 'on', 'off'], default='both')
+    parser.add_argument('--no-jieba', action='store_true', help='Skip jieba_cut and keyword extraction')
+    parser.add_argument('--min-calls', type=int, default=3)
+    parser.add_argument('--max-calls', type=int, default=1000)
+    parser.add_argument('--stub', action='store_true',
+                        help='Build and use the stub C library instead of the real native libraries')
+    parser.add_argument('-o', '--output', metavar='<file>', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--child', nargs=2, metavar=('ENGINE', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    punctuations = {'both': [False, True], 'on': [True], 'off': [False]}[args.punct]
+
+    if args.child:
+        engine, size = args.child
+        configs = args.configs.split(',') if args.configs else None
+        if configs is None:
+            configs = list(dict.fromkeys(importlib.import_module(engine + '.' + engine).CONFIG_LIST))
+        records = run_child(engine, int(size), configs, punctuations, not args.no_jieba, args.min_calls,
+                            args.max_calls)
+        print(json.dumps(records))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stub_path = use_stub(tmp) if args.stub else None
+        results = []
+        for engine in args.engines.split(','):
+            for size in (parse_size(s) for s in args.sizes.split(',')):
+                print(f"{engine} {size:,} bytes ...", file=sys.stderr)
+                command = [sys.executable, '-m', 'benchmarks.suite', '--child', engine, str(size),
+                           '--punct', args.punct, '--min-calls', str(args.min_calls),
+                           '--max-calls', str(args.max_calls)]
+                if args.configs:
+                    command += ['--configs', args.configs]
+                if args.no_jieba:
+                    command.append('--no-jieba')
+                child = subprocess.run(command, stdout=subprocess.PIPE, text=True)
+                if child.returncode != 0:
+                    results.append({'engine': engine, 'size_bytes': size, 'error': f"exit {child.returncode}"})
+                    continue
+                results.extend(json.loads(child.stdout))
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'stub': stub_path is not None,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
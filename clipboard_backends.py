@@ -0,0 +1,266 @@
+import atexit
+import os
+import shutil
+import subprocess
+import sys
+import threading
+
+# Seconds to wait for a clipboard tool, e.g. when the selection owner does not answer
+COMMAND_TIMEOUT = 5
+
+
+class ClipboardError(RuntimeError):
+    pass
+
+
+class ClipboardBackend:
+    name = None
+
+    def get_text(self):
+        raise NotImplementedError
+
+    def set_text(self, text):
+        raise NotImplementedError
+
+    def change_count(self):
+        """A number that changes with the clipboard contents, or None if only reading the contents tells."""
+        return None
+
+    def close(self):
+        pass
+
+
+class TkClipboard(ClipboardBackend):
+    """The clipboard through an existing Tk root, in process; Tk answers other applications from its event loop."""
+    name = "tk"
+
+    def __init__(self, root):
+        import tkinter
+        self.root = root
+        self._error = tkinter.TclError
+
+    def get_text(self):
+        try:
+            return self.root.clipboard_get()
+        except self._error:
+            # Raised for an empty clipboard as well as for a non-text one
+            return ""
+
+    def set_text(self, text):
+        self.root.clipboard_clear()
+        self.root.clipboard_append(text)
+
+
+class CommandClipboard(ClipboardBackend):
+    """
+    The clipboard through command line tools such as xclip, with the text piped as UTF-8 bytes in one go rather
+    than through a text-mode wrapper, and a timeout instead of hanging on an unresponsive selection owner.
+    With a watch command, one long-running process that prints a line per clipboard change gives change_count,
+    so checking an unchanged clipboard starts no process.
+    """
+
+    def __init__(self, name, get_command, set_command, watch_command=None):
+        self.name = name
+        self.get_command = get_command
+        self.set_command = set_command
+        self.watch_command = watch_command
+        self._watcher = None
+        self._changes = 0
+
+    def change_count(self):
+        if self.watch_command is None:
+            return None
+        if self._watcher is None:
+            try:
+                self._watcher = subprocess.Popen(self.watch_command, stdin=subprocess.DEVNULL,
+                                                 stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            except OSError:
+                self.watch_command = None
+                return None
+            atexit.register(self.close)
+            threading.Thread(target=self._count_changes, args=(self._watcher.stdout,), daemon=True).start()
+        if self._watcher.poll() is not None:
+            # E.g. the compositor went away; from now on only reading the contents tells
+            self.watch_command = None
+            return None
+        return self._changes
+
+    def _count_changes(self, lines):
+        for _ in lines:
+            self._changes += 1
+
+    def close(self):
+        if self._watcher is not None and self._watcher.poll() is None:
+            self._watcher.terminate()
+            self._watcher.wait()
+
+    def get_text(self):
+        try:
+            result = subprocess.run(self.get_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    timeout=COMMAND_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise ClipboardError(f"{self.name}: {e}") from e
+        if result.returncode != 0:
+            # xclip and wl-paste fail on an empty clipboard too
+            return ""
+        return result.stdout.decode("utf-8", errors="replace")
+
+    def set_text(self, text):
+        data = text.encode("utf-8")
+        try:
+            # xclip and xsel fork a child that keeps serving the selection with the same stdout and stderr, so
+            # capturing either would block until another application takes the clipboard over
+            with subprocess.Popen(self.set_command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL) as process:
+                process.communicate(data, timeout=COMMAND_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise ClipboardError(f"{self.name}: {e}") from e
+        if process.returncode != 0:
+            raise ClipboardError(f"{self.name}: exited with status {process.returncode}")
+
+
+class PasteboardClipboard(CommandClipboard):
+    """pbpaste and pbcopy, with the change count read from NSPasteboard in process through the Objective-C runtime."""
+
+    def __init__(self, name, get_command, set_command, watch_command=None):
+        import ctypes
+        import ctypes.util
+        super().__init__(name, get_command, set_command, watch_command)
+        objc = ctypes.cdll.LoadLibrary(ctypes.util.find_library("objc"))
+        ctypes.cdll.LoadLibrary(ctypes.util.find_library("AppKit"))
+        objc.objc_getClass.restype = ctypes.c_void_p
+        objc.objc_getClass.argtypes = [ctypes.c_char_p]
+        objc.sel_registerName.restype = ctypes.c_void_p
+        objc.sel_registerName.argtypes = [ctypes.c_char_p]
+        # objc_msgSend must be called with the exact signature of each method: (receiver, selector) -> id or NSInteger
+        send_object = ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p)(("objc_msgSend", objc))
+        self._send_integer = ctypes.CFUNCTYPE(ctypes.c_long, ctypes.c_void_p, ctypes.c_void_p)(("objc_msgSend", objc))
+        self._pasteboard = send_object(objc.objc_getClass(b"NSPasteboard"), objc.sel_registerName(b"generalPasteboard"))
+        if not self._pasteboard:
+            raise OSError("NSPasteboard is not available")
+        self._change_count = objc.sel_registerName(b"changeCount")
+
+    def change_count(self):
+        # Incremented by macOS on every clipboard change
+        return self._send_integer(self._pasteboard, self._change_count)
+
+
+class WindowsClipboard(ClipboardBackend):
+    """The Win32 clipboard API through ctypes (clipboard_win), in process."""
+    name = "win32"
+
+    def __init__(self):
+        import clipboard_win
+        self._clipboard = clipboard_win
+
+    def change_count(self):
+        # Incremented by Windows on every clipboard change, without opening the clipboard
+        return self._clipboard.GetClipboardSequenceNumber()
+
+    def get_text(self):
+        try:
+            return self._clipboard.get_clipboard_text()
+        except RuntimeError as e:
+            raise ClipboardError(f"{self.name}: {e}") from e
+
+    def set_text(self, text):
+        try:
+            if not self._clipboard.set_clipboard_text(text):
+                raise ClipboardError(f"{self.name}: failed to set clipboard data")
+        except RuntimeError as e:
+            raise ClipboardError(f"{self.name}: {e}") from e
+
+
+class PyperclipClipboard(ClipboardBackend):
+    name = "pyperclip"
+
+    def __init__(self):
+        import pyperclip
+        self._pyperclip = pyperclip
+
+    def get_text(self):
+        try:
+            return self._pyperclip.paste()
+        except self._pyperclip.PyperclipException as e:
+            raise ClipboardError(f"{self.name}: {e}") from e
+
+    def set_text(self, text):
+        try:
+            self._pyperclip.copy(text)
+        except self._pyperclip.PyperclipException as e:
+            raise ClipboardError(f"{self.name}: {e}") from e
+
+
+# Command line tools by preference: (name, environment variable that must be set, get command, set command, command
+# that keeps running and prints a line per clipboard change or None). xclip and xsel have no such mode.
+CLIPBOARD_COMMANDS = (
+    ("wl-clipboard", "WAYLAND_DISPLAY", ["wl-paste", "--no-newline"], ["wl-copy"],
+     # wl-paste runs the command with the new contents on stdin, which it must read before wl-paste goes on
+     ["wl-paste", "--watch", "sh", "-c", "cat >/dev/null; echo"]),
+    ("xclip", "DISPLAY", ["xclip", "-selection", "clipboard", "-o"], ["xclip", "-selection", "clipboard"], None),
+    ("xsel", "DISPLAY", ["xsel", "--clipboard", "--output"], ["xsel", "--clipboard", "--input"], None),
+    ("pbcopy", None, ["pbpaste"], ["pbcopy"], None),
+)
+
+
+def available_backends(root=None):
+    """Usable clipboard backends, fastest first: in-process ones, then command line tools, then pyperclip."""
+    backends = []
+    if sys.platform == "win32":
+        try:
+            backends.append(WindowsClipboard())
+        except (ImportError, OSError):
+            pass
+    if root is not None:
+        backends.append(TkClipboard(root))
+    for name, variable, get_command, set_command, watch_command in CLIPBOARD_COMMANDS:
+        if (variable is None or os.environ.get(variable)) and shutil.which(get_command[0]) \
+                and shutil.which(set_command[0]):
+            if sys.platform == "darwin" and name == "pbcopy":
+                try:
+                    backends.append(PasteboardClipboard(name, get_command, set_command, watch_command))
+                    continue
+                except (AttributeError, OSError):
+                    pass
+            backends.append(CommandClipboard(name, get_command, set_command, watch_command))
+    try:
+        backends.append(PyperclipClipboard())
+    except ImportError:
+        pass
+    return backends
+
+
+_selected = {}
+_selected_lock = threading.Lock()
+
+
+def get_clipboard(root=None):
+    """The fastest available backend, selected once per Tk root (or once without one) and then reused."""
+    key = id(root) if root is not None else None
+    with _selected_lock:
+        backend = _selected.get(key)
+        if backend is None:
+            backends = available_backends(root)
+            if not backends:
+                raise ClipboardError("No clipboard backend available; install xclip, xsel or wl-clipboard")
+            backend = _selected[key] = backends[0]
+    return backend
+
+
+def get_clipboard_text(root=None):
+    """Clipboard text, or "" if the clipboard cannot be read."""
+    try:
+        return get_clipboard(root).get_text()
+    except ClipboardError as e:
+        print(f"Error pasting from clipboard: {e}")
+        return ""
+
+
+def set_clipboard_text(text, root=None):
+    """Put `text` on the clipboard; returns whether it worked."""
+    try:
+        get_clipboard(root).set_text(text)
+        return True
+    except ClipboardError as e:
+        print(f"Error copying to clipboard: {e}")
+        return False
@@ -31,6 +31,10 @@ GetClipboardData = user32.GetClipboardData
 GetClipboardData.argtypes = [wintypes.UINT]
 GetClipboardData.restype = wintypes.HANDLE
 
+GetClipboardSequenceNumber = user32.GetClipboardSequenceNumber
+GetClipboardSequenceNumber.argtypes = []
+GetClipboardSequenceNumber.restype = wintypes.DWORD
+
 GlobalAlloc = kernel32.GlobalAlloc
 GlobalAlloc.argtypes = [wintypes.UINT, c_size_t]
 GlobalAlloc.restype = wintypes.HGLOBAL
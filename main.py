@@ -1,35 +1,56 @@
+import functools
 import os.path
 import tkinter as tk  # GUI
-from tkinter.filedialog import askopenfilename
+from tkinter.filedialog import askopenfilename, asksaveasfilename
 # import jieba  # Segmentor module
 # from clipboard_win import get_clipboard_text, set_clipboard_text
 # import pyperclip as pc  # Clipboard module
 # from opencc import OpenCC  # use module: pip install -u opencc-python-reimplemented
+from clipboard_backends import get_clipboard_text, set_clipboard_text
 from opencc_jieba_rs import OpenCC
 # from opencc_jieba_pyo3 import OpenCC
-from zho_helper import check_text_code, convert_punctuation
+from opencc_jieba_rs.subtitles import subtitle_format
+from zho_helper import (ConversionTask, LiveConverter, check_text_code, iter_convert_chunks,
+                        iter_convert_subtitle_chunks, iter_cut_chunks, iter_read_chunks, line_converter,
+                        line_segmenter)
+
+# How often the Tk thread picks up results of a background conversion; about one frame at 60 fps
+POLL_INTERVAL_MS = 16
+# Texts longer than this are kept off-widget and only this much of them is displayed
+PREVIEW_CHARS = 1 << 20
+# Characters inserted into a Text widget per event-loop iteration
+RENDER_CHUNK_CHARS = 1 << 16
+# Pause in typing before live mode converts the edited lines
+LIVE_DEBOUNCE_MS = 150
+# Conversion or file load running in the background, if any
+_task = None
+# Full text per Text widget while it is still being inserted, or for good when it is too long to display
+_buffers = {}
+# Pending incremental inserts per Text widget
+_render_jobs = {}
+# Subtitle format of the opened file, converted dialogue-only; None for plain text
+_source_format = None
+# Live mode: LiveConverter for the options in _live_key
+_live = None
+_live_key = None
+# The app's Tk root, shared with the clipboard instead of a throwaway root per paste or copy
+_root = None
+
+
+@functools.lru_cache(maxsize=None)
+def get_converter(config=None):
+    # One converter per config for the app's lifetime, so its native instance survives between clicks
+    return OpenCC(config)
 
 
 def clipboard_tk_get() -> str:
-    ttk = tk.Tk()
-    ttk.withdraw()
-    try:
-        clipboard_text = ttk.clipboard_get()
-    except tk.TclError:
-        clipboard_text = ''
-    ttk.update()
-    ttk.destroy()
-    return clipboard_text
+    # Backend chosen once for the app's root: the root itself unless a faster native one exists
+    return get_clipboard_text(_root)
 
 
 def clipboard_tk_set(text: str) -> None:
-    ttk = tk.Tk()
-    ttk.withdraw()
     if isinstance(text, str):
-        ttk.clipboard_clear()
-        ttk.clipboard_append(text)
-    ttk.update()
-    ttk.destroy()
+        set_clipboard_text(text, _root)
 
 
 # Use this tkinter clipboard module in case pyperclip not working in WSL
@@ -53,8 +74,10 @@ def clipboard_tk_get_set(text_to_paste=None):
 
 def paste_input(source_textbox, source_char_code_label, config_option, source_char_count_label, filename_label):
     # text = pc.paste()
+    global _source_format
     text = clipboard_tk_get()
     # text = get_clipboard_text()
+    _source_format = None
     update_textbox(text, source_textbox, source_char_code_label, config_option)
 
     source_char_count_label.config(text=f"( {len(text):,} Chars )")
@@ -62,13 +85,42 @@ def paste_input(source_textbox, source_char_code_label, config_option, source_ch
 
 
 def update_textbox(text, source_textbox, source_char_code_label, config_option):
-    source_textbox.delete("1.0", tk.END)
-    source_textbox.insert("1.0", text)
+    render_text(source_textbox, text)
 
     update_source_info(check_text_code(text),
                        source_char_code_label, config_option)
 
 
+def render_text(textbox, text):
+    """
+    Insert `text` into `textbox` a slice per event-loop iteration. Beyond PREVIEW_CHARS the widget only shows
+    a preview and the full text stays in _buffers.
+    """
+    if textbox in _render_jobs:
+        textbox.after_cancel(_render_jobs.pop(textbox))
+    _buffers[textbox] = text
+    textbox.config(state=tk.NORMAL)
+    textbox.delete("1.0", tk.END)
+    shown = min(len(text), PREVIEW_CHARS)
+
+    def insert_slice(start):
+        if start < shown:
+            textbox.insert(tk.END, text[start:min(start + RENDER_CHUNK_CHARS, shown)])
+            _render_jobs[textbox] = textbox.after(1, insert_slice, start + RENDER_CHUNK_CHARS)
+            return
+        _render_jobs.pop(textbox, None)
+        if shown == len(text):
+            # Fully displayed, so the widget is the text from now on, edits included
+            del _buffers[textbox]
+        else:
+            textbox.insert(tk.END, f"\n[... {len(text) - shown:,} more characters not shown; "
+                                   f"Convert, Copy and Save use the full text ...]")
+            # A partial preview must not be edited, since edits could not be applied to the full text
+            textbox.config(state=tk.DISABLED)
+
+    insert_slice(0)
+
+
 def update_source_info(text_code, source_char_code_label, config_option):
     if text_code == 1:
         source_char_code_label.config(text="zh-Hant (繁体)")
@@ -80,69 +132,180 @@ def update_source_info(text_code, source_char_code_label, config_option):
         source_char_code_label.config(text="Non-zh (其它)")
 
 
+def output_text(destination_textbox):
+    if destination_textbox in _buffers:
+        return _buffers[destination_textbox]
+    text = destination_textbox.get("1.0", 'end-1c')
+    # Convert results of the widget's text and live output end with a newline that is not part of the output; one
+    # converted from a text still being loaded does not, so exactly one is dropped, and only when it is there
+    return text[:-1] if text.endswith("\n") else text
+
+
 def copy_output(destination_textbox):
     # pc.copy(destination_textbox.get("1.0", 'end-2c'))
-    clipboard_tk_set(destination_textbox.get("1.0", 'end-2c'))
+    clipboard_tk_set(output_text(destination_textbox))
     # set_clipboard_text(destination_textbox.get("1.0", 'end-2c'))
 
 
-def open_file(source_textbox, source_char_code_label, config_option, source_char_count_label, filename_label):
+def save_output(destination_textbox):
+    filename = asksaveasfilename(initialdir="./", title="Save As", defaultextension=".txt", filetypes=(
+        ("Text Files", "*.txt"), ("All Files", "*.*")))
+
+    if not filename:
+        return
+
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(output_text(destination_textbox))
+
+
+def open_file(source_textbox, source_char_code_label, config_option, source_char_count_label, filename_label,
+              convert_button, openfile_button, cancel_button, progress_label):
     filename = askopenfilename(initialdir="./", title="Open File", filetypes=(
         ("Text Files", "*.txt"), ("Subtitle Files", "*.srt;*.vtt;*.ass;*.ttml2;*.xml"), ("All Files", "*.*")))
 
-    if not filename:
+    if not filename or _task is not None:
         return
 
-    with open(filename, "r", encoding="utf-8") as f:
-        contents = f.read()
+    def finish_open_file(contents):
+        global _source_format
+        _source_format = subtitle_format(filename)
+        update_textbox(contents, source_textbox, source_char_code_label, config_option)
 
-    update_textbox(contents, source_textbox, source_char_code_label, config_option)
+        source_char_count_label.config(text=f"( {len(contents):,} Chars )")
+        filename_label.config(text=os.path.basename(filename))
 
-    source_char_count_label.config(text=f"( {len(contents):,} Chars )")
-    filename_label.config(text=os.path.basename(filename))
+    # Read and decoded on a worker thread, so large files do not freeze the window
+    start_task(iter_read_chunks(filename), os.path.getsize(filename), "Loading", finish_open_file,
+               convert_button, openfile_button, cancel_button, progress_label)
+
+
+def selected_converter(config_option, region_config_option, zhtw_option, punctuation_option):
+    """(config, converter or segmentor, punctuation config or None) for the options currently selected."""
+    config = config_option.get()
+    if config == "jieba":
+        # segment_list = 'Feature disabled'
+        return config, get_converter(), None
+    region_config = region_config_option.get()
+    if region_config == "std":
+        converter = get_converter(config)
+        # print(converter.config)
+    elif region_config == "zhtw":
+        converter = get_converter(config.replace("t", "tw") +
+                                  "p" if zhtw_option.get() else config.replace("t", "tw"))
+        # print(converter.config)
+    elif region_config == "hk":
+        converter = get_converter(config.replace("t", "hk"))
+        # print(converter.config)
+    return config, converter, config if punctuation_option.get() else None
+
+
+def update_destination_info(config, source_char_code_label, destination_char_code_label):
+    if config != "jieba" and "Non-zh" not in source_char_code_label.cget("text"):
+        destination_char_code_label.config(
+            text="zh-Hant (繁体)" if config == "s2t" else "zh-Hans (简体)")
+    else:
+        destination_char_code_label.config(
+            text=source_char_code_label.cget("text"))
 
 
 def convert(source_textbox, config_option, region_config_option, zhtw_option, punctuation_option, destination_textbox,
-            source_char_code_label, destination_char_code_label):
-    output_text = ""
-    input_text = source_textbox.get("1.0", tk.END)
+            source_char_code_label, destination_char_code_label, convert_button, openfile_button, cancel_button,
+            progress_label):
+    if _task is not None:
+        return
+    input_text = _buffers.get(source_textbox) or source_textbox.get("1.0", tk.END)
 
     if input_text == "\n":
         return
 
-    if config_option.get() == "jieba":
-        segment_list = OpenCC().jieba_cut(input_text)
-        # segment_list = 'Feature disabled'
-        output_text = "/".join(segment_list)
+    config, converter, punctuation_config = selected_converter(config_option, region_config_option, zhtw_option,
+                                                               punctuation_option)
+    if config == "jieba":
+        chunks = iter_cut_chunks(converter, input_text)
+    elif _source_format is not None:
+        # Timings, cue numbers and styles are left alone; only the dialogue goes through the converter
+        chunks = iter_convert_subtitle_chunks(converter, input_text, _source_format, bool(punctuation_config))
     else:
-        region_config = region_config_option.get()
-        if region_config == "std":
-            converter = OpenCC(config_option.get())
-            output_text = converter.convert(input_text)
-            # print(converter.config)
-        elif region_config == "zhtw":
-            converter = OpenCC(config_option.get().replace("t", "tw") +
-                               "p" if zhtw_option.get() else config_option.get().replace("t", "tw"))
-            output_text = converter.convert(input_text)
-            # print(converter.config)
-        elif region_config == "hk":
-            converter = OpenCC(config_option.get().replace(
-                "t", "hk"))
-            output_text = converter.convert(input_text)
-            # print(converter.config)        
-
-    if punctuation_option.get() and "jieba" not in config_option.get():
-        output_text = convert_punctuation(output_text, config_option.get())
-
-    destination_textbox.delete("1.0", tk.END)
-    destination_textbox.insert("1.0", output_text)
-
-    if config_option.get() != "jieba" and "Non-zh" not in source_char_code_label.cget("text"):
-        destination_char_code_label.config(
-            text="zh-Hant (繁体)" if config_option.get() == "s2t" else "zh-Hans (简体)")
+        # Punctuation is applied per chunk, in the same pass as the conversion
+        chunks = iter_convert_chunks(converter, input_text, punctuation_config)
+
+    def finish_convert(output):
+        global _live
+        render_text(destination_textbox, output)
+        # The destination no longer matches the live conversion state
+        _live = None
+        update_destination_info(config, source_char_code_label, destination_char_code_label)
+
+    start_task(chunks, len(input_text), "Converting", finish_convert, convert_button, openfile_button, cancel_button,
+               progress_label)
+
+
+def live_convert(source_textbox, config_option, region_config_option, zhtw_option, punctuation_option,
+                 destination_textbox, source_char_code_label, destination_char_code_label):
+    global _live, _live_key
+    # Texts shown as a partial preview, or still loading, are converted with the Convert button only
+    if _task is not None or source_textbox in _buffers:
+        return
+    config, converter, punctuation_config = selected_converter(config_option, region_config_option, zhtw_option,
+                                                               punctuation_option)
+    key = (config, converter, punctuation_config)
+    if _live is None or _live_key != key:
+        _live = LiveConverter(line_segmenter(converter) if config == "jieba" else
+                              line_converter(converter, punctuation_config))
+        _live_key = key
+
+    fresh = not _live.output
+    start, stop, lines = _live.update(source_textbox.get("1.0", "end-1c"))
+    if fresh:
+        if destination_textbox in _render_jobs:
+            destination_textbox.after_cancel(_render_jobs.pop(destination_textbox))
+        _buffers.pop(destination_textbox, None)
+        destination_textbox.config(state=tk.NORMAL)
+        destination_textbox.delete("1.0", tk.END)
+        # Ends with a newline like a Convert button result, which output_text() drops
+        destination_textbox.insert("1.0", "\n".join(lines) + "\n")
     else:
-        destination_char_code_label.config(
-            text=source_char_code_label.cget("text"))
+        # Only the changed lines are replaced, so the view and scroll position stay put
+        destination_textbox.delete(f"{start + 1}.0", f"{stop}.end")
+        destination_textbox.insert(f"{start + 1}.0", "\n".join(lines))
+    update_destination_info(config, source_char_code_label, destination_char_code_label)
+
+
+def start_task(chunks, total, action, on_done, convert_button, openfile_button, cancel_button, progress_label):
+    global _task
+    # The chunks are processed on a worker thread; poll_task picks up the results on the Tk thread
+    _task = ConversionTask(chunks, total)
+    convert_button.config(state=tk.DISABLED)
+    openfile_button.config(state=tk.DISABLED)
+    cancel_button.config(state=tk.NORMAL)
+    progress_label.config(text=f"{action}... 0%")
+
+    def poll_task():
+        global _task
+        for kind, value in _task.poll():
+            if kind == "progress":
+                progress_label.config(text=f"{action}... {value:.0%}")
+                continue
+            _task = None
+            convert_button.config(state=tk.NORMAL)
+            openfile_button.config(state=tk.NORMAL)
+            cancel_button.config(state=tk.DISABLED)
+            if kind == "cancelled":
+                progress_label.config(text="Cancelled")
+            elif kind == "error":
+                progress_label.config(text=f"Error: {value}")
+            else:
+                progress_label.config(text="")
+                on_done(value)
+            return
+        progress_label.after(POLL_INTERVAL_MS, poll_task)
+
+    progress_label.after(POLL_INTERVAL_MS, poll_task)
+
+
+def cancel_task():
+    if _task is not None:
+        _task.cancel()
 
 
 # def check_text_code(text):
@@ -196,8 +359,10 @@ def zhtw_click(region_config_option):
 
 
 def main():
+    global _root
     # === Main Window === #
     window = tk.Tk()
+    _root = window
     window.title("zh-Hans <=> zh-Hant Converter")
     window.geometry("1000x720")
     window.columnconfigure(0, weight=1)
@@ -218,6 +383,7 @@ def main():
     region_config_option = tk.StringVar(value="std")
     zhtw_option = tk.IntVar(value=0)
     punctuation_option = tk.IntVar(value=1)
+    live_option = tk.IntVar(value=0)
 
     t2s_radiobutton = tk.Radiobutton(
         config_labelframe, text="zh-Hant (繁体) to zh-Hans (简体)", padx=20, pady=5, value="t2s",
@@ -245,6 +411,9 @@ def main():
         command=lambda: zhtw_click(region_config_option))
     punctuation_checkbutton = tk.Checkbutton(
         config_labelframe, text="Punctuation (标点符号)", variable=punctuation_option, font="Arial 10")
+    live_checkbutton = tk.Checkbutton(
+        config_labelframe, text="Live (实时转换)", variable=live_option, font="Arial 10",
+        command=lambda: schedule_live_convert())
 
     t2s_radiobutton.grid(row=0, column=0)
     s2t_radiobutton.grid(row=0, column=1)
@@ -254,6 +423,7 @@ def main():
     hk_radiobutton.grid(row=1, column=2)
     zhtw_checkbutton.grid(row=2, column=1)
     punctuation_checkbutton.grid(row=2, column=2)
+    live_checkbutton.grid(row=2, column=0)
 
     content_labelframe = tk.LabelFrame(frame, text="Contents")
     content_labelframe.columnconfigure((0, 2), weight=1)
@@ -292,13 +462,16 @@ def main():
                                     filename_label), font="Arial 8 bold")
     copy_button = tk.Button(destination_labelframe,
                             text=" Copy ", command=lambda: copy_output(destination_textbox), font="Arial 8 bold")
+    save_button = tk.Button(destination_labelframe,
+                            text=" Save ", command=lambda: save_output(destination_textbox), font="Arial 8 bold")
 
     source_char_code_label = tk.Label(source_labelframe, text="None")
     destination_char_code_label = tk.Label(destination_labelframe, text="None")
     paste_button.grid(row=0, column=1, padx=5, pady=5)
     copy_button.grid(row=0, column=1, padx=5, pady=5)
+    save_button.grid(row=0, column=2, padx=5, pady=5)
     source_char_code_label.grid(row=0, column=2, padx=5, pady=5)
-    destination_char_code_label.grid(row=0, column=2, padx=5, pady=5)
+    destination_char_code_label.grid(row=0, column=3, padx=5, pady=5)
     source_char_count_label = tk.Label(
         source_labelframe, text=f"( {len(source_textbox.get('1.0', tk.END)) - 1} Chars )")
     source_char_count_label.place(relx=0.99, rely=0.5, anchor="e")
@@ -311,21 +484,56 @@ def main():
     openfile_button = tk.Button(
         action_labelframe, text=" Open File ",
         command=lambda: open_file(source_textbox, source_char_code_label, config_option, source_char_count_label,
-                                  filename_label), font="Arial 10 bold")
+                                  filename_label, convert_button, openfile_button, cancel_button, progress_label),
+        font="Arial 10 bold")
     filename_label = tk.Label(action_labelframe, text="")
     convert_button = tk.Button(
         action_labelframe, text=" Convert ",
         command=lambda: convert(source_textbox, config_option, region_config_option, zhtw_option, punctuation_option,
-                                destination_textbox, source_char_code_label, destination_char_code_label),
+                                destination_textbox, source_char_code_label, destination_char_code_label,
+                                convert_button, openfile_button, cancel_button, progress_label),
         font="Arial 12 bold")
+    cancel_button = tk.Button(
+        action_labelframe, text=" Cancel ",
+        command=cancel_task, state=tk.DISABLED,
+        font="Arial 10 bold")
+    progress_label = tk.Label(action_labelframe, text="")
 
     openfile_button.grid(row=0, column=0, sticky="w", padx=10)
     filename_label.grid(row=0, column=0, sticky="w", padx=100)
     convert_button.grid(row=0, column=1, sticky="")
+    cancel_button.grid(row=0, column=1, sticky="e", padx=10)
+    progress_label.grid(row=0, column=2, sticky="w", padx=10)
     exit_button = tk.Button(action_labelframe, text=" Exit ",
                             command=window.destroy, font="Arial 10 bold")
     exit_button.grid(row=0, column=2, sticky="e", padx=10)
 
+    live_job = None
+
+    def schedule_live_convert(*args):
+        nonlocal live_job
+        if not live_option.get():
+            return
+        # Debounced: typing keeps pushing the conversion back until a pause
+        if live_job is not None:
+            window.after_cancel(live_job)
+        live_job = window.after(LIVE_DEBOUNCE_MS, run_live_convert)
+
+    def run_live_convert():
+        nonlocal live_job
+        live_job = None
+        live_convert(source_textbox, config_option, region_config_option, zhtw_option, punctuation_option,
+                     destination_textbox, source_char_code_label, destination_char_code_label)
+
+    def source_modified(event=None):
+        # Clearing the flag re-arms <<Modified>> for the next edit
+        source_textbox.edit_modified(False)
+        schedule_live_convert()
+
+    source_textbox.bind("<<Modified>>", source_modified)
+    for option in (config_option, region_config_option, zhtw_option, punctuation_option):
+        option.trace_add("write", schedule_live_convert)
+
     window.eval('tk::PlaceWindow . center')
     window.mainloop()
 
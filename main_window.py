@@ -1,9 +1,28 @@
+import functools
 import os
 import tkinter as tk
-from tkinter.filedialog import askopenfilename
+from tkinter.filedialog import askopenfilename, asksaveasfilename
 from opencc_jieba_rs import OpenCC
-from zho_helper import check_text_code, convert_punctuation
-from clipboard_common import set_clipboard_text
+from zho_helper import (ConversionTask, LiveConverter, check_text_code, iter_convert_chunks,
+                        iter_convert_subtitle_chunks, iter_cut_chunks, iter_read_chunks, line_converter,
+                        line_segmenter)
+from opencc_jieba_rs.subtitles import subtitle_format
+from clipboard_backends import get_clipboard_text, set_clipboard_text
+
+# How often the Tk thread picks up results of a background conversion; about one frame at 60 fps
+POLL_INTERVAL_MS = 16
+# Texts longer than this are kept off-widget and only this much of them is displayed
+PREVIEW_CHARS = 1 << 20
+# Characters inserted into a Text widget per event-loop iteration
+RENDER_CHUNK_CHARS = 1 << 16
+# Pause in typing before live mode converts the edited lines
+LIVE_DEBOUNCE_MS = 150
+
+
+@functools.lru_cache(maxsize=None)
+def get_converter(config=None):
+    # One converter per config for the app's lifetime, so its native instance survives between clicks
+    return OpenCC(config)
 
 
 class ZhoTkApp:
@@ -15,6 +34,18 @@ class ZhoTkApp:
         self.root.geometry("1000x720")
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
+        # Conversion or file load running in the background, if any
+        self.task = None
+        # Full text per Text widget while it is still being inserted, or for good when it is too long to display
+        self.buffers = {}
+        # Pending incremental inserts per Text widget
+        self.render_jobs = {}
+        # Subtitle format of the opened file, converted dialogue-only; None for plain text
+        self.source_format = None
+        # Live mode: LiveConverter for the options in live_key, and the pending debounced update
+        self.live = None
+        self.live_key = None
+        self.live_job = None
 
         self.frame = tk.Frame(self.root)
         # frame.pack()
@@ -31,6 +62,7 @@ class ZhoTkApp:
         self.region_config_option = tk.StringVar(value="std")
         self.zhtw_option = tk.IntVar(value=0)
         self.punctuation_option = tk.IntVar(value=1)
+        self.live_option = tk.IntVar(value=0)
 
         self.t2s_radiobutton = tk.Radiobutton(
             self.config_labelframe, text="zh-Hant (繁体) to zh-Hans (简体)", padx=20, pady=5, value="t2s",
@@ -59,6 +91,9 @@ class ZhoTkApp:
             command=self.zhtw_click)
         self.punctuation_checkbutton = tk.Checkbutton(
             self.config_labelframe, text="Punctuation (标点符号)", variable=self.punctuation_option, font="Arial 10")
+        self.live_checkbutton = tk.Checkbutton(
+            self.config_labelframe, text="Live (实时转换)", variable=self.live_option, font="Arial 10",
+            command=self.schedule_live_convert)
 
         self.t2s_radiobutton.grid(row=0, column=0)
         self.s2t_radiobutton.grid(row=0, column=1)
@@ -68,6 +103,9 @@ class ZhoTkApp:
         self.hk_radiobutton.grid(row=1, column=2)
         self.zhtw_checkbutton.grid(row=2, column=1)
         self.punctuation_checkbutton.grid(row=2, column=2)
+        self.live_checkbutton.grid(row=2, column=0)
+        for option in (self.config_option, self.region_config_option, self.zhtw_option, self.punctuation_option):
+            option.trace_add("write", self.schedule_live_convert)
 
         self.content_labelframe = tk.LabelFrame(self.frame, text="Contents")
         self.content_labelframe.columnconfigure((0, 2), weight=1)
@@ -81,6 +119,7 @@ class ZhoTkApp:
             self.content_labelframe, command=self.source_textbox.yview)
         self.source_scrollbar.grid(row=0, column=1, sticky="news", padx=(0, 5))
         self.source_textbox['yscrollcommand'] = self.source_scrollbar.set
+        self.source_textbox.bind("<<Modified>>", self.source_modified)
 
         self.destination_textbox = tk.Text(
             self.content_labelframe, font=("Consolas", 11))
@@ -105,13 +144,16 @@ class ZhoTkApp:
             command=self.paste_input, font="Arial 8 bold")
         self.copy_button = tk.Button(self.destination_labelframe,
                                      text=" Copy ", command=self.copy_output, font="Arial 8 bold")
+        self.save_button = tk.Button(self.destination_labelframe,
+                                     text=" Save ", command=self.save_output, font="Arial 8 bold")
 
         self.source_char_code_label = tk.Label(self.source_labelframe, text="None")
         self.destination_char_code_label = tk.Label(self.destination_labelframe, text="None")
         self.paste_button.grid(row=0, column=1, padx=5, pady=5)
         self.copy_button.grid(row=0, column=1, padx=5, pady=5)
+        self.save_button.grid(row=0, column=2, padx=5, pady=5)
         self.source_char_code_label.grid(row=0, column=2, padx=5, pady=5)
-        self.destination_char_code_label.grid(row=0, column=2, padx=5, pady=5)
+        self.destination_char_code_label.grid(row=0, column=3, padx=5, pady=5)
         self.source_char_count_label = tk.Label(
             self.source_labelframe, text=f"( {len(self.source_textbox.get('1.0', tk.END)) - 1} Chars )")
         self.source_char_count_label.place(relx=0.99, rely=0.5, anchor="e")
@@ -130,26 +172,28 @@ class ZhoTkApp:
             command=self.convert,
             font="Arial 12 bold")
 
+        self.cancel_button = tk.Button(
+            self.action_labelframe, text=" Cancel ",
+            command=self.cancel_task, state=tk.DISABLED,
+            font="Arial 10 bold")
+        self.progress_label = tk.Label(self.action_labelframe, text="")
+
         self.openfile_button.grid(row=0, column=0, sticky="w", padx=10)
         self.filename_label.grid(row=0, column=0, sticky="w", padx=100)
         self.convert_button.grid(row=0, column=1, sticky="")
+        self.cancel_button.grid(row=0, column=1, sticky="e", padx=10)
+        self.progress_label.grid(row=0, column=2, sticky="w", padx=10)
         self.exit_button = tk.Button(self.action_labelframe, text=" Exit ",
                                      command=self.root.destroy, font="Arial 10 bold")
         self.exit_button.grid(row=0, column=2, sticky="e", padx=10)
 
     def clipboard_tk_get(self) -> str:
-        try:
-            clipboard_text = self.root.clipboard_get()
-        except tk.TclError:
-            clipboard_text = ''
-        self.root.update()
-        return clipboard_text
+        # Backend chosen once for this root: the root itself unless a faster native one exists
+        return get_clipboard_text(self.root)
 
     def clipboard_tk_set(self, text: str) -> None:
         if isinstance(text, str):
-            self.root.clipboard_clear()
-            self.root.clipboard_append(text)
-        self.root.update()
+            set_clipboard_text(text, self.root)
 
     # Use this tkinter clipboard module in case pyperclip not working in WSL
     def clipboard_tk_get_set(self, text_to_paste=None):
@@ -170,17 +214,46 @@ class ZhoTkApp:
         # text = pc.paste()
         text = self.clipboard_tk_get()
         # text = get_clipboard_text()
+        self.source_format = None
         self.update_textbox(text)
 
         self.source_char_count_label.config(text=f"( {len(text):,} Chars )")
         self.filename_label.config(text="")
 
     def update_textbox(self, text):
-        self.source_textbox.delete("1.0", tk.END)
-        self.source_textbox.insert("1.0", text)
+        self.render_text(self.source_textbox, text)
 
         self.update_source_info(check_text_code(text))
 
+    def render_text(self, textbox, text):
+        """
+        Insert `text` into `textbox` a slice per event-loop iteration. Beyond PREVIEW_CHARS the widget only shows
+        a preview and the full text stays in self.buffers.
+        """
+        if textbox in self.render_jobs:
+            textbox.after_cancel(self.render_jobs.pop(textbox))
+        self.buffers[textbox] = text
+        textbox.config(state=tk.NORMAL)
+        textbox.delete("1.0", tk.END)
+        shown = min(len(text), PREVIEW_CHARS)
+
+        def insert_slice(start):
+            if start < shown:
+                textbox.insert(tk.END, text[start:min(start + RENDER_CHUNK_CHARS, shown)])
+                self.render_jobs[textbox] = textbox.after(1, insert_slice, start + RENDER_CHUNK_CHARS)
+                return
+            self.render_jobs.pop(textbox, None)
+            if shown == len(text):
+                # Fully displayed, so the widget is the text from now on, edits included
+                del self.buffers[textbox]
+            else:
+                textbox.insert(tk.END, f"\n[... {len(text) - shown:,} more characters not shown; "
+                                       f"Convert, Copy and Save use the full text ...]")
+                # A partial preview must not be edited, since edits could not be applied to the full text
+                textbox.config(state=tk.DISABLED)
+
+        insert_slice(0)
+
     def update_source_info(self, text_code):
         if text_code == 1:
             self.source_char_code_label.config(text="zh-Hant (繁体)")
@@ -191,67 +264,174 @@ class ZhoTkApp:
         else:
             self.source_char_code_label.config(text="Non-zh (其它)")
 
+    def output_text(self):
+        if self.destination_textbox in self.buffers:
+            return self.buffers[self.destination_textbox]
+        text = self.destination_textbox.get("1.0", 'end-1c')
+        # Convert results of the widget's text and live output end with a newline that is not part of the output;
+        # one converted from a text still being loaded does not, so exactly one is dropped, and only when it is there
+        return text[:-1] if text.endswith("\n") else text
+
     def copy_output(self):
         # pc.copy(destination_textbox.get("1.0", 'end-2c'))
         # self.clipboard_tk_set(self.destination_textbox.get("1.0", 'end-2c'))
-        set_clipboard_text(self.destination_textbox.get("1.0", 'end-2c'))
+        self.clipboard_tk_set(self.output_text())
 
-    def open_file(self):
-        filename = askopenfilename(initialdir="./", title="Open File", filetypes=(
+    def save_output(self):
+        filename = asksaveasfilename(initialdir="./", title="Save As", defaultextension=".txt", filetypes=(
             ("Text Files", "*.txt"), ("All Files", "*.*")))
 
         if not filename:
             return
 
-        with open(filename, "r", encoding="utf-8") as f:
-            contents = f.read()
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(self.output_text())
+
+    def open_file(self):
+        filename = askopenfilename(initialdir="./", title="Open File", filetypes=(
+            ("Text Files", "*.txt"), ("Subtitle Files", "*.srt;*.vtt;*.ass;*.ttml2;*.xml"), ("All Files", "*.*")))
+
+        if not filename or self.task is not None:
+            return
+
+        # Read and decoded on a worker thread, so large files do not freeze the window
+        self.start_task(iter_read_chunks(filename), os.path.getsize(filename), "Loading",
+                        lambda contents: self.finish_open_file(filename, contents))
 
+    def finish_open_file(self, filename, contents):
+        self.source_format = subtitle_format(filename)
         self.update_textbox(contents)
 
         self.source_char_count_label.config(text=f"( {len(contents):,} Chars )")
         self.filename_label.config(text=os.path.basename(filename))
 
+    def selected_converter(self):
+        """(config, converter or segmentor, punctuation config or None) for the options currently selected."""
+        config = self.config_option.get()
+        if config == "jieba":
+            # segment_list = 'Feature disabled'
+            return config, get_converter(), None
+        region_config = self.region_config_option.get()
+        if region_config == "std":
+            converter = get_converter(config)
+            # print(converter.config)
+        elif region_config == "zhtw":
+            converter = get_converter(
+                config.replace("t", "tw") + "p" if self.zhtw_option.get() else config.replace("t", "tw"))
+            # print(converter.config)
+        elif region_config == "hk":
+            converter = get_converter(config.replace("t", "hk"))
+            # print(converter.config)
+        return config, converter, config if self.punctuation_option.get() else None
+
     def convert(self):
-        output_text = ""
-        input_text = self.source_textbox.get("1.0", tk.END)
+        if self.task is not None:
+            return
+        input_text = self.buffers.get(self.source_textbox) or self.source_textbox.get("1.0", tk.END)
 
         if input_text == "\n":
             return
 
-        if self.config_option.get() == "jieba":
-            segment_list = OpenCC().jieba_cut(input_text)
-            # segment_list = 'Feature disabled'
-            output_text = "/".join(segment_list)
+        config, converter, punctuation_config = self.selected_converter()
+        if config == "jieba":
+            chunks = iter_cut_chunks(converter, input_text)
+        elif self.source_format is not None:
+            # Timings, cue numbers and styles are left alone; only the dialogue goes through the converter
+            chunks = iter_convert_subtitle_chunks(converter, input_text, self.source_format, bool(punctuation_config))
         else:
-            region_config = self.region_config_option.get()
-            if region_config == "std":
-                converter = OpenCC(self.config_option.get())
-                output_text = converter.convert(input_text)
-                # print(converter.config)
-            elif region_config == "zhtw":
-                converter = OpenCC(self.config_option.get().replace("t", "tw") +
-                                   "p" if self.zhtw_option.get() else self.config_option.get().replace("t", "tw"))
-                output_text = converter.convert(input_text)
-                # print(converter.config)
-            elif region_config == "hk":
-                converter = OpenCC(self.config_option.get().replace(
-                    "t", "hk"))
-                output_text = converter.convert(input_text)
-                # print(converter.config)
-
-        if self.punctuation_option.get() and "jieba" not in self.config_option.get():
-            output_text = convert_punctuation(output_text, self.config_option.get())
-
-        self.destination_textbox.delete("1.0", tk.END)
-        self.destination_textbox.insert("1.0", output_text)
-
-        if self.config_option.get() != "jieba" and "Non-zh" not in self.source_char_code_label.cget("text"):
+            # Punctuation is applied per chunk, in the same pass as the conversion
+            chunks = iter_convert_chunks(converter, input_text, punctuation_config)
+
+        self.start_task(chunks, len(input_text), "Converting", lambda output: self.finish_convert(output, config))
+
+    def finish_convert(self, output_text, config):
+        self.render_text(self.destination_textbox, output_text)
+        # The destination no longer matches the live conversion state
+        self.live = None
+        self.update_destination_info(config)
+
+    def update_destination_info(self, config):
+        if config != "jieba" and "Non-zh" not in self.source_char_code_label.cget("text"):
             self.destination_char_code_label.config(
-                text="zh-Hant (繁体)" if self.config_option.get() == "s2t" else "zh-Hans (简体)")
+                text="zh-Hant (繁体)" if config == "s2t" else "zh-Hans (简体)")
         else:
             self.destination_char_code_label.config(
                 text=self.source_char_code_label.cget("text"))
 
+    def source_modified(self, event=None):
+        # Clearing the flag re-arms <<Modified>> for the next edit
+        self.source_textbox.edit_modified(False)
+        self.schedule_live_convert()
+
+    def schedule_live_convert(self, *args):
+        if not self.live_option.get():
+            return
+        # Debounced: typing keeps pushing the conversion back until a pause
+        if self.live_job is not None:
+            self.root.after_cancel(self.live_job)
+        self.live_job = self.root.after(LIVE_DEBOUNCE_MS, self.live_convert)
+
+    def live_convert(self):
+        self.live_job = None
+        # Texts shown as a partial preview, or still loading, are converted with the Convert button only
+        if self.task is not None or self.source_textbox in self.buffers:
+            return
+        config, converter, punctuation_config = self.selected_converter()
+        key = (config, converter, punctuation_config)
+        if self.live is None or self.live_key != key:
+            self.live = LiveConverter(line_segmenter(converter) if config == "jieba" else
+                                      line_converter(converter, punctuation_config))
+            self.live_key = key
+
+        textbox = self.destination_textbox
+        fresh = not self.live.output
+        start, stop, lines = self.live.update(self.source_textbox.get("1.0", "end-1c"))
+        if fresh:
+            if textbox in self.render_jobs:
+                textbox.after_cancel(self.render_jobs.pop(textbox))
+            self.buffers.pop(textbox, None)
+            textbox.config(state=tk.NORMAL)
+            textbox.delete("1.0", tk.END)
+            # Ends with a newline like a Convert button result, which output_text() drops
+            textbox.insert("1.0", "\n".join(lines) + "\n")
+        else:
+            # Only the changed lines are replaced, so the view and scroll position stay put
+            textbox.delete(f"{start + 1}.0", f"{stop}.end")
+            textbox.insert(f"{start + 1}.0", "\n".join(lines))
+        self.update_destination_info(config)
+
+    def start_task(self, chunks, total, action, on_done):
+        # The chunks are processed on a worker thread; poll_task picks up the results on the Tk thread
+        self.task = ConversionTask(chunks, total)
+        self.convert_button.config(state=tk.DISABLED)
+        self.openfile_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.progress_label.config(text=f"{action}... 0%")
+        self.root.after(POLL_INTERVAL_MS, self.poll_task, action, on_done)
+
+    def poll_task(self, action, on_done):
+        for kind, value in self.task.poll():
+            if kind == "progress":
+                self.progress_label.config(text=f"{action}... {value:.0%}")
+                continue
+            self.task = None
+            self.convert_button.config(state=tk.NORMAL)
+            self.openfile_button.config(state=tk.NORMAL)
+            self.cancel_button.config(state=tk.DISABLED)
+            if kind == "cancelled":
+                self.progress_label.config(text="Cancelled")
+            elif kind == "error":
+                self.progress_label.config(text=f"Error: {value}")
+            else:
+                self.progress_label.config(text="")
+                on_done(value)
+            return
+        self.root.after(POLL_INTERVAL_MS, self.poll_task, action, on_done)
+
+    def cancel_task(self):
+        if self.task is not None:
+            self.task.cancel()
+
     def std_hk_select(self):
         self.zhtw_option.set(0)
 
@@ -1,12 +1,145 @@
 from __future__ import print_function
 
 import argparse
+import codecs
+import os
 import sys
 import io
 from opencc_jieba_rs import OpenCC
+from opencc_jieba_rs.chunking import DEFAULT_CHUNK_SIZE, iter_safe_chunks
+from opencc_jieba_rs.fileio import open_output, same_file
 
 
-def main():
+def batch_main(argv):
+    parser = argparse.ArgumentParser(prog='batch', formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                                     description='Convert every file under SRC_DIR into DST_DIR, keeping the tree.')
+    parser.add_argument('src_dir', metavar='SRC_DIR', help='Directory of original files')
+    parser.add_argument('dst_dir', metavar='DST_DIR', help='Directory for converted files')
+    parser.add_argument('-c', '--config', metavar='<conversion>', required=True,
+                        help='Conversion configuration: [s2t|s2tw|s2twp|s2hk|t2s|tw2s|tw2sp|hk2s|jp2t|t2jp]')
+    parser.add_argument('-p', '--punct', action='store_true', default=False,
+                        help='Punctuation conversion')
+    parser.add_argument('-j', '--jobs', metavar='<n>', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--ext', metavar='<.txt,.srt>', default=None,
+                        help='Only convert files with these comma-separated extensions')
+    parser.add_argument('--in-enc', metavar='<encoding>', default='UTF-8',
+                        help='Encoding for input')
+    parser.add_argument('--out-enc', metavar='<encoding>', default='UTF-8',
+                        help='Encoding for output')
+    parser.add_argument('--format', choices=['auto', 'plain', 'srt', 'vtt', 'ass', 'ttml'], default='auto',
+                        help='Subtitle format; auto picks it per file from the extension, plain converts everything')
+    args = parser.parse_args(argv)
+    from opencc_jieba_rs.batch import convert_tree
+
+    if not os.path.isdir(args.src_dir):
+        print(f"Not a directory: {args.src_dir}", file=sys.stderr)
+        return 1
+
+    extensions = {e.strip().lower() if e.strip().startswith('.') else '.' + e.strip().lower()
+                  for e in args.ext.split(',')} if args.ext else None
+    failed = []
+
+    def on_error(src, error):
+        failed.append(src)
+        print(f"Failed: {src}: {error}", file=sys.stderr)
+
+    files, total_bytes, seconds = convert_tree(args.src_dir, args.dst_dir, args.config, args.punct, args.jobs,
+                                               extensions, args.in_enc, args.out_enc, on_error, args.format)
+    seconds = max(seconds, 1e-9)
+    mb = total_bytes / (1024 * 1024)
+    print(f"Batch completed ({args.config}): {files} files, {mb:.1f} MB in {seconds:.2f}s "
+          f"({files / seconds:.1f} files/s, {mb / seconds:.1f} MB/s), {len(failed)} failed", file=sys.stderr)
+
+    return 1 if failed else 0
+
+
+def keywords_main(argv):
+    parser = argparse.ArgumentParser(prog='keywords', formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                                     description='Extract keywords for every document of a corpus: one document per '
+                                                 'line of .jsonl files, one per file otherwise.')
+    parser.add_argument('inputs', metavar='INPUT', nargs='+', help='Corpus files or directories')
+    parser.add_argument('-o', '--output', metavar='<file>',
+                        help='Write one JSON line of keywords per document to <file> (default: stdout)')
+    parser.add_argument('--freq', metavar='<file>', default=None,
+                        help='Write corpus-level keyword document frequencies to <file> as TSV')
+    parser.add_argument('-m', '--method', choices=['tfidf', 'textrank'], default='tfidf')
+    parser.add_argument('-k', '--top-k', metavar='<n>', type=int, default=10,
+                        help='Keywords per document')
+    parser.add_argument('-w', '--weights', action='store_true', default=False,
+                        help='Include keyword weights')
+    parser.add_argument('-j', '--jobs', metavar='<n>', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--text-field', metavar='<name>', default='text',
+                        help='JSONL field holding the document text')
+    parser.add_argument('--id-field', metavar='<name>', default='id',
+                        help='JSONL field holding the document id')
+    parser.add_argument('--in-enc', metavar='<encoding>', default='UTF-8',
+                        help='Encoding for input')
+    args = parser.parse_args(argv)
+    from opencc_jieba_rs.corpus import iter_documents, keyword_corpus
+
+    failed = []
+
+    def on_error(doc_id, error):
+        failed.append(doc_id)
+        print(f"Failed: {doc_id}: {error}", file=sys.stderr)
+
+    documents = iter_documents(args.inputs, args.text_field, args.id_field, args.in_enc, on_error)
+    with io.open(args.output if args.output else 1, 'w', encoding='UTF-8', closefd=bool(args.output)) as out:
+        frequencies, count, seconds = keyword_corpus(documents, out, args.top_k, args.method, args.jobs,
+                                                     args.weights, on_error=on_error)
+    if args.freq:
+        with io.open(args.freq, 'w', encoding='UTF-8') as f:
+            for keyword, freq in frequencies.most_common():
+                f.write(f"{keyword}\t{freq}\n")
+
+    seconds = max(seconds, 1e-9)
+    print(f"Keywords completed ({args.method}): {count} documents, {len(frequencies)} distinct keywords in "
+          f"{seconds:.2f}s ({count / seconds:.1f} docs/s), {len(failed)} failed", file=sys.stderr)
+
+    return 1 if failed else 0
+
+
+def serve_main(argv):
+    parser = argparse.ArgumentParser(prog='serve', formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                                     description='Serve conversions as JSON over keep-alive HTTP, with /metrics.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+    parser.add_argument('-w', '--workers', metavar='<n>', type=int, default=os.cpu_count() or 1,
+                        help='Native instances, i.e. conversions running in parallel')
+    parser.add_argument('--max-body-mb', metavar='<MB>', type=float, default=8,
+                        help='Largest request body accepted')
+    args = parser.parse_args(argv)
+    import asyncio
+    from opencc_jieba_rs.server import serve
+
+    def on_start(server):
+        print(f"Serving on http://{args.host}:{server.port} with {server.workers} workers", file=sys.stderr)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, int(args.max_body_mb * 1024 * 1024), on_start))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _is_utf8(encoding):
+    try:
+        return codecs.lookup(encoding).name == 'utf-8'
+    except LookupError:
+        return False
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'batch':
+        return batch_main(argv[1:])
+    if argv and argv[0] == 'serve':
+        return serve_main(argv[1:])
+    if argv and argv[0] == 'keywords':
+        return keywords_main(argv[1:])
+
     parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
     parser.add_argument('-i', '--input', metavar='<file>',
                         help='Read original text from <file>.')
@@ -20,23 +153,70 @@ def main():
                         help='Encoding for input')
     parser.add_argument('--out-enc', metavar='<encoding>', default='UTF-8',
                         help='Encoding for output')
-    args = parser.parse_args()
+    parser.add_argument('--stream', action='store_true', default=False,
+                        help='Convert in chunks cut at line/sentence boundaries, keeping memory bounded')
+    parser.add_argument('--chunk-size', metavar='<chars>', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='Characters read per chunk in --stream mode')
+    parser.add_argument('--cache', metavar='<dir>', default=None,
+                        help='Reuse conversions cached in <dir> across runs')
+    parser.add_argument('--cache-max-mb', metavar='<MB>', type=int, default=512,
+                        help='Cache size limit; least recently used entries are evicted')
+    parser.add_argument('--format', choices=['auto', 'plain', 'srt', 'vtt', 'ass', 'ttml'], default='auto',
+                        help='Subtitle format, converting only the dialogue text; auto picks it from the input '
+                             'file extension, plain converts everything')
+    args = parser.parse_args(argv)
 
     if args.config is None:
         print("Please set conversion configuration.", file=sys.stderr)
         return 1
 
-    opencc = OpenCC(args.config)
+    cache = None
+    if args.cache:
+        from opencc_jieba_rs.cache import ConversionCache
+        cache = ConversionCache(args.cache, args.cache_max_mb * 1024 * 1024)
+    opencc = OpenCC(args.config, cache=cache)
+
+    # Converting a file onto itself writes through a temporary file, since the input is read while output is written
+    in_place = same_file(args.input, args.output)
+    subtitle_fmt = None if args.format == 'plain' else args.format
+    if subtitle_fmt == 'auto':
+        from opencc_jieba_rs.subtitles import subtitle_format
+        subtitle_fmt = subtitle_format(args.input) if args.input else None
 
-    with io.open(args.input if args.input else 0, encoding=args.in_enc) as f:
-        input_str = f.read()
-    output_str = opencc.convert(input_str, args.punct)
-    with io.open(args.output if args.output else 1, 'w', encoding=args.out_enc) as f:
-        f.write(output_str)
+    # Every path keeps line endings byte for byte (newline='', or bytes in convert_file), so the output does not
+    # depend on which one --format, --stream, --cache and the encodings select
+    if subtitle_fmt is not None:
+        from opencc_jieba_rs.subtitles import iter_convert_subtitles
+        # newline='' keeps the original line endings, which some players are picky about
+        with io.open(args.input if args.input else 0, encoding=args.in_enc, newline='') as fin, \
+                open_output(args.output if args.output else 1, 'w', in_place, close_first=(fin,),
+                            encoding=args.out_enc, newline='') as fout:
+            for piece in iter_convert_subtitles(opencc, fin, subtitle_fmt, args.punct):
+                fout.write(piece)
+    elif args.stream:
+        with io.open(args.input if args.input else 0, encoding=args.in_enc, newline='') as fin, \
+                open_output(args.output if args.output else 1, 'w', in_place, close_first=(fin,),
+                            encoding=args.out_enc, newline='') as fout:
+            for chunk in iter_safe_chunks(fin, args.chunk_size):
+                fout.write(opencc.convert(chunk, args.punct))
+    elif args.input and args.output and cache is None and _is_utf8(args.in_enc) and _is_utf8(args.out_enc):
+        # File to file in UTF-8: convert the mapped bytes directly, with no str round trip and bounded memory
+        opencc.convert_file(args.input, args.output, args.punct)
+    else:
+        with io.open(args.input if args.input else 0, encoding=args.in_enc, newline='') as f:
+            input_str = f.read()
+        output_str = opencc.convert(input_str, args.punct)
+        with io.open(args.output if args.output else 1, 'w', encoding=args.out_enc, newline='') as f:
+            f.write(output_str)
 
     in_from = args.input if args.input else "<stdin>"
     out_to = args.output if args.output else "<stdout>"
     print(f"Conversion completed ({args.config}): {in_from} -> {out_to}", file=sys.stderr)
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries, "
+              f"{stats['bytes'] / (1024 * 1024):.1f} MB", file=sys.stderr)
+        cache.close()
 
     return 0
 
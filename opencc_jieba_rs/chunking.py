@@ -0,0 +1,88 @@
+# Splitting text at points where no dictionary phrase can span the cut, so chunks convert independently
+# and concatenate to exactly the same output as converting the whole text.
+
+# Line breaks and sentence-ending punctuation
+SAFE_BOUNDARIES = "\n。！？!?"
+# Used only when a chunk grows too long without any safe boundary
+WEAK_BOUNDARIES = "，、；：,;: \t"
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# The same boundaries UTF-8 encoded, for searching bytes-like data such as an mmap; cutting just past one
+# always lands on a character boundary
+SAFE_BOUNDARY_BYTES = tuple(char.encode('utf-8') for char in SAFE_BOUNDARIES)
+
+
+def find_boundary(text, start=0, end=None, boundaries=SAFE_BOUNDARIES):
+    """Index just past the last boundary character in text[start:end], or -1 if there is none."""
+    end = len(text) if end is None else end
+    cut = max(text.rfind(char, start, end) for char in boundaries)
+    return cut + 1 if cut >= 0 else -1
+
+
+def find_next_boundary(text, start=0, boundaries=SAFE_BOUNDARIES):
+    """Index just past the first boundary character at or after `start`, or -1 if there is none."""
+    positions = [pos for pos in (text.find(char, start) for char in boundaries) if pos >= 0]
+    return min(positions) + 1 if positions else -1
+
+
+def split_safe(text, parts):
+    """Split text into at most about `parts` pieces of similar size, cut at safe boundaries."""
+    if parts <= 1 or not text:
+        return [text]
+    size = -(-len(text) // parts)
+    pieces = []
+    start = 0
+    while len(text) - start > size:
+        target = start + size
+        # Prefer the last boundary before the target, otherwise the first one after it
+        cut = find_boundary(text, start + size // 2, target)
+        if cut < 0:
+            cut = find_next_boundary(text, target)
+            if cut < 0:
+                break
+        pieces.append(text[start:cut])
+        start = cut
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def iter_safe_ranges(data, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (start, end) ranges of about `chunk_size` bytes covering UTF-8 `data`, cut at safe boundaries."""
+    start = 0
+    while len(data) - start > chunk_size:
+        target = start + chunk_size
+        cut = find_boundary(data, start + chunk_size // 2, target, SAFE_BOUNDARY_BYTES)
+        if cut < 0:
+            cut = find_next_boundary(data, target, SAFE_BOUNDARY_BYTES)
+            if cut < 0:
+                break
+        # find_boundary adds one for the character; step over the rest of its UTF-8 encoding
+        while cut < len(data) and 0x80 <= data[cut] < 0xC0:
+            cut += 1
+        yield start, cut
+        start = cut
+    if start < len(data):
+        yield start, len(data)
+
+
+def iter_safe_chunks(stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Read a text stream in blocks of about `chunk_size` characters and yield chunks cut at safe boundaries."""
+    pending = ""
+    while True:
+        block = stream.read(chunk_size)
+        if not block:
+            break
+        pending += block
+        # Only the newly read tail needs scanning; the rest was already checked for a boundary
+        cut = find_boundary(pending, max(0, len(pending) - len(block) - 1))
+        if cut < 0 and len(pending) >= 4 * chunk_size:
+            cut = find_boundary(pending, boundaries=WEAK_BOUNDARIES)
+            if cut < 0:
+                cut = len(pending)
+        if cut > 0:
+            yield pending[:cut]
+            pending = pending[cut:]
+    if pending:
+        yield pending
@@ -0,0 +1,173 @@
+import io
+import json
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from opencc_jieba_rs import OpenCC
+from opencc_jieba_rs.batch import iter_files
+
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson')
+# Documents sent to a worker per task, so pickling and scheduling are amortised
+DEFAULT_CHUNK_SIZE = 32
+# Tasks in flight per worker; bounds memory however large the corpus is
+WINDOW_PER_WORKER = 4
+
+# One jieba handle per worker process, created once when the worker starts
+_extractor = None
+
+
+def _init_worker():
+    global _extractor
+    _extractor = OpenCC()
+
+
+def _extract_chunk(job):
+    documents, top_k, method, with_weights = job
+    results = []
+    for doc_id, text in documents:
+        try:
+            if not isinstance(text, str):
+                raise TypeError(f"document text is {type(text).__name__}, not str")
+            if with_weights:
+                keywords, weights = _extractor.jieba_keywords_with_weights(text, top_k, method, as_numpy=False)
+                results.append((doc_id, keywords, weights.tolist(), None))
+            else:
+                keywords = getattr(_extractor, 'jieba_keyword_extract_' + method)(text, top_k)
+                results.append((doc_id, keywords, None, None))
+        except Exception as e:
+            # A failure belongs to its document: report it and go on with the rest of the chunk
+            results.append((doc_id, [], None, str(e)))
+    return results
+
+
+def iter_documents(paths, text_field='text', id_field='id', encoding='UTF-8', on_error=None):
+    """
+    Yield (doc_id, text) from files and directories: one document per line of .jsonl/.ndjson files
+    (doc_id from `id_field`, else "path:line"), one document per file for anything else. Lines and files that do not
+    give a document are passed to `on_error(doc_id, error)` and skipped, or raise if `on_error` is None.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            files = (os.path.join(path, rel) for rel in iter_files(path))
+        else:
+            files = (path,)
+        for file in files:
+            if file.lower().endswith(JSONL_EXTENSIONS):
+                yield from _iter_jsonl(file, text_field, id_field, encoding, on_error)
+                continue
+            try:
+                with io.open(file, encoding=encoding) as f:
+                    text = f.read()
+            except (OSError, UnicodeError) as e:
+                _report(on_error, file, e)
+                continue
+            yield file, text
+
+
+def _iter_jsonl(file, text_field, id_field, encoding, on_error):
+    try:
+        with io.open(file, encoding=encoding) as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                doc_id = f"{file}:{line_no}"
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    _report(on_error, doc_id, e)
+                    continue
+                if not isinstance(record, dict):
+                    _report(on_error, doc_id, ValueError(f"expected a JSON object, got {type(record).__name__}"))
+                    continue
+                doc_id = record.get(id_field, doc_id)
+                text = record.get(text_field)
+                if text is None:
+                    text = ''
+                elif not isinstance(text, str):
+                    _report(on_error, doc_id, TypeError(f"{text_field!r} is {type(text).__name__}, not str"))
+                    continue
+                yield doc_id, text
+    except (OSError, UnicodeError) as e:
+        # Undecodable bytes end the file, reported as a whole
+        _report(on_error, file, e)
+
+
+def _report(on_error, doc_id, error):
+    if on_error is None:
+        raise error
+    on_error(doc_id, str(error))
+
+
+def _chunked(documents, size):
+    chunk = []
+    for document in documents:
+        chunk.append(document)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def extract_keywords(documents, top_k=10, method='tfidf', jobs=None, with_weights=False,
+                     chunk_size=DEFAULT_CHUNK_SIZE, on_error=None):
+    """
+    Yield (doc_id, keywords, weights) for each (doc_id, text) in `documents`, in input order, with method
+    "tfidf" or "textrank". Weights are None unless `with_weights`. Documents are consumed lazily, with a bounded
+    number of chunks in flight.
+    """
+    chunks = ((chunk, top_k, method, with_weights) for chunk in _chunked(documents, chunk_size))
+
+    if jobs == 1:
+        _init_worker()
+        results = map(_extract_chunk, chunks)
+        executor = None
+    else:
+        workers = jobs or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        results = _bounded_map(executor, _extract_chunk, chunks, workers * WINDOW_PER_WORKER)
+
+    try:
+        for chunk_results in results:
+            for doc_id, keywords, weights, error in chunk_results:
+                if error is not None:
+                    if on_error is not None:
+                        on_error(doc_id, error)
+                    continue
+                yield doc_id, keywords, weights
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def _bounded_map(executor, func, iterable, window):
+    # Executor.map submits the whole iterable up front; keep at most `window` tasks pending instead
+    pending = deque()
+    for item in iterable:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(func, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def keyword_corpus(documents, out, top_k=10, method='tfidf', jobs=None, with_weights=False,
+                   chunk_size=DEFAULT_CHUNK_SIZE, on_error=None):
+    """
+    Write one JSON line per document to the text stream `out`; returns (document frequency Counter of keywords,
+    documents, seconds).
+    """
+    frequencies = Counter()
+    documents_done = 0
+    start = time.perf_counter()
+    for doc_id, keywords, weights in extract_keywords(documents, top_k, method, jobs, with_weights, chunk_size,
+                                                      on_error):
+        record = {'id': doc_id, 'keywords': keywords}
+        if weights is not None:
+            record['weights'] = weights
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        frequencies.update(set(keywords))
+        documents_done += 1
+    return frequencies, documents_done, time.perf_counter() - start
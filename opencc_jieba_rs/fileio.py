@@ -0,0 +1,43 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+
+
+def same_file(path_in, path_out):
+    """Whether `path_out` already exists as the file `path_in`, under the same or another name."""
+    try:
+        return os.path.samefile(path_in, path_out)
+    except (OSError, TypeError, ValueError):
+        # Missing files, and file descriptors such as stdin and stdout
+        return False
+
+
+@contextlib.contextmanager
+def open_output(path, mode='w', replace=False, close_first=(), **kwargs):
+    """
+    io.open(path, mode, **kwargs) for writing, or with `replace` a temporary file beside `path` that takes its place
+    once the block completes, so the old contents stay readable while the new ones are written, e.g. when `path` is
+    also the input. Nothing is replaced if the block raises. The files in `close_first`, such as that input, are
+    closed before the replace, since Windows cannot replace a file that is still open.
+    """
+    if not replace:
+        with io.open(path, mode, **kwargs) as f:
+            yield f
+        return
+    target = os.path.realpath(path)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target)}.", suffix='.tmp',
+                                     dir=os.path.dirname(target))
+    try:
+        with io.open(fd, mode, **kwargs) as f:
+            yield f
+        # mkstemp creates the file private; keep the permissions of the file being replaced
+        shutil.copymode(target, temp_path)
+        for f in close_first:
+            f.close()
+        os.replace(temp_path, target)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_path)
+        raise
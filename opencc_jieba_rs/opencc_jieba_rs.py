@@ -1,14 +1,19 @@
 import ctypes
+import mmap
 import os
-import platform
-from typing import List
+import sys
+import threading
+from array import array
+
+from .chunking import DEFAULT_CHUNK_SIZE, iter_safe_ranges, split_safe
+from .spans import SPAN_DELIMITERS, TokenSpans, boundaries_from_joined, boundaries_from_tokens
 
 # Determine the DLL file based on the operating system
-if platform.system() == 'Windows':
+if sys.platform == 'win32':
     DLL_FILE = 'opencc_jieba_capi.dll'
-elif platform.system() == 'Darwin':
+elif sys.platform == 'darwin':
     DLL_FILE = 'libopencc_jieba_capi.dylib'
-elif platform.system() == 'Linux':
+elif sys.platform.startswith('linux'):
     DLL_FILE = 'libopencc_jieba_capi.so'
 else:
     raise OSError("Unsupported operating system")
@@ -18,78 +23,322 @@ CONFIG_LIST = [
     "t2hk", "hk2t", "t2jp", "jp2t"
 ]
 
+# Texts shorter than this are always converted with a single native call
+PARALLEL_MIN_SIZE = 1 << 16
+
+# Joins batched inputs for convert_many(); a control character never touched by the dictionaries
+BATCH_SEPARATOR = '\x1e'
+
+# Lets convert_file() release mapped pages once converted; not available on Windows
+_DONTNEED = getattr(mmap, 'MADV_DONTNEED', None)
+
+# Decodes a NUL-terminated UTF-8 buffer straight into a str, without an intermediate bytes copy
+utf8_to_str = ctypes.PYFUNCTYPE(ctypes.py_object, ctypes.c_void_p)(('PyUnicode_FromString', ctypes.pythonapi))
+
+
+class HandlePool:
+    """Thread-safe pool of native OpenCC-Jieba instances, created lazily up to `size`."""
+
+    def __init__(self, new_handle, free_handle, size=1):
+        self._new_handle = new_handle
+        self._free_handle = free_handle
+        self.size = max(1, size)
+        self._idle = []
+        self._count = 0
+        self._generation = 0
+        self._cond = threading.Condition(threading.Lock())
+
+    def handle(self):
+        """Context manager lending one native instance: `with pool.handle() as opencc: ...`"""
+        return _Lease(self)
+
+    def _acquire(self):
+        with self._cond:
+            while not self._idle and self._count >= self.size:
+                self._cond.wait()
+            generation = self._generation
+            if self._idle:
+                return self._idle.pop(), generation
+            self._count += 1
+        # Creating an instance builds the dictionaries, so keep it outside the lock
+        try:
+            return self._new_handle(), generation
+        except BaseException:
+            self._release(None, generation)
+            raise
+
+    def _release(self, opencc, generation):
+        with self._cond:
+            discard = opencc is None or generation != self._generation or self._count > self.size
+            if discard:
+                self._count -= 1
+            else:
+                self._idle.append(opencc)
+            self._cond.notify()
+        if discard and opencc is not None:
+            self._free_handle(opencc)
+
+    def resize(self, size):
+        with self._cond:
+            self.size = max(1, size)
+            self._cond.notify_all()
+
+    def close(self):
+        # Handles still in use are freed when they are released
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+            self._generation += 1
+            self._cond.notify_all()
+        for opencc in idle:
+            self._free_handle(opencc)
+
+
+class _Lease:
+    __slots__ = ('_pool', '_opencc', '_generation')
+
+    def __init__(self, pool):
+        self._pool = pool
+
+    def __enter__(self):
+        self._opencc, self._generation = self._pool._acquire()
+        return self._opencc
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._pool._release(self._opencc, self._generation)
+
+
+_lib = None
+_lib_lock = threading.Lock()
+
+
+def load_library():
+    """Load the DLL and define its prototypes once per process, on first use."""
+    global _lib
+    if _lib is None:
+        with _lib_lock:
+            if _lib is None:
+                # OPENCC_JIEBA_RS_LIBRARY can point at another build of the library, e.g. the benchmark stub
+                lib = ctypes.CDLL(os.environ.get('OPENCC_JIEBA_RS_LIBRARY') or os.path.join(os.path.dirname(__file__), DLL_FILE))
+                # Define function prototypes
+                lib.opencc_jieba_new.restype = ctypes.c_void_p
+                lib.opencc_jieba_new.argtypes = []
+                lib.opencc_jieba_convert.restype = ctypes.c_void_p
+                lib.opencc_jieba_convert.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_bool]
+                lib.opencc_jieba_zho_check.restype = ctypes.c_int
+                lib.opencc_jieba_zho_check.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+                lib.opencc_jieba_free.argtypes = [ctypes.c_void_p]
+                lib.opencc_jieba_cut.restype = ctypes.POINTER(ctypes.c_void_p)
+                lib.opencc_jieba_cut.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_bool]
+                lib.opencc_jieba_cut_and_join.restype = ctypes.c_void_p
+                lib.opencc_jieba_cut_and_join.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_bool,
+                                                          ctypes.c_char_p]
+                lib.opencc_jieba_free_string.argtypes = [ctypes.c_void_p]
+                lib.opencc_jieba_free_string_array.argtypes = [ctypes.POINTER(ctypes.c_void_p)]
+                lib.opencc_jieba_join_str.restype = ctypes.c_void_p
+                lib.opencc_jieba_join_str.argtypes = [ctypes.POINTER(ctypes.c_char_p), ctypes.c_char_p]
+                lib.opencc_jieba_keywords.restype = ctypes.POINTER(ctypes.c_void_p)
+                lib.opencc_jieba_keywords.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int,
+                                                      ctypes.c_char_p]
+                lib.opencc_jieba_keywords_and_weights.restype = ctypes.c_int32
+                lib.opencc_jieba_keywords_and_weights.argtypes = [
+                    ctypes.c_void_p, ctypes.c_char_p, ctypes.c_size_t, ctypes.c_char_p, ctypes.POINTER(ctypes.c_size_t),
+                    ctypes.POINTER(ctypes.POINTER(ctypes.c_void_p)), ctypes.POINTER(ctypes.POINTER(ctypes.c_double))]
+                lib.opencc_jieba_free_keywords_and_weights.argtypes = [ctypes.POINTER(ctypes.c_void_p),
+                                                                       ctypes.POINTER(ctypes.c_double), ctypes.c_size_t]
+                _lib = lib
+    return _lib
+
+
+_numpy = False
+
+
+def _load_numpy():
+    """NumPy if installed, else None; only imported on first use since it is expensive to load."""
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+def _new_handle():
+    return load_library().opencc_jieba_new()
+
+
+def _free_handle(opencc):
+    load_library().opencc_jieba_free(opencc)
+
 
 class OpenCC:
-    def __init__(self, config=None):
+    def __init__(self, config=None, pool_size=1, cache=None, pool=None):
         self.config = config if config in CONFIG_LIST else "s2t"
-        # Load the DLL
-        dll_path = os.path.join(os.path.dirname(__file__), DLL_FILE)
-        self.lib = ctypes.CDLL(dll_path)
-        # Define function prototypes
-        self.lib.opencc_jieba_new.restype = ctypes.c_void_p
-        self.lib.opencc_jieba_new.argtypes = []
-        self.lib.opencc_jieba_convert.restype = ctypes.c_char_p
-        self.lib.opencc_jieba_convert.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_bool]
-        self.lib.opencc_jieba_zho_check.restype = ctypes.c_int
-        self.lib.opencc_jieba_zho_check.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
-        self.lib.opencc_jieba_free.argtypes = [ctypes.c_void_p]
-        self.lib.opencc_jieba_cut.restype = ctypes.POINTER(ctypes.c_char_p)
-        self.lib.opencc_jieba_cut.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_bool]
-        self.lib.opencc_jieba_cut_and_join.restype = ctypes.c_char_p
-        self.lib.opencc_jieba_cut_and_join.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_bool, ctypes.c_char_p]
-        self.lib.opencc_jieba_free_string.argtypes = [ctypes.c_char_p]
-        self.lib.opencc_jieba_free_string_array.argtypes = [ctypes.POINTER(ctypes.c_char_p)]
-        self.lib.opencc_jieba_join_str.restype = ctypes.c_char_p
-        self.lib.opencc_jieba_join_str.argtypes = [ctypes.POINTER(ctypes.c_char_p), ctypes.c_char_p]
-        self.lib.opencc_jieba_keywords.restype = ctypes.POINTER(ctypes.c_char_p)
-        self.lib.opencc_jieba_keywords.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p]
-
-    def convert(self, text, punctuation=False):
-        opencc = self.lib.opencc_jieba_new()
-        if opencc is None:
+        # Optional ConversionCache consulted by convert()
+        self.cache = cache
+        # A HandlePool passed in is shared, e.g. by one instance per config, and left open by close()
+        self._owns_pool = pool is None
+        self._pool = HandlePool(_new_handle, _free_handle, pool_size) if pool is None else pool
+
+    @property
+    def lib(self):
+        return load_library()
+
+    def convert(self, text, punctuation=False, workers=1):
+        if self.cache is None or len(text) < self.cache.min_chars:
+            return self._convert(text, punctuation, workers)
+        key = self.cache.key(self.config, punctuation, text)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._convert(text, punctuation, workers)
+            self.cache.put(key, result)
+        return result
+
+    def _convert(self, text, punctuation=False, workers=1):
+        if workers > 1 and len(text) >= PARALLEL_MIN_SIZE:
+            return self._convert_parallel(text, punctuation, workers)
+        with self._pool.handle() as opencc:
+            if opencc is None:
+                return text
+            result_ptr = self.lib.opencc_jieba_convert(opencc, text.encode('utf-8'), self.config.encode('utf-8'),
+                                                       punctuation)
+        if not result_ptr:
             return text
-        result = self.lib.opencc_jieba_convert(opencc, text.encode('utf-8'), self.config.encode('utf-8'), punctuation)
-        self.lib.opencc_jieba_free(opencc)
-        return result.decode('utf-8')
+        return self._take_string(result_ptr)
+
+    def _convert_parallel(self, text, punctuation, workers):
+        # ctypes releases the GIL during native calls, so the pieces convert on separate cores,
+        # each thread holding its own pooled native instance
+        if self._pool.size < workers and not self._owns_pool:
+            # A shared pool is sized by its owner; more threads than its handles would only wait for one
+            workers = self._pool.size
+        pieces = split_safe(text, workers)
+        if len(pieces) == 1:
+            return self._convert(text, punctuation)
+        if self._pool.size < workers:
+            self._pool.resize(workers)
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return ''.join(executor.map(self._convert, pieces, [punctuation] * len(pieces)))
+
+    def convert_file(self, path_in, path_out, punctuation=False, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Convert the UTF-8 file `path_in` into `path_out` without decoding it to str: the input is memory-mapped and
+        its ranges of about `chunk_size` bytes, cut at safe boundaries, are passed to the native converter in place.
+        Line endings are kept byte for byte, and `path_out` may be `path_in`. Returns (bytes read, bytes written).
+        """
+        from .fileio import open_output, same_file
+        written = released = 0
+        # Onto itself through a temporary file, since the input stays mapped while the output is written; the
+        # mapping is closed in the block and the input by open_output, both before the temporary file replaces it
+        with open(path_in, 'rb') as fin, \
+                open_output(path_out, 'wb', same_file(path_in, path_out), close_first=(fin,)) as fout:
+            size = os.fstat(fin.fileno()).st_size
+            if not size:
+                return 0, 0
+            # A private copy-on-write mapping, so the NUL written after each range never reaches the file
+            data = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_COPY)
+            base = ctypes.c_char.from_buffer(data)
+            try:
+                with self._pool.handle() as opencc:
+                    for start, end in iter_safe_ranges(data, chunk_size):
+                        if end < size:
+                            # Terminate the range in place for the duration of the call
+                            following = data[end]
+                            data[end] = 0
+                            try:
+                                result = self._convert_bytes(opencc, ctypes.addressof(base) + start, punctuation)
+                            finally:
+                                data[end] = following
+                        else:
+                            # Nothing to overwrite past the end of the mapping; copy just the last range
+                            result = self._convert_bytes(opencc, ctypes.create_string_buffer(data[start:end]),
+                                                         punctuation)
+                        if result is None:
+                            result = data[start:end]
+                        fout.write(result)
+                        written += len(result)
+                        if _DONTNEED is not None:
+                            # Drop the pages already converted, so resident memory stays at about one range
+                            done = end - end % mmap.PAGESIZE
+                            if done > released:
+                                data.madvise(_DONTNEED, released, done - released)
+                                released = done
+            finally:
+                del base
+                data.close()
+        return size, written
+
+    def _convert_bytes(self, opencc, address, punctuation):
+        # Converted UTF-8 bytes for the NUL-terminated input at `address`, or None if the library returned nothing
+        if opencc is None:
+            return None
+        text_ptr = ctypes.cast(address, ctypes.c_char_p)
+        result_ptr = self.lib.opencc_jieba_convert(opencc, text_ptr, self.config.encode('utf-8'), punctuation)
+        if not result_ptr:
+            return None
+        try:
+            return ctypes.string_at(result_ptr)
+        finally:
+            self.lib.opencc_jieba_free_string(result_ptr)
+
+    def convert_many(self, texts, punctuation=False, batch_size=1000):
+        results = []
+        batch = []
+        for text in texts:
+            batch.append(text)
+            if len(batch) >= batch_size:
+                results.extend(self._convert_batch(batch, punctuation))
+                batch = []
+        if batch:
+            results.extend(self._convert_batch(batch, punctuation))
+        return results
+
+    def _convert_batch(self, batch, punctuation):
+        # One native call per batch; fall back to per-item calls if an input contains the separator
+        joined = BATCH_SEPARATOR.join(batch)
+        if joined.count(BATCH_SEPARATOR) == len(batch) - 1:
+            converted = self._convert(joined, punctuation).split(BATCH_SEPARATOR)
+            if len(converted) == len(batch):
+                return converted
+        return [self._convert(text, punctuation) for text in batch]
 
     def zho_check(self, text):
-        opencc = self.lib.opencc_jieba_new()
-        code = self.lib.opencc_jieba_zho_check(opencc, text.encode('utf-8'))
-        self.lib.opencc_jieba_free(opencc)
+        with self._pool.handle() as opencc:
+            code = self.lib.opencc_jieba_zho_check(opencc, text.encode('utf-8'))
         return code
 
     def jieba_cut(self, text, hmm=False):
-        opencc = self.lib.opencc_jieba_new()
-        result_ptr = self.lib.opencc_jieba_cut(opencc, text.encode('utf-8'), hmm)
-        if result_ptr is None:
-            self.lib.opencc_jieba_free(opencc)
+        with self._pool.handle() as opencc:
+            result_ptr = self.lib.opencc_jieba_cut(opencc, text.encode('utf-8'), hmm)
+        if not result_ptr:
             return [text]
+        return self._take_string_array(result_ptr)
 
-        result = []
-        i = 0
-        while True:
-            string_ptr = result_ptr[i]
-            if string_ptr is None:
-                break
-            result.append(ctypes.string_at(string_ptr).decode('utf-8'))
-            i += 1
-
-        self.lib.opencc_jieba_free_string_array(result_ptr)
-        self.lib.opencc_jieba_free(opencc)
-        return result
+    def jieba_cut_spans(self, text, hmm=False):
+        """Like jieba_cut, but as a TokenSpans view of offsets into `text` instead of a list of strings."""
+        if not text:
+            return TokenSpans(text, array('I', [0]))
+        delimiter = next((d for d in SPAN_DELIMITERS if d not in text), None)
+        if delimiter is not None:
+            # One native string for the whole document; offsets come from the delimiter positions
+            joined = self.jieba_cut_and_join(text, hmm, delimiter)
+            offsets = boundaries_from_joined(joined, delimiter)
+            if offsets[-1] == len(text):
+                return TokenSpans(text, offsets)
+        return TokenSpans(text, boundaries_from_tokens(self.jieba_cut(text, hmm)))
 
     def jieba_cut_and_join(self, text, hmm=False, delimiter=", "):
-        opencc = self.lib.opencc_jieba_new()
-        result_ptr = self.lib.opencc_jieba_cut_and_join(opencc, text.encode('utf-8'), hmm, delimiter.encode('utf-8'))
-        if result_ptr is None:
-            self.lib.opencc_jieba_free(opencc)
+        with self._pool.handle() as opencc:
+            result_ptr = self.lib.opencc_jieba_cut_and_join(opencc, text.encode('utf-8'), hmm,
+                                                            delimiter.encode('utf-8'))
+        if not result_ptr:
             return text
-        result = ctypes.string_at(result_ptr).decode('utf-8')
-        # self.lib.opencc_string_free(result_ptr)
-        self.lib.opencc_jieba_free(opencc)
-        return result
+        return self._take_string(result_ptr)
 
-    def jieba_join_str(self, strings: List[str], delimiter: str = " ") -> str:
+    def jieba_join_str(self, strings: list[str], delimiter: str = " ") -> str:
         # Convert the list of strings to a list of c_char_p
         string_pointers = [ctypes.c_char_p(s.encode('utf-8')) for s in strings]
         # Append a NULL pointer to the end of the array
@@ -97,46 +346,88 @@ class OpenCC:
         # Convert the list of c_char_p to a ctypes pointer to c_char_p
         string_array = (ctypes.c_char_p * len(string_pointers))(*string_pointers)
         # Call the C function
-        result = self.lib.opencc_jieba_join_str(string_array, delimiter.encode('utf-8'))
-
-        return result.decode('utf-8')
+        result_ptr = self.lib.opencc_jieba_join_str(string_array, delimiter.encode('utf-8'))
+        if not result_ptr:
+            return delimiter.join(strings)
+        return self._take_string(result_ptr)
 
     def jieba_keyword_extract_textrank(self, text, top_k=10):
-        opencc = self.lib.opencc_jieba_new()
-        result_ptr = self.lib.opencc_jieba_keywords(opencc, text.encode('utf-8'), top_k, "textrank".encode('utf-8'))
-        if result_ptr is None:
-            self.lib.opencc_jieba_free(opencc)
-            return [text]
-
-        result = []
-        i = 0
-        while True:
-            string_ptr = result_ptr[i]
-            if string_ptr is None:
-                break
-            result.append(ctypes.string_at(string_ptr).decode('utf-8'))
-            i += 1
-
-        self.lib.opencc_jieba_free_string_array(result_ptr)
-        self.lib.opencc_jieba_free(opencc)
-        return result
+        return self._jieba_keywords(text, top_k, "textrank")
 
     def jieba_keyword_extract_tfidf(self, text, top_k=10):
-        opencc = self.lib.opencc_jieba_new()
-        result_ptr = self.lib.opencc_jieba_keywords(opencc, text.encode('utf-8'), top_k, "tfidf".encode('utf-8'))
-        if result_ptr is None:
-            self.lib.opencc_jieba_free(opencc)
+        return self._jieba_keywords(text, top_k, "tfidf")
+
+    def _jieba_keywords(self, text, top_k, method):
+        with self._pool.handle() as opencc:
+            result_ptr = self.lib.opencc_jieba_keywords(opencc, text.encode('utf-8'), top_k, method.encode('utf-8'))
+        if not result_ptr:
             return [text]
+        return self._take_string_array(result_ptr)
 
-        result = []
-        i = 0
-        while True:
-            string_ptr = result_ptr[i]
-            if string_ptr is None:
-                break
-            result.append(ctypes.string_at(string_ptr).decode('utf-8'))
-            i += 1
-
-        self.lib.opencc_jieba_free_string_array(result_ptr)
-        self.lib.opencc_jieba_free(opencc)
-        return result
+    def jieba_keywords_with_weights(self, text, top_k=10, method="textrank", as_numpy=None):
+        """
+        Return (keywords, weights) for method "textrank" or "tfidf", weights in descending order of rank.
+        Weights are a NumPy float64 array if as_numpy is true, or None and NumPy is installed; else array('d').
+        """
+        length = ctypes.c_size_t()
+        keywords_ptr = ctypes.POINTER(ctypes.c_void_p)()
+        weights_ptr = ctypes.POINTER(ctypes.c_double)()
+        with self._pool.handle() as opencc:
+            status = self.lib.opencc_jieba_keywords_and_weights(opencc, text.encode('utf-8'), top_k,
+                                                                 method.encode('utf-8'), ctypes.byref(length),
+                                                                 ctypes.byref(keywords_ptr), ctypes.byref(weights_ptr))
+        if status < 0:
+            raise RuntimeError(f"opencc_jieba_keywords_and_weights failed with status {status}")
+        n = length.value
+        try:
+            keywords = [utf8_to_str(keywords_ptr[i]) for i in range(n)]
+            # One copy of the whole native double array, no per-item conversion
+            raw = ctypes.string_at(weights_ptr, n * ctypes.sizeof(ctypes.c_double)) if n else b''
+        finally:
+            self.lib.opencc_jieba_free_keywords_and_weights(keywords_ptr, weights_ptr, n)
+        numpy = _load_numpy() if as_numpy is None or as_numpy else None
+        if as_numpy and numpy is None:
+            raise ImportError("as_numpy=True requires NumPy")
+        if numpy is not None:
+            return keywords, numpy.frombuffer(raw, dtype=numpy.float64).copy()
+        return keywords, array('d', raw)
+
+    def _take_string(self, ptr):
+        # Native strings are owned by the caller and must go back to the library's allocator
+        try:
+            return utf8_to_str(ptr)
+        finally:
+            self.lib.opencc_jieba_free_string(ptr)
+
+    def _take_string_array(self, array_ptr):
+        # Decode a NULL-terminated char** in place, then release the whole array at once
+        try:
+            result = []
+            i = 0
+            while True:
+                string_ptr = array_ptr[i]
+                if string_ptr is None:
+                    break
+                result.append(utf8_to_str(string_ptr))
+                i += 1
+            return result
+        finally:
+            self.lib.opencc_jieba_free_string_array(array_ptr)
+
+    def close(self):
+        if self._owns_pool:
+            self._pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        pool = getattr(self, '_pool', None)
+        if pool is not None and self._owns_pool:
+            try:
+                pool.close()
+            except Exception:
+                pass
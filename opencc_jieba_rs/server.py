@@ -0,0 +1,280 @@
+import asyncio
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from .opencc_jieba_rs import CONFIG_LIST, HandlePool, OpenCC, _free_handle, _new_handle
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+# Largest request body accepted, in bytes; larger requests get 413 without the body being read
+MAX_BODY_SIZE = 8 << 20
+# Largest request line plus headers, in bytes
+MAX_HEADER_SIZE = 64 << 10
+# Seconds an idle keep-alive connection is held open
+KEEP_ALIVE_TIMEOUT = 15
+
+_REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 408: 'Request Timeout',
+    411: 'Length Required', 413: 'Payload Too Large', 431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error',
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or _REASONS[status])
+        self.status = status
+
+
+class ConversionServer:
+    """
+    HTTP/1.1 JSON service over a pool of persistent native instances, shared by all configs and connections.
+    POST /convert {"text", "config", "punctuation"}, /zho_check {"text"}, /jieba_cut {"text", "hmm"} and
+    /keywords {"text", "top_k", "method"}; GET /metrics in Prometheus text format.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=4, max_body_size=MAX_BODY_SIZE,
+                 keep_alive_timeout=KEEP_ALIVE_TIMEOUT):
+        self.host = host
+        self.requested_port = port
+        self.workers = max(1, workers)
+        self.max_body_size = max_body_size
+        self.keep_alive_timeout = keep_alive_timeout
+        self._pool = HandlePool(_new_handle, _free_handle, self.workers)
+        self._converters = {}
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='opencc-jieba-server')
+        self._server = None
+        self._routes = {
+            '/convert': self._convert,
+            '/zho_check': self._zho_check,
+            '/jieba_cut': self._jieba_cut,
+            '/keywords': self._keywords,
+        }
+        self._started = time.time()
+        self._requests = Counter()
+        self._latency = Counter()
+        self._bytes_in = 0
+        self._bytes_out = 0
+        self._connections = 0
+        self._connections_total = 0
+        self._in_flight = 0
+
+    def converter(self, config):
+        """OpenCC for `config` over the shared handle pool, created on first use."""
+        if config not in CONFIG_LIST:
+            raise HTTPError(400, f"Unknown config: {config}")
+        converter = self._converters.get(config)
+        if converter is None:
+            converter = self._converters[config] = OpenCC(config, pool=self._pool)
+        return converter
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.requested_port,
+                                                  limit=MAX_HEADER_SIZE)
+        return self
+
+    @property
+    def port(self):
+        """The port actually listened on, e.g. when started with port 0."""
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+        self._pool.close()
+
+    async def _run(self, func, *args):
+        # Native calls release the GIL, so up to `workers` of them run in parallel, each on its own pooled instance
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def _convert(self, request):
+        converter = self.converter(request.get('config', 's2t'))
+        text = await self._run(converter.convert, _text(request), bool(request.get('punctuation', False)))
+        return {'text': text}
+
+    async def _zho_check(self, request):
+        return {'code': await self._run(self.converter('s2t').zho_check, _text(request))}
+
+    async def _jieba_cut(self, request):
+        tokens = await self._run(self.converter('s2t').jieba_cut, _text(request), bool(request.get('hmm', False)))
+        return {'tokens': tokens}
+
+    async def _keywords(self, request):
+        method = request.get('method', 'textrank')
+        if method not in ('textrank', 'tfidf'):
+            raise HTTPError(400, '"method" must be "textrank" or "tfidf"')
+        top_k = request.get('top_k', 10)
+        if not isinstance(top_k, int) or top_k < 1:
+            raise HTTPError(400, '"top_k" must be a positive integer')
+        keywords, weights = await self._run(self.converter('s2t').jieba_keywords_with_weights, _text(request), top_k,
+                                            method, False)
+        return {'keywords': keywords, 'weights': weights.tolist()}
+
+    async def _handle_connection(self, reader, writer):
+        self._connections += 1
+        self._connections_total += 1
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.keep_alive_timeout)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 'other', 431, {'error': _REASONS[431]}, False)
+                    break
+                keep_alive = await self._handle_request(head, reader, writer)
+        finally:
+            self._connections -= 1
+            writer.close()
+
+    async def _handle_request(self, head, reader, writer):
+        # Returns whether the connection stays open for another request
+        start = time.perf_counter()
+        path = 'other'
+        try:
+            method, target, version, headers = _parse_head(head)
+            keep_alive = _keep_alive(version, headers)
+            path = target.split('?', 1)[0]
+            if path != '/metrics' and path not in self._routes:
+                path = 'other'
+                raise HTTPError(404)
+            if path == '/metrics':
+                if method != 'GET':
+                    raise HTTPError(405)
+                body = self._render_metrics().encode('utf-8')
+                await self._respond(writer, path, 200, body, keep_alive, 'text/plain; version=0.0.4', start)
+                return keep_alive
+            if method != 'POST':
+                raise HTTPError(405)
+            request = await self._read_json(reader, writer, headers)
+            self._in_flight += 1
+            try:
+                result = await self._routes[path](request)
+            finally:
+                self._in_flight -= 1
+        except HTTPError as e:
+            # The body of a rejected request may still be unread, so do not reuse the connection
+            await self._respond(writer, path, e.status, {'error': str(e)}, False, start=start)
+            return False
+        except Exception as e:
+            await self._respond(writer, path, 500, {'error': str(e)}, False, start=start)
+            return False
+        await self._respond(writer, path, 200, result, keep_alive, start=start)
+        return keep_alive
+
+    async def _read_json(self, reader, writer, headers):
+        if 'transfer-encoding' in headers:
+            raise HTTPError(411, "Chunked request bodies are not supported; send Content-Length")
+        try:
+            length = int(headers.get('content-length', ''))
+        except ValueError:
+            raise HTTPError(411) from None
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > self.max_body_size:
+            raise HTTPError(413, f"Request body over {self.max_body_size} bytes")
+        if headers.get('expect', '').lower() == '100-continue':
+            writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), self.keep_alive_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(408) from None
+        self._bytes_in += length
+        try:
+            request = json.loads(body)
+        except ValueError as e:
+            raise HTTPError(400, f"Invalid JSON: {e}") from None
+        if not isinstance(request, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return request
+
+    async def _respond(self, writer, path, status, body, keep_alive, content_type='application/json', start=None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                     f"Content-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\n"
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body)
+        self._bytes_out += len(body)
+        self._requests[path, status] += 1
+        if start is not None:
+            self._latency[path] += time.perf_counter() - start
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    def _render_metrics(self):
+        lines = [
+            '# TYPE opencc_requests_total counter',
+            *(f'opencc_requests_total{{path="{path}",status="{status}"}} {count}'
+              for (path, status), count in sorted(self._requests.items())),
+            '# TYPE opencc_request_seconds_total counter',
+            *(f'opencc_request_seconds_total{{path="{path}"}} {seconds:.6f}'
+              for path, seconds in sorted(self._latency.items())),
+            '# TYPE opencc_request_bytes_total counter',
+            f'opencc_request_bytes_total {self._bytes_in}',
+            '# TYPE opencc_response_bytes_total counter',
+            f'opencc_response_bytes_total {self._bytes_out}',
+            '# TYPE opencc_connections gauge',
+            f'opencc_connections {self._connections}',
+            '# TYPE opencc_connections_total counter',
+            f'opencc_connections_total {self._connections_total}',
+            '# TYPE opencc_requests_in_flight gauge',
+            f'opencc_requests_in_flight {self._in_flight}',
+            '# TYPE opencc_handle_pool_size gauge',
+            f'opencc_handle_pool_size {self._pool.size}',
+            '# TYPE opencc_uptime_seconds gauge',
+            f'opencc_uptime_seconds {time.time() - self._started:.3f}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+
+def _parse_head(head):
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, version = lines[0].split(' ')
+    except ValueError:
+        raise HTTPError(400, "Malformed request line") from None
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, sep, value = line.partition(':')
+            if not sep:
+                raise HTTPError(400, "Malformed header")
+            headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+def _keep_alive(version, headers):
+    connection = headers.get('connection', '').lower()
+    if version == 'HTTP/1.1':
+        return connection != 'close'
+    return connection == 'keep-alive'
+
+
+def _text(request):
+    text = request.get('text')
+    if not isinstance(text, str):
+        raise HTTPError(400, '"text" must be a string')
+    return text
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=4, max_body_size=MAX_BODY_SIZE, on_start=None):
+    """Run a ConversionServer until cancelled; `on_start` is called with it once it listens."""
+    server = await ConversionServer(host, port, workers, max_body_size).start()
+    try:
+        if on_start is not None:
+            on_start(server)
+        await server.serve_forever()
+    finally:
+        await server.close()
@@ -0,0 +1,71 @@
+from array import array
+from itertools import islice
+
+# Tried in order; the first one absent from the text delimits tokens in the joined native result
+SPAN_DELIMITERS = ('\x1f', '\x1e', '\x1d', '﷐', '﷑')
+
+
+def boundaries_from_joined(joined, delimiter):
+    """array('I') of token boundaries in the text that `joined` was produced from by joining with `delimiter`."""
+    offsets = array('I', [0])
+    append = offsets.append
+    find = joined.find
+    pos = 0
+    removed = 0
+    while True:
+        nxt = find(delimiter, pos)
+        if nxt < 0:
+            append(len(joined) - removed)
+            return offsets
+        append(nxt - removed)
+        pos = nxt + 1
+        removed += 1
+
+
+def boundaries_from_tokens(tokens):
+    """array('I') of token boundaries for contiguous tokens."""
+    offsets = array('I', [0])
+    end = 0
+    for token in tokens:
+        end += len(token)
+        offsets.append(end)
+    return offsets
+
+
+class TokenSpans:
+    """
+    Tokens of `text` as contiguous character offsets: token i is text[offsets[i]:offsets[i + 1]].
+    Tokens are only sliced out of the text when indexed or iterated.
+    """
+    __slots__ = ('text', 'offsets')
+
+    def __init__(self, text, offsets):
+        self.text = text
+        self.offsets = offsets
+
+    def __len__(self):
+        return max(0, len(self.offsets) - 1)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return TokenSpans(self.text, self.offsets[start:max(start, stop) + 1])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("token index out of range")
+        return self.text[self.offsets[index]:self.offsets[index + 1]]
+
+    def __iter__(self):
+        text = self.text
+        for start, end in zip(self.offsets, islice(self.offsets, 1, None)):
+            yield text[start:end]
+
+    def spans(self):
+        """Iterate (start, end) offsets without creating any token strings."""
+        return zip(self.offsets, islice(self.offsets, 1, None))
+
+    def __repr__(self):
+        return f"<TokenSpans of {len(self)} tokens>"
@@ -0,0 +1,164 @@
+import io
+import os
+import re
+
+# File extension -> subtitle format handled by iter_convert_subtitles
+SUBTITLE_FORMATS = {
+    '.srt': 'srt',
+    '.vtt': 'vtt',
+    '.ass': 'ass',
+    '.ssa': 'ass',
+    '.ttml': 'ttml',
+    '.ttml2': 'ttml',
+    '.dfxp': 'ttml',
+    '.xml': 'ttml',
+}
+# Dialogue lines per convert_many call
+DEFAULT_BATCH_SIZE = 1000
+
+_ASS_OVERRIDE = re.compile(r'(\{[^}]*\})')
+_XML_TAG = re.compile(r'(<[^>]*>)')
+_XML_HEAD_START = re.compile(r'<(?:\w+:)?head[\s>]')
+_XML_HEAD_END = re.compile(r'</(?:\w+:)?head\s*>')
+
+
+def subtitle_format(filename):
+    """Subtitle format for `filename` by its extension, or None for anything else."""
+    return SUBTITLE_FORMATS.get(os.path.splitext(filename)[1].lower())
+
+
+def _split_ending(line):
+    body = line.rstrip('\r\n')
+    return body, line[len(body):]
+
+
+def _split_markup(raw, text, markup):
+    # Pair each text run of `text` with the markup (and `raw`) before it
+    pieces = markup.split(text)
+    for i in range(0, len(pieces) - 1, 2):
+        yield raw + pieces[i - 1] if i else raw, pieces[i]
+        raw = ''
+    yield raw + pieces[-2] if len(pieces) > 1 else raw, pieces[-1]
+
+
+# Segmenters yield (raw, text) pairs: `raw` is passed through as is, `text` goes through the converter.
+# Untouched lines are accumulated into the next `raw`, so there is one pair per dialogue line, not per line.
+
+def _cue_segments(lines):
+    # SRT and WebVTT: the payload is every line after a timing line up to the next blank line, less its
+    # <i>, <font ...>, <v Speaker> etc. tags; cue numbers, identifiers, headers, NOTE and STYLE blocks pass through
+    raw = []
+    in_payload = False
+    for line in lines:
+        if in_payload and line.strip():
+            body, ending = _split_ending(line)
+            if '<' in body:
+                yield from _split_markup(''.join(raw), body, _XML_TAG)
+            else:
+                yield ''.join(raw), body
+            raw = [ending]
+            continue
+        in_payload = '-->' in line
+        raw.append(line)
+    yield ''.join(raw), ''
+
+
+def _ass_segments(lines):
+    # ASS/SSA: only the Text field of Dialogue lines in [Events], without the {\override} tags in it
+    raw = []
+    section = None
+    text_field = 9
+    for line in lines:
+        if section == '[events]' and line.startswith('Dialogue:'):
+            body, ending = _split_ending(line)
+            fields = body.split(',', text_field)
+            if len(fields) > text_field:
+                prefix = ''.join(raw) + ','.join(fields[:text_field]) + ','
+                yield from _split_markup(prefix, fields[text_field], _ASS_OVERRIDE)
+                raw = [ending]
+                continue
+        stripped = line.strip()
+        if stripped.startswith('[') and stripped.endswith(']'):
+            section = stripped.lower()
+        elif section == '[events]' and stripped.lower().startswith('format:'):
+            # Text is always the last field, so it may contain commas itself
+            text_field = len(stripped[len('format:'):].split(',')) - 1
+        raw.append(line)
+    yield ''.join(raw), ''
+
+
+def _ttml_segments(lines):
+    # TTML / XML: text nodes outside <head>; tags, attributes and whitespace pass through untouched.
+    # Text is only split at the end of a tag, so a tag spanning several lines stays in one piece.
+    raw = ''
+    in_head = False
+    pending = ''
+    for line in lines:
+        pending += line
+        end = pending.rfind('>') + 1
+        if not end:
+            continue
+        ready, pending = pending[:end], pending[end:]
+        pieces = _XML_TAG.split(ready)
+        for i in range(0, len(pieces), 2):
+            text = pieces[i]
+            if in_head or not text.strip():
+                raw += text
+            else:
+                yield raw, text
+                raw = ''
+            if i + 1 < len(pieces):
+                tag = pieces[i + 1]
+                if _XML_HEAD_START.match(tag):
+                    in_head = True
+                elif _XML_HEAD_END.match(tag):
+                    in_head = False
+                raw += tag
+    if pending and not in_head and pending.strip():
+        yield raw, pending
+        raw = ''
+    else:
+        raw += pending
+    yield raw, ''
+
+
+_SEGMENTERS = {
+    'srt': _cue_segments,
+    'vtt': _cue_segments,
+    'ass': _ass_segments,
+    'ttml': _ttml_segments,
+}
+
+
+def iter_convert_subtitles(converter, lines, fmt, punctuation=False, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yield the converted subtitle file read from `lines` (an iterable of lines with their endings, e.g. a file
+    opened with newline=''), in pieces. Only dialogue text goes through the converter, `batch_size` lines per
+    convert_many call; timings, cue numbers, styles and markup are reassembled unchanged.
+    """
+    pieces = []
+    positions = []
+    for raw, text in _SEGMENTERS[fmt](lines):
+        pieces.append(raw)
+        if text:
+            positions.append(len(pieces))
+            pieces.append(text)
+        if len(positions) >= batch_size:
+            yield _convert_pieces(converter, pieces, positions, punctuation, batch_size)
+            pieces = []
+            positions = []
+    if pieces:
+        yield _convert_pieces(converter, pieces, positions, punctuation, batch_size)
+
+
+def _convert_pieces(converter, pieces, positions, punctuation, batch_size):
+    if positions:
+        converted = converter.convert_many([pieces[i] for i in positions], punctuation, batch_size)
+        for i, text in zip(positions, converted):
+            pieces[i] = text
+    return ''.join(pieces)
+
+
+def convert_subtitles(converter, text, fmt, punctuation=False):
+    """Convert the subtitle file contents `text`, see iter_convert_subtitles."""
+    return ''.join(iter_convert_subtitles(converter, io.StringIO(text, newline=''), fmt, punctuation))
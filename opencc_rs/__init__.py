@@ -3,4 +3,20 @@
 # GitHub:
 # January, 2024
 ##########################################################
-from .opencc_rs import OpenCC
\ No newline at end of file
+from .opencc_rs import OpenCC
+import importlib
+
+# These pull in asyncio / sqlite3, so they are only imported when first accessed
+_LAZY_EXPORTS = {
+    'AsyncOpenCC': '.async_opencc',
+    'ConversionCache': '.cache',
+    'ConversionServer': '.server',
+    'MicroBatcher': '.microbatch',
+    'PureOpenCC': '.pure_opencc',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,53 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .opencc_rs import OpenCC
+
+
+class AsyncOpenCC:
+    """asyncio front end for OpenCC; calls run on a bounded thread pool with one native instance per thread."""
+
+    def __init__(self, config=None, max_workers=4, max_pending=None):
+        self.max_workers = max(1, max_workers)
+        # Callers beyond this many in-flight calls wait on the semaphore instead of piling up in the executor
+        self.max_pending = max_pending or self.max_workers * 4
+        self._opencc = OpenCC(config, pool_size=self.max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='opencc')
+        self._semaphore = None
+
+    @property
+    def config(self):
+        return self._opencc.config
+
+    async def _run(self, func, *args):
+        # Created lazily so the semaphore belongs to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+
+    async def convert(self, text, punctuation=False):
+        return await self._run(self._opencc.convert, text, punctuation)
+
+    async def zho_check(self, text):
+        return await self._run(self._opencc.zho_check, text)
+
+    async def convert_many(self, texts, punctuation=False, batch_size=1000):
+        # Each batch is one native call; batches run concurrently across the worker threads
+        texts = list(texts)
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        results = await asyncio.gather(*(self._run(self._opencc.convert_many, batch, punctuation, batch_size)
+                                         for batch in batches))
+        return [text for batch in results for text in batch]
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._opencc.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,81 @@
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from opencc_rs import OpenCC
+from opencc_rs.subtitles import iter_convert_subtitles, subtitle_format
+
+# One converter per worker process, so the library and native instance are set up once per worker
+_converter = None
+
+
+def _init_worker(config):
+    global _converter
+    _converter = OpenCC(config)
+
+
+def _convert_file(job):
+    src, dst, punctuation, in_enc, out_enc, fmt = job
+    if fmt == 'auto':
+        fmt = subtitle_format(src)
+    try:
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        # newline='' keeps the original line endings byte for byte
+        if fmt is not None and fmt != 'plain':
+            with io.open(src, encoding=in_enc, newline='') as fin, \
+                    io.open(dst, 'w', encoding=out_enc, newline='') as fout:
+                for piece in iter_convert_subtitles(_converter, fin, fmt, punctuation):
+                    fout.write(piece)
+            return src, os.path.getsize(src), None
+        with io.open(src, encoding=in_enc, newline='') as f:
+            text = f.read()
+        with io.open(dst, 'w', encoding=out_enc, newline='') as f:
+            f.write(_converter.convert(text, punctuation))
+        return src, os.path.getsize(src), None
+    except (OSError, UnicodeError) as e:
+        return src, 0, str(e)
+
+
+def iter_files(src_dir, extensions=None, exclude=None):
+    """Yield paths relative to `src_dir`, optionally filtered by extension and skipping the `exclude` tree."""
+    exclude = os.path.realpath(exclude) if exclude else None
+    for root, dirs, files in os.walk(src_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.realpath(os.path.join(root, d)) != exclude)
+        for name in sorted(files):
+            if extensions and os.path.splitext(name)[1].lower() not in extensions:
+                continue
+            yield os.path.relpath(os.path.join(root, name), src_dir)
+
+
+def convert_tree(src_dir, dst_dir, config, punctuation=False, jobs=None, extensions=None,
+                 in_enc='UTF-8', out_enc='UTF-8', on_error=None, fmt='auto'):
+    """
+    Convert each file under `src_dir` to the same relative path under `dst_dir`; returns (files, bytes, seconds).
+    Subtitle files are converted dialogue-only, in the format given by `fmt` or by their extension for 'auto'.
+    """
+    jobs_list = [(os.path.join(src_dir, rel), os.path.join(dst_dir, rel), punctuation, in_enc, out_enc, fmt)
+                 for rel in iter_files(src_dir, extensions, exclude=dst_dir)]
+    start = time.perf_counter()
+    files = total_bytes = 0
+
+    if jobs == 1:
+        _init_worker(config)
+        results = map(_convert_file, jobs_list)
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(config,))
+        results = executor.map(_convert_file, jobs_list, chunksize=8)
+
+    try:
+        for src, size, error in results:
+            if error is not None:
+                if on_error is not None:
+                    on_error(src, error)
+                continue
+            files += 1
+            total_bytes += size
+    finally:
+        if jobs != 1:
+            executor.shutdown()
+
+    return files, total_bytes, time.perf_counter() - start
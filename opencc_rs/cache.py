@@ -0,0 +1,89 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_FILE = 'opencc_cache.sqlite3'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Below this many characters converting is cheaper than a cache round trip
+DEFAULT_MIN_CHARS = 1024
+# Bumped whenever conversion output changes, so entries from older versions are never returned
+CACHE_VERSION = 1
+# Part of every key: both packages can use one cache directory without returning each other's output
+ENGINE = f"{__package__}/{CACHE_VERSION}"
+
+
+class ConversionCache:
+    """
+    Persistent conversion cache in SQLite, keyed by engine, config, punctuation flag and content hash, LRU by size.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, min_chars=DEFAULT_MIN_CHARS):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, CACHE_FILE)
+        self.max_bytes = max_bytes
+        self.min_chars = min_chars
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS entries ('
+                         'key BLOB PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_used ON entries (used)')
+        self._size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    @staticmethod
+    def key(config, punctuation, text):
+        digest = hashlib.sha256(f"{ENGINE}\0{config}\0{int(bool(punctuation))}\0".encode('utf-8'))
+        digest.update(text.encode('utf-8'))
+        return digest.digest()
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute('UPDATE entries SET used = ? WHERE key = ?', (time.time(), key))
+            self.hits += 1
+        return row[0].decode('utf-8')
+
+    def put(self, key, result):
+        value = result.encode('utf-8')
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            row = self._db.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            self._db.execute('INSERT OR REPLACE INTO entries (key, value, size, used) VALUES (?, ?, ?, ?)',
+                             (key, value, len(value), time.time()))
+            self._size += len(value) - (row[0] if row else 0)
+            if self._size > self.max_bytes:
+                self._evict(self.max_bytes * 9 // 10)
+
+    def _evict(self, target):
+        # Drop least recently used entries until the store is back under the target size
+        evicted = []
+        cursor = self._db.execute('SELECT key, size FROM entries ORDER BY used')
+        for key, size in cursor:
+            if self._size <= target:
+                break
+            evicted.append((key,))
+            self._size -= size
+        cursor.close()
+        self._db.executemany('DELETE FROM entries WHERE key = ?', evicted)
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': self._size}
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM entries')
+            self._size = 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
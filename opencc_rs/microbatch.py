@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .opencc_rs import CONFIG_LIST, HandlePool, OpenCC, _free_handle, _new_handle
+
+# Requests per native call, at most
+DEFAULT_MAX_ITEMS = 256
+# Seconds the first request of a batch waits for others to join it
+DEFAULT_MAX_DELAY = 0.002
+
+
+class MicroBatcher:
+    """
+    Collects concurrent convert requests per (config, punctuation) into batches, converts each batch with one
+    convert_many call and resolves every caller's future with its own result. A batch is sent once it has
+    `max_items` requests or its first one waited `max_delay` seconds; with `eager`, also as soon as a worker is
+    idle, so batches only grow while all workers are busy. Usable from threads (submit, convert) and asyncio
+    (convert_async).
+    """
+
+    def __init__(self, max_items=DEFAULT_MAX_ITEMS, max_delay=DEFAULT_MAX_DELAY, workers=2, eager=True):
+        self.max_items = max(1, max_items)
+        self.max_delay = max(0.0, max_delay)
+        self.workers = max(1, workers)
+        self.eager = eager
+        # Batches of different configs convert in parallel, over one pool of native instances
+        self._pool = HandlePool(_new_handle, _free_handle, self.workers)
+        self._converters = {}
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='opencc-batch')
+        # (config, punctuation) -> (deadline, [(text, future), ...])
+        self._pending = {}
+        self._cond = threading.Condition(threading.Lock())
+        self._closed = False
+        self._running = 0
+        self.batches = 0
+        self.items = 0
+        self._thread = threading.Thread(target=self._dispatch, name='opencc-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, text, config='s2t', punctuation=False):
+        """Queue `text` for conversion; returns a concurrent.futures.Future of the converted text."""
+        if config not in CONFIG_LIST:
+            raise ValueError(f"Unknown config: {config}")
+        future = Future()
+        key = (config, bool(punctuation))
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = (time.monotonic() + self.max_delay, [])
+            entry[1].append((text, future))
+            # The dispatcher only needs waking for a new batch or a full one
+            if len(entry[1]) == 1 or len(entry[1]) >= self.max_items:
+                self._cond.notify()
+        return future
+
+    def convert(self, text, config='s2t', punctuation=False):
+        return self.submit(text, config, punctuation).result()
+
+    async def convert_async(self, text, config='s2t', punctuation=False):
+        return await asyncio.wrap_future(self.submit(text, config, punctuation))
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    idle = self.eager and self._running < self.workers
+                    ready = [key for key, (deadline, items) in self._pending.items()
+                             if idle or self._closed or deadline <= now or len(items) >= self.max_items]
+                    if ready or (self._closed and not self._pending):
+                        break
+                    if self._pending:
+                        self._cond.wait(min(deadline for deadline, _ in self._pending.values()) - now)
+                    else:
+                        self._cond.wait()
+                if not ready:
+                    return
+                batches = []
+                for key in ready:
+                    _, items = self._pending.pop(key)
+                    # A full batch leaves its overflow queued for the next one
+                    if len(items) > self.max_items:
+                        self._pending[key] = (time.monotonic() + self.max_delay, items[self.max_items:])
+                        items = items[:self.max_items]
+                    batches.append((key, items))
+                self._running += len(batches)
+            for key, items in batches:
+                self._executor.submit(self._convert_batch, key, items)
+
+    def _convert_batch(self, key, items):
+        try:
+            self._resolve(key, [(text, future) for text, future in items if future.set_running_or_notify_cancel()])
+        finally:
+            with self._cond:
+                self._running -= 1
+                # A worker is free: whatever queued up meanwhile can go now
+                self._cond.notify()
+
+    def _resolve(self, key, items):
+        if not items:
+            return
+        config, punctuation = key
+        try:
+            converter = self._converters.get(config)
+            if converter is None:
+                converter = self._converters.setdefault(config, OpenCC(config, pool=self._pool))
+            results = converter.convert_many([text for text, _ in items], punctuation, len(items))
+        except Exception as e:
+            for _, future in items:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.items += len(items)
+        for (_, future), result in zip(items, results):
+            future.set_result(result)
+
+    def close(self):
+        """Convert whatever is still queued, then release the threads and native instances."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+        self._pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
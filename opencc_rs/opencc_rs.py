@@ -1,13 +1,17 @@
 import ctypes
+import mmap
 import os
-import platform
+import sys
+import threading
+
+from .chunking import DEFAULT_CHUNK_SIZE, iter_safe_ranges, split_safe
 
 # Determine the DLL file based on the operating system
-if platform.system() == 'Windows':
+if sys.platform == 'win32':
     DLL_FILE = 'opencc_fmmseg_capi.dll'
-elif platform.system() == 'Darwin':
+elif sys.platform == 'darwin':
     DLL_FILE = 'libopencc_fmmseg_capi.dylib'
-elif platform.system() == 'Linux':
+elif sys.platform.startswith('linux'):
     DLL_FILE = 'libopencc_fmmseg_capi.so'
 else:
     raise OSError("Unsupported operating system")
@@ -17,33 +21,321 @@ CONFIG_LIST = [
     "t2hk", "hk2t", "t2jp", "jp2t"
 ]
 
+# Texts shorter than this are always converted with a single native call
+PARALLEL_MIN_SIZE = 1 << 16
+
+# Joins batched inputs for convert_many(); a control character never touched by the dictionaries
+BATCH_SEPARATOR = '\x1e'
+
+# Lets convert_file() release mapped pages once converted; not available on Windows
+_DONTNEED = getattr(mmap, 'MADV_DONTNEED', None)
+
+# Decodes a NUL-terminated UTF-8 buffer straight into a str, without an intermediate bytes copy
+utf8_to_str = ctypes.PYFUNCTYPE(ctypes.py_object, ctypes.c_void_p)(('PyUnicode_FromString', ctypes.pythonapi))
+
+
+class HandlePool:
+    """Thread-safe pool of native OpenCC instances, created lazily up to `size`."""
+
+    def __init__(self, new_handle, free_handle, size=1):
+        self._new_handle = new_handle
+        self._free_handle = free_handle
+        self.size = max(1, size)
+        self._idle = []
+        self._count = 0
+        self._generation = 0
+        self._cond = threading.Condition(threading.Lock())
+
+    def handle(self):
+        """Context manager lending one native instance: `with pool.handle() as opencc: ...`"""
+        return _Lease(self)
+
+    def _acquire(self):
+        with self._cond:
+            while not self._idle and self._count >= self.size:
+                self._cond.wait()
+            generation = self._generation
+            if self._idle:
+                return self._idle.pop(), generation
+            self._count += 1
+        # Creating an instance builds the dictionaries, so keep it outside the lock
+        try:
+            return self._new_handle(), generation
+        except BaseException:
+            self._release(None, generation)
+            raise
+
+    def _release(self, opencc, generation):
+        with self._cond:
+            discard = opencc is None or generation != self._generation or self._count > self.size
+            if discard:
+                self._count -= 1
+            else:
+                self._idle.append(opencc)
+            self._cond.notify()
+        if discard and opencc is not None:
+            self._free_handle(opencc)
+
+    def resize(self, size):
+        with self._cond:
+            self.size = max(1, size)
+            self._cond.notify_all()
+
+    def close(self):
+        # Handles still in use are freed when they are released
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+            self._generation += 1
+            self._cond.notify_all()
+        for opencc in idle:
+            self._free_handle(opencc)
+
+
+class _Lease:
+    __slots__ = ('_pool', '_opencc', '_generation')
+
+    def __init__(self, pool):
+        self._pool = pool
+
+    def __enter__(self):
+        self._opencc, self._generation = self._pool._acquire()
+        return self._opencc
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._pool._release(self._opencc, self._generation)
+
+
+_lib = None
+_lib_error = None
+_lib_lock = threading.Lock()
+
+
+def load_library():
+    """Load the DLL and define its prototypes once per process, on first use."""
+    global _lib, _lib_error
+    if _lib is None:
+        with _lib_lock:
+            if _lib_error is not None:
+                # A failed load is not retried on every call
+                raise OSError(f"Native library could not be loaded: {_lib_error}") from _lib_error
+            if _lib is None:
+                # OPENCC_RS_LIBRARY can point at another build of the library, e.g. the benchmark stub
+                try:
+                    lib = ctypes.CDLL(os.environ.get('OPENCC_RS_LIBRARY') or
+                                      os.path.join(os.path.dirname(__file__), DLL_FILE))
+                except OSError as e:
+                    _lib_error = e
+                    raise
+                # Define function prototypes
+                lib.opencc_new.restype = ctypes.c_void_p
+                lib.opencc_new.argtypes = []
+                lib.opencc_convert.restype = ctypes.c_void_p
+                lib.opencc_convert.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_bool]
+                lib.opencc_zho_check.restype = ctypes.c_int
+                lib.opencc_zho_check.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+                lib.opencc_free.argtypes = [ctypes.c_void_p]
+                lib.opencc_string_free.argtypes = [ctypes.c_void_p]
+                _lib = lib
+    return _lib
+
+
+def native_available():
+    """Whether the native library loads; OpenCC falls back to the pure-Python engine when it does not."""
+    try:
+        load_library()
+        return True
+    except OSError:
+        return False
+
+
+def _new_handle():
+    return load_library().opencc_new()
+
+
+def _free_handle(opencc):
+    load_library().opencc_free(opencc)
+
 
 class OpenCC:
-    def __init__(self, config=None):
+    def __init__(self, config=None, pool_size=1, cache=None, pool=None):
         self.config = config if config in CONFIG_LIST else "s2t"
+        # Optional ConversionCache consulted by convert()
+        self.cache = cache
+        # A HandlePool passed in is shared, e.g. by one instance per config, and left open by close()
+        self._owns_pool = pool is None
+        self._pool = HandlePool(_new_handle, _free_handle, pool_size) if pool is None else pool
+        self._pure = None
 
-    # Load the DLL
-    dll_path = os.path.join(os.path.dirname(__file__), DLL_FILE)
-    lib = ctypes.CDLL(dll_path)
-    # Define function prototypes
-    lib.opencc_new.restype = ctypes.c_void_p
-    lib.opencc_new.argtypes = []
-    lib.opencc_convert.restype = ctypes.c_char_p
-    lib.opencc_convert.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_bool]
-    lib.opencc_zho_check.restype = ctypes.c_int
-    lib.opencc_zho_check.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
-    lib.opencc_free.argtypes = [ctypes.c_void_p]
-
-    def convert(self, text, punctuation=False):
-        opencc = self.lib.opencc_new()
-        if opencc is None:
+    @property
+    def lib(self):
+        return load_library()
+
+    def convert(self, text, punctuation=False, workers=1):
+        if self.cache is None or len(text) < self.cache.min_chars:
+            return self._convert(text, punctuation, workers)
+        key = self.cache.key(self.config, punctuation, text)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._convert(text, punctuation, workers)
+            self.cache.put(key, result)
+        return result
+
+    def _fallback(self):
+        """PureOpenCC for the current config if the native library cannot be loaded, else None."""
+        if self._pure is not None and self._pure.config == self.config:
+            return self._pure
+        if native_available():
+            return None
+        from .pure_opencc import PureOpenCC
+        # Rebuilt whenever config changes; the dictionary tables themselves are shared per process
+        self._pure = PureOpenCC(self.config)
+        return self._pure
+
+    def _convert(self, text, punctuation=False, workers=1):
+        pure = self._fallback()
+        if pure is not None:
+            return pure.convert(text, punctuation)
+        if workers > 1 and len(text) >= PARALLEL_MIN_SIZE:
+            return self._convert_parallel(text, punctuation, workers)
+        with self._pool.handle() as opencc:
+            if opencc is None:
+                return text
+            result_ptr = self.lib.opencc_convert(opencc, text.encode('utf-8'), self.config.encode('utf-8'),
+                                                 punctuation)
+        if not result_ptr:
             return text
-        result = self.lib.opencc_convert(opencc, text.encode('utf-8'), self.config.encode('utf-8'), punctuation)
-        self.lib.opencc_free(opencc)
-        return result.decode('utf-8')
+        return self._take_string(result_ptr)
+
+    def _take_string(self, ptr):
+        # Native strings are owned by the caller and must go back to the library's allocator
+        try:
+            return utf8_to_str(ptr)
+        finally:
+            self.lib.opencc_string_free(ptr)
+
+    def _convert_parallel(self, text, punctuation, workers):
+        # ctypes releases the GIL during native calls, so the pieces convert on separate cores,
+        # each thread holding its own pooled native instance
+        if self._pool.size < workers and not self._owns_pool:
+            # A shared pool is sized by its owner; more threads than its handles would only wait for one
+            workers = self._pool.size
+        pieces = split_safe(text, workers)
+        if len(pieces) == 1:
+            return self._convert(text, punctuation)
+        if self._pool.size < workers:
+            self._pool.resize(workers)
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return ''.join(executor.map(self._convert, pieces, [punctuation] * len(pieces)))
+
+    def convert_file(self, path_in, path_out, punctuation=False, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Convert the UTF-8 file `path_in` into `path_out` without decoding it to str: the input is memory-mapped and
+        its ranges of about `chunk_size` bytes, cut at safe boundaries, are passed to the native converter in place.
+        Line endings are kept byte for byte, and `path_out` may be `path_in`. Returns (bytes read, bytes written).
+        """
+        pure = self._fallback()
+        if pure is not None:
+            return pure.convert_file(path_in, path_out, punctuation, chunk_size)
+        from .fileio import open_output, same_file
+        written = released = 0
+        # Onto itself through a temporary file, since the input stays mapped while the output is written; the
+        # mapping is closed in the block and the input by open_output, both before the temporary file replaces it
+        with open(path_in, 'rb') as fin, \
+                open_output(path_out, 'wb', same_file(path_in, path_out), close_first=(fin,)) as fout:
+            size = os.fstat(fin.fileno()).st_size
+            if not size:
+                return 0, 0
+            # A private copy-on-write mapping, so the NUL written after each range never reaches the file
+            data = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_COPY)
+            base = ctypes.c_char.from_buffer(data)
+            try:
+                with self._pool.handle() as opencc:
+                    for start, end in iter_safe_ranges(data, chunk_size):
+                        if end < size:
+                            # Terminate the range in place for the duration of the call
+                            following = data[end]
+                            data[end] = 0
+                            try:
+                                result = self._convert_bytes(opencc, ctypes.addressof(base) + start, punctuation)
+                            finally:
+                                data[end] = following
+                        else:
+                            # Nothing to overwrite past the end of the mapping; copy just the last range
+                            result = self._convert_bytes(opencc, ctypes.create_string_buffer(data[start:end]),
+                                                         punctuation)
+                        if result is None:
+                            result = data[start:end]
+                        fout.write(result)
+                        written += len(result)
+                        if _DONTNEED is not None:
+                            # Drop the pages already converted, so resident memory stays at about one range
+                            done = end - end % mmap.PAGESIZE
+                            if done > released:
+                                data.madvise(_DONTNEED, released, done - released)
+                                released = done
+            finally:
+                del base
+                data.close()
+        return size, written
+
+    def _convert_bytes(self, opencc, address, punctuation):
+        # Converted UTF-8 bytes for the NUL-terminated input at `address`, or None if the library returned nothing
+        if opencc is None:
+            return None
+        text_ptr = ctypes.cast(address, ctypes.c_char_p)
+        result_ptr = self.lib.opencc_convert(opencc, text_ptr, self.config.encode('utf-8'), punctuation)
+        if not result_ptr:
+            return None
+        try:
+            return ctypes.string_at(result_ptr)
+        finally:
+            self.lib.opencc_string_free(result_ptr)
+
+    def convert_many(self, texts, punctuation=False, batch_size=1000):
+        results = []
+        batch = []
+        for text in texts:
+            batch.append(text)
+            if len(batch) >= batch_size:
+                results.extend(self._convert_batch(batch, punctuation))
+                batch = []
+        if batch:
+            results.extend(self._convert_batch(batch, punctuation))
+        return results
+
+    def _convert_batch(self, batch, punctuation):
+        # One native call per batch; fall back to per-item calls if an input contains the separator
+        joined = BATCH_SEPARATOR.join(batch)
+        if joined.count(BATCH_SEPARATOR) == len(batch) - 1:
+            converted = self._convert(joined, punctuation).split(BATCH_SEPARATOR)
+            if len(converted) == len(batch):
+                return converted
+        return [self._convert(text, punctuation) for text in batch]
 
     def zho_check(self, text):
-        opencc = self.lib.opencc_new()
-        code = self.lib.opencc_zho_check(opencc, text.encode('utf-8'))
-        self.lib.opencc_free(opencc)
+        pure = self._fallback()
+        if pure is not None:
+            return pure.zho_check(text)
+        with self._pool.handle() as opencc:
+            code = self.lib.opencc_zho_check(opencc, text.encode('utf-8'))
         return code
+
+    def close(self):
+        if self._owns_pool:
+            self._pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        pool = getattr(self, '_pool', None)
+        if pool is not None and self._owns_pool:
+            try:
+                pool.close()
+            except Exception:
+                pass
@@ -0,0 +1,340 @@
+import hashlib
+import io
+import json
+import marshal
+import os
+import re
+import threading
+
+from .chunking import DEFAULT_CHUNK_SIZE, iter_safe_chunks
+
+# The dictionaries the native library is built with, as it embeds them: {name: [{phrase: replacement}, longest]}
+BUNDLED_DICTIONARY = os.path.join(os.path.dirname(__file__), 'dicts', 'dictionary_maxlength.json')
+
+# Directories searched for OpenCC dictionary .txt files when the bundled dictionary is missing; directories in the
+# OPENCC_RS_DICT_DIR environment variable (os.pathsep-separated) are searched first, before the bundled dictionary
+DICT_DIRS = [
+    '/usr/share/opencc',
+    '/usr/local/share/opencc',
+    '/opt/homebrew/share/opencc',
+]
+
+# Conversion chain per config, as in OpenCC's config files: each stage is a group of dictionaries matched together,
+# longest match first, and each stage converts the output of the previous one
+CONFIG_CHAINS = {
+    's2t': [['STPhrases', 'STCharacters']],
+    't2s': [['TSPhrases', 'TSCharacters']],
+    's2tw': [['STPhrases', 'STCharacters'], ['TWVariants']],
+    'tw2s': [['TWVariantsRevPhrases', 'TWVariantsRev'], ['TSPhrases', 'TSCharacters']],
+    's2twp': [['STPhrases', 'STCharacters'], ['TWPhrases'], ['TWVariants']],
+    'tw2sp': [['TWPhrasesRev', 'TWVariantsRevPhrases', 'TWVariantsRev'], ['TSPhrases', 'TSCharacters']],
+    's2hk': [['STPhrases', 'STCharacters'], ['HKVariants']],
+    'hk2s': [['HKVariantsRevPhrases', 'HKVariantsRev'], ['TSPhrases', 'TSCharacters']],
+    't2tw': [['TWVariants']],
+    'tw2t': [['TWVariantsRevPhrases', 'TWVariantsRev']],
+    't2twp': [['TWPhrases'], ['TWVariants']],
+    'tw2tp': [['TWVariantsRevPhrases', 'TWVariantsRev'], ['TWPhrasesRev']],
+    't2hk': [['HKVariants']],
+    'hk2t': [['HKVariantsRevPhrases', 'HKVariantsRev']],
+    't2jp': [['JPVariants']],
+    'jp2t': [['JPShinjitaiPhrases', 'JPShinjitaiCharacters', 'JPVariantsRev']],
+}
+
+# Newer OpenCC releases split TWPhrases into several files
+DICT_PARTS = {
+    'TWPhrases': ('TWPhrasesIT', 'TWPhrasesName', 'TWPhrasesOther'),
+}
+
+# OpenCC .txt dictionary names -> names in BUNDLED_DICTIONARY
+BUNDLED_NAMES = {
+    'STCharacters': 'st_characters',
+    'STPhrases': 'st_phrases',
+    'TSCharacters': 'ts_characters',
+    'TSPhrases': 'ts_phrases',
+    'TWPhrases': 'tw_phrases',
+    'TWPhrasesRev': 'tw_phrases_rev',
+    'TWVariants': 'tw_variants',
+    'TWVariantsRev': 'tw_variants_rev',
+    'TWVariantsRevPhrases': 'tw_variants_rev_phrases',
+    'HKVariants': 'hk_variants',
+    'HKVariantsRev': 'hk_variants_rev',
+    'HKVariantsRevPhrases': 'hk_variants_rev_phrases',
+    'JPShinjitaiCharacters': 'jps_characters',
+    'JPShinjitaiPhrases': 'jps_phrases',
+    'JPVariants': 'jp_variants',
+    'JPVariantsRev': 'jp_variants_rev',
+}
+
+# The native library cuts text at these characters before matching, so phrases containing one never match
+DELIMITERS = frozenset(" \t\n\r(){}[]<>\"'\\/|-,.?!*:;@#$%^&_+=　，。、；：？！…“”‘’『』「」﹁﹂—－（）《》〈〉～．／＼︒︑︔︓"
+                       "︿﹀︹︺︙︐［﹇］﹈︕︖︰︳︴︽︾︵︶｛︷｝︸﹃﹄【︻】︼")
+
+# The native library's punctuation table: exactly these quote pairs
+PUNCTUATION = {
+    's': str.maketrans({'“': '「', '”': '」', '‘': '『', '’': '』'}),
+    't': str.maketrans({'「': '“', '」': '”', '『': '‘', '』': '’'}),
+}
+
+# Bumped whenever the compiled table layout changes, invalidating cached tables
+_CACHE_VERSION = 3
+# Removed before zho_check samples a text, as in the native library
+_ZHO_CHECK_STRIP = re.compile(r"[!-/:-@\[-`{-~\t\n\v\f\r 0-9A-Za-z_]")
+# UTF-8 bytes of the stripped text sampled by zho_check
+ZHO_CHECK_BYTES = 200
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def dict_dirs():
+    """Directories searched for .txt dictionaries, in order; the bundled dictionary comes after the first group."""
+    return _env_dirs() + DICT_DIRS
+
+
+def _env_dirs():
+    extra = os.environ.get('OPENCC_RS_DICT_DIR')
+    return [d for d in extra.split(os.pathsep) if d] if extra else []
+
+
+def cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'opencc_rs')
+
+
+def _find_dict(name, directories):
+    for directory in directories:
+        path = os.path.join(directory, name + '.txt')
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _txt_sources(name, directories):
+    # [(path, reversed, None)] making up dictionary `name` from .txt files in `directories`, or None; a missing *Rev
+    # dictionary is derived from the forward one
+    path = _find_dict(name, directories)
+    if path is not None:
+        return [(path, False, None)]
+    if name in DICT_PARTS:
+        paths = [_find_dict(part, directories) for part in DICT_PARTS[name]]
+        if all(paths):
+            return [(p, False, None) for p in paths]
+    if name.endswith('Rev'):
+        path = _find_dict(name[:-3], directories)
+        if path is not None:
+            return [(path, True, None)]
+    return None
+
+
+def _dict_sources(name):
+    """[(path, reversed, bundled name or None)] making up dictionary `name`: .txt files or the bundled dictionary."""
+    sources = _txt_sources(name, _env_dirs())
+    if sources is None and os.path.isfile(BUNDLED_DICTIONARY):
+        sources = [(BUNDLED_DICTIONARY, False, BUNDLED_NAMES[name])]
+    if sources is None:
+        sources = _txt_sources(name, DICT_DIRS)
+    if sources is None:
+        raise FileNotFoundError(f"OpenCC dictionary {name} not found: {BUNDLED_DICTIONARY} is missing and no "
+                                f"{name}.txt in {', '.join(dict_dirs())}; set OPENCC_RS_DICT_DIR to a directory of "
+                                f"OpenCC .txt dictionaries")
+    return sources
+
+
+def _read_dict(path, reverse, mapping):
+    # One "key<TAB>value [alternatives ...]" per line; the first value wins, as does the first dictionary of a group
+    with io.open(path, encoding='utf-8') as f:
+        for line in f:
+            key, sep, values = line.rstrip('\r\n').partition('\t')
+            if not sep or not key:
+                continue
+            values = values.split()
+            if not values:
+                continue
+            if reverse:
+                for value in values:
+                    mapping.setdefault(value, key)
+            else:
+                mapping.setdefault(key, values[0])
+
+
+def _read_bundled(path, name, mapping):
+    with io.open(path, encoding='utf-8') as f:
+        phrases = json.load(f)[name][0]
+    for key, value in phrases.items():
+        mapping.setdefault(key, value)
+
+
+def _compile(names, sources):
+    """
+    (phrase -> replacement, first two characters -> lengths of the longer phrases starting with them, longest first)
+    for a group of dictionaries: a flattened trie, so matching at a position only tries lengths that exist there.
+    """
+    stamp = repr([_CACHE_VERSION] + [(path, reverse, bundled, os.stat(path).st_mtime_ns, os.stat(path).st_size)
+                                     for path, reverse, bundled in sources])
+    cache_path = os.path.join(cache_dir(), f"{'-'.join(names)}-{hashlib.sha1(stamp.encode()).hexdigest()[:16]}"
+                                           f".marshal")
+    try:
+        # One read, then loads: marshal.load on a file object reads it piecemeal and is several times slower
+        with open(cache_path, 'rb') as f:
+            return marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    mapping = {}
+    for path, reverse, bundled in sources:
+        if bundled is None:
+            _read_dict(path, reverse, mapping)
+        else:
+            _read_bundled(path, bundled, mapping)
+    mapping = {key: value for key, value in mapping.items() if len(key) == 1 or DELIMITERS.isdisjoint(key)}
+    lengths = {}
+    for key in mapping:
+        if len(key) > 1:
+            lengths.setdefault(key[:2], set()).add(len(key))
+    table = (mapping, {prefix: tuple(sorted(found, reverse=True)) for prefix, found in lengths.items()})
+
+    try:
+        os.makedirs(cache_dir(), exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(marshal.dumps(table))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass
+    return table
+
+
+def _char_class(chars):
+    # Regex character class body for `chars`, with consecutive code points collapsed into ranges
+    codes = sorted(ord(c) for c in chars)
+    parts = []
+    i = 0
+    while i < len(codes):
+        j = i
+        while j + 1 < len(codes) and codes[j + 1] == codes[j] + 1:
+            j += 1
+        parts.append(re.escape(chr(codes[i])) + ('-' + re.escape(chr(codes[j])) if j > i else ''))
+        i = j + 1
+    return ''.join(parts)
+
+
+def load_stage(names):
+    """Compiled table of a dictionary group, built once per process (and cached on disk across processes)."""
+    # Keyed by where the dictionaries were found too, which OPENCC_RS_DICT_DIR can change
+    sources = tuple(source for name in names for source in _dict_sources(name))
+    key = (tuple(names), sources)
+    table = _tables.get(key)
+    if table is None:
+        with _tables_lock:
+            table = _tables.get(key)
+            if table is None:
+                mapping, lengths = _compile(names, sources)
+                # Runs of characters that start no phrase are copied in one slice
+                starts = {key[0] for key in mapping}
+                skip = re.compile(f"[^{_char_class(starts)}]+") if starts else re.compile('.+', re.S)
+                table = _tables[key] = (mapping, lengths, skip)
+    return table
+
+
+def convert_stage(text, table):
+    """Forward maximum matching of `text` against one compiled dictionary group."""
+    mapping, lengths, skip = table
+    get = mapping.get
+    out = []
+    append = out.append
+    i = 0
+    n = len(text)
+    while i < n:
+        replacement = None
+        candidates = lengths.get(text[i:i + 2])
+        if candidates is not None:
+            for length in candidates:
+                replacement = get(text[i:i + length])
+                if replacement is not None:
+                    break
+        if replacement is None:
+            length = 1
+            replacement = get(text[i])
+            if replacement is None:
+                match = skip.match(text, i)
+                end = match.end() if match else i + 1
+                append(text[i:end])
+                i = end
+                continue
+        append(replacement)
+        i += length
+    return ''.join(out)
+
+
+class PureOpenCC:
+    """
+    The OpenCC interface in pure Python, over the dictionaries bundled from the native library (or OpenCC's own .txt
+    dictionaries); used by OpenCC when the native library cannot be loaded. Slower than the native converter.
+    """
+
+    def __init__(self, config=None):
+        self.config = config if config in CONFIG_CHAINS else "s2t"
+        self._stages = None
+        # Fail here rather than on the first conversion if a dictionary is missing
+        for names in CONFIG_CHAINS[self.config]:
+            for name in names:
+                _dict_sources(name)
+
+    def _load(self):
+        if self._stages is None:
+            self._stages = [load_stage(names) for names in CONFIG_CHAINS[self.config]]
+        return self._stages
+
+    def convert(self, text, punctuation=False):
+        for table in self._load():
+            text = convert_stage(text, table)
+        if punctuation:
+            text = text.translate(PUNCTUATION['s' if self.config[0] == 's' else 't'])
+        return text
+
+    def convert_many(self, texts, punctuation=False, batch_size=1000):
+        return [self.convert(text, punctuation) for text in texts]
+
+    def convert_file(self, path_in, path_out, punctuation=False, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Convert the UTF-8 file `path_in` into `path_out` (which may be `path_in`) in bounded chunks, keeping line
+        endings; returns (bytes read, bytes written).
+        """
+        from .fileio import open_output, same_file
+        size = os.path.getsize(path_in)
+        written = 0
+        with io.open(path_in, encoding='utf-8', newline='') as fin, \
+                open_output(path_out, 'w', same_file(path_in, path_out), close_first=(fin,), encoding='utf-8',
+                            newline='') as fout:
+            for chunk in iter_safe_chunks(fin, chunk_size):
+                output = self.convert(chunk, punctuation)
+                fout.write(output)
+                written += len(output.encode('utf-8'))
+        return size, written
+
+    def zho_check(self, text):
+        """1 for zh-Hant, 2 for zh-Hans, 0 otherwise, judged from the start of `text` without ASCII, as natively."""
+        # Strip a growing prefix rather than the whole text, until it leaves enough to sample
+        window = ZHO_CHECK_BYTES
+        while True:
+            stripped = _ZHO_CHECK_STRIP.sub('', text[:window])
+            if len(stripped) >= ZHO_CHECK_BYTES or window >= len(text):
+                break
+            window *= 4
+        sample = stripped.encode('utf-8')[:ZHO_CHECK_BYTES].decode('utf-8', errors='ignore')
+        if not sample:
+            return 0
+        if PureOpenCC('t2s').convert(sample) != sample:
+            return 1
+        if PureOpenCC('s2t').convert(sample) != sample:
+            return 2
+        return 0
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
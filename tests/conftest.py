@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True, scope='session')
+def cache_home(tmp_path_factory):
+    # Compiled dictionary tables go to a scratch directory rather than the user's ~/.cache
+    previous = os.environ.get('XDG_CACHE_HOME')
+    os.environ['XDG_CACHE_HOME'] = str(tmp_path_factory.mktemp('cache'))
+    yield os.environ['XDG_CACHE_HOME']
+    if previous is None:
+        del os.environ['XDG_CACHE_HOME']
+    else:
+        os.environ['XDG_CACHE_HOME'] = previous
+
+
+@pytest.fixture
+def no_native(monkeypatch):
+    """OpenCC in this process converts with the pure-Python engine, as when the native library cannot be loaded."""
+    monkeypatch.setattr('opencc_rs.opencc_rs.native_available', lambda: False)
+
+
+@pytest.fixture(scope='session')
+def stub_library(tmp_path_factory):
+    """The benchmark stub of both native libraries, built once per session."""
+    from benchmarks.stub import build_stub
+    try:
+        return build_stub(str(tmp_path_factory.mktemp('stub')))
+    except (OSError, subprocess.CalledProcessError) as e:
+        pytest.skip(f"cannot build the stub library: {e}")
+
+
+@pytest.fixture
+def run_cli(stub_library):
+    """run_cli(package, *args): `python -m package args` on the stub library; returns the CompletedProcess."""
+    from benchmarks.stub import STUB_ENV_VARS
+    env = dict(os.environ, **{var: stub_library for var in STUB_ENV_VARS})
+
+    def run(package, *args, stdin=None):
+        return subprocess.run([sys.executable, '-m', package, *map(str, args)], input=stdin, env=env, cwd=ROOT,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    return run
@@ -0,0 +1,27 @@
+from opencc_jieba_rs import cache as jieba_cache
+from opencc_rs import cache as rs_cache
+
+TEXT = "汉语" * 1024
+
+
+def test_packages_sharing_a_directory_keep_separate_entries(tmp_path):
+    rs = rs_cache.ConversionCache(str(tmp_path))
+    jieba = jieba_cache.ConversionCache(str(tmp_path))
+    try:
+        assert rs.path == jieba.path
+        rs.put(rs.key('s2t', False, TEXT), "opencc_rs output")
+        assert jieba.get(jieba.key('s2t', False, TEXT)) is None
+        jieba.put(jieba.key('s2t', False, TEXT), "opencc_jieba_rs output")
+        assert rs.get(rs.key('s2t', False, TEXT)) == "opencc_rs output"
+        assert jieba.get(jieba.key('s2t', False, TEXT)) == "opencc_jieba_rs output"
+    finally:
+        rs.close()
+        jieba.close()
+
+
+def test_key_depends_on_config_punctuation_and_version(monkeypatch):
+    key = rs_cache.ConversionCache.key('s2t', False, TEXT)
+    assert key != rs_cache.ConversionCache.key('s2tw', False, TEXT)
+    assert key != rs_cache.ConversionCache.key('s2t', True, TEXT)
+    monkeypatch.setattr(rs_cache, 'ENGINE', f"opencc_rs/{rs_cache.CACHE_VERSION + 1}")
+    assert key != rs_cache.ConversionCache.key('s2t', False, TEXT)
@@ -0,0 +1,88 @@
+import os
+import stat
+
+import pytest
+
+ENGINES = ['opencc_rs', 'opencc_jieba_rs']
+
+SRT = ("1\r\n00:00:01,000 --> 00:00:02,000\r\n这个汉语\r\n\r\n"
+       "2\r\n00:00:03,000 --> 00:00:04,000\r\n<i>简体</i>\r\n\r\n")
+# What the stub library makes of SRT's dialogue with s2t
+SRT_S2T = SRT.replace("这个汉语", "這個漢語").replace("简体", "簡體")
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_subtitle_file_converted_onto_itself(engine, run_cli, tmp_path):
+    path = tmp_path / 'episode.srt'
+    path.write_bytes(SRT.encode('utf-8'))
+    os.chmod(path, 0o640)
+    run_cli(engine, '-i', path, '-o', path, '-c', 's2t')
+    assert path.read_bytes() == SRT_S2T.encode('utf-8')
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    assert os.listdir(tmp_path) == ['episode.srt']
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_stream_converted_onto_itself(engine, run_cli, tmp_path):
+    path = tmp_path / 'book.txt'
+    path.write_text("这个汉语。\n" * 5000, encoding='utf-8')
+    run_cli(engine, '-i', path, '-o', path, '-c', 's2t', '--stream', '--chunk-size', 1000)
+    assert path.read_text(encoding='utf-8') == "這個漢語。\n" * 5000
+    assert os.listdir(tmp_path) == ['book.txt']
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_file_converted_onto_itself(engine, run_cli, tmp_path):
+    path = tmp_path / 'book.txt'
+    path.write_text("这个汉语。\n" * 5000, encoding='utf-8')
+    run_cli(engine, '-i', path, '-o', path, '-c', 's2t')
+    assert path.read_text(encoding='utf-8') == "這個漢語。\n" * 5000
+    assert os.listdir(tmp_path) == ['book.txt']
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason="open files are listed from /proc")
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('extra', [['--format', 'plain'], ['--format', 'plain', '--stream'], ['--format', 'srt']],
+                         ids=['convert_file', 'stream', 'subtitle'])
+def test_input_closed_before_it_is_replaced(engine, extra, run_cli, tmp_path):
+    # Windows cannot replace a file that is still open, which tests.windows_replace makes os.replace check
+    path = tmp_path / 'episode.srt'
+    path.write_bytes(SRT.encode('utf-8'))
+    run_cli('tests.windows_replace', engine, '-i', path, '-o', path, '-c', 's2t', *extra)
+    assert path.read_bytes() == SRT_S2T.encode('utf-8')
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason="open files are listed from /proc")
+def test_pure_input_closed_before_it_is_replaced(no_native, monkeypatch, tmp_path):
+    from opencc_rs import OpenCC
+    from tests import windows_replace
+    monkeypatch.setattr(os, 'replace', windows_replace.replace)
+    path = tmp_path / 'book.txt'
+    path.write_bytes("汉语\r\n".encode('utf-8') * 3)
+    OpenCC('s2t').convert_file(str(path), str(path), chunk_size=4)
+    assert path.read_bytes() == "漢語\r\n".encode('utf-8') * 3
+
+
+def test_pure_convert_file_onto_itself(no_native, tmp_path):
+    from opencc_rs import OpenCC
+    path = tmp_path / 'book.txt'
+    path.write_bytes("汉语\r\n".encode('utf-8') * 3)
+    assert OpenCC('s2t').convert_file(str(path), str(path), chunk_size=4) == (24, 24)
+    assert path.read_bytes() == "漢語\r\n".encode('utf-8') * 3
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_line_endings_kept_on_every_path(engine, run_cli, tmp_path):
+    text = "这个汉语\r\n简体\n学\r\n"
+    expected = "這個漢語\r\n簡體\n學\r\n".encode('utf-8')
+    source = tmp_path / 'input.txt'
+    source.write_bytes(text.encode('utf-8'))
+    outputs = {}
+    for label, extra in (('convert_file', []), ('stream', ['--stream']), ('cache', ['--cache', tmp_path / 'cache']),
+                         ('gbk', ['--out-enc', 'GBK'])):
+        output = tmp_path / f'{label}.txt'
+        run_cli(engine, '-i', source, '-o', output, '-c', 's2t', *extra)
+        outputs[label] = output.read_bytes()
+    outputs['gbk'] = outputs['gbk'].decode('gbk').encode('utf-8')
+    outputs['stdio'] = run_cli(engine, '-c', 's2t', stdin=source.read_bytes()).stdout
+    assert outputs == dict.fromkeys(outputs, expected)
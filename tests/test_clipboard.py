@@ -0,0 +1,78 @@
+import sys
+import time
+
+from clipboard_backends import ClipboardBackend, ClipboardError, CommandClipboard
+from watch_clipboard import ClipboardWatcher
+
+# Prints one line per clipboard change, as wl-paste --watch does through its command, then stays running
+WATCH = [sys.executable, "-c", "import sys, time; print(); print(); sys.stdout.flush(); time.sleep(60)"]
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_change_count_comes_from_one_long_running_watch_process():
+    clipboard = CommandClipboard("fake", ["true"], ["true"], WATCH)
+    try:
+        assert wait_for(lambda: clipboard.change_count() == 2)
+        watcher = clipboard._watcher
+        clipboard.change_count()
+        assert clipboard._watcher is watcher
+    finally:
+        clipboard.close()
+    assert watcher.returncode is not None
+
+
+def test_change_count_is_unknown_without_a_working_watch_command():
+    assert CommandClipboard("fake", ["true"], ["true"]).change_count() is None
+    assert CommandClipboard("fake", ["true"], ["true"], ["no-such-clipboard-watcher"]).change_count() is None
+    exited = CommandClipboard("fake", ["true"], ["true"], [sys.executable, "-c", "pass"])
+    assert wait_for(lambda: exited.change_count() is None)
+
+
+def test_idle_polls_start_no_process(tmp_path):
+    reads = tmp_path / "reads"
+    get_command = [sys.executable, "-c", f"open({str(reads)!r}, 'a').write('.'); print('hello', end='')"]
+    watch_command = [sys.executable, "-c", "import time; time.sleep(60)"]
+    clipboard = CommandClipboard("fake", get_command, ["true"], watch_command)
+    try:
+        watcher = ClipboardWatcher(clipboard)
+        watcher.start()
+        for _ in range(5):
+            watcher.poll()
+        assert reads.read_text() == "."
+    finally:
+        clipboard.close()
+
+
+class LockedClipboard(ClipboardBackend):
+    name = "locked"
+
+    def __init__(self):
+        self.text = None
+
+    def get_text(self):
+        if self.text is None:
+            raise ClipboardError("locked: clipboard is in use")
+        return self.text
+
+    def set_text(self, text):
+        self.text = text
+
+
+def test_unreadable_clipboard_at_start_is_logged_and_polled_again():
+    clipboard = LockedClipboard()
+    messages = []
+    watcher = ClipboardWatcher(clipboard, debounce=0, log=messages.append)
+    watcher.start()
+    assert messages == ["Error reading clipboard: locked: clipboard is in use"]
+    assert watcher.poll() > 0
+    clipboard.text = "汉语"
+    watcher.poll()
+    watcher.poll()
+    assert watcher.conversions == 1
+    assert clipboard.text == "漢語"
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from opencc_jieba_rs import corpus
+
+
+class CharacterKeywords:
+    """Stands in for the jieba handle in the worker: a document's keywords are its first characters."""
+
+    def jieba_keyword_extract_tfidf(self, text, top_k):
+        return list(text[:top_k])
+
+
+def collect(paths, **kwargs):
+    errors = []
+    documents = list(corpus.iter_documents([str(path) for path in paths],
+                                           on_error=lambda doc_id, error: errors.append((doc_id, error)), **kwargs))
+    return documents, errors
+
+
+def write_jsonl(path, lines):
+    path.write_text("".join(line + "\n" for line in lines), encoding='utf-8')
+    return path
+
+
+def test_malformed_json_line_is_reported(tmp_path):
+    path = write_jsonl(tmp_path / 'docs.jsonl', ['{"id": 1, "text": "一"}', '{"id": 2, "text": ',
+                                                  '{"id": 3, "text": "三"}'])
+    documents, errors = collect([path])
+    assert documents == [(1, "一"), (3, "三")]
+    assert [doc_id for doc_id, _ in errors] == [f"{path}:2"]
+
+
+def test_non_object_line_is_reported(tmp_path):
+    path = write_jsonl(tmp_path / 'docs.jsonl', ['["not", "an", "object"]', '"text"', '{"id": "a", "text": "甲"}'])
+    documents, errors = collect([path])
+    assert documents == [("a", "甲")]
+    assert [doc_id for doc_id, _ in errors] == [f"{path}:1", f"{path}:2"]
+    assert "JSON object" in errors[0][1]
+
+
+def test_non_string_text_is_reported(tmp_path):
+    path = write_jsonl(tmp_path / 'docs.jsonl', [json.dumps({'id': 'n', 'text': 42}),
+                                                  json.dumps({'id': 'l', 'text': ["一"]}),
+                                                  json.dumps({'id': 'none'}),
+                                                  json.dumps({'id': 's', 'text': "字"})])
+    documents, errors = collect([path])
+    assert documents == [('none', ''), ('s', "字")]
+    assert [doc_id for doc_id, _ in errors] == ['n', 'l']
+
+
+def test_undecodable_file_in_directory_is_reported(tmp_path):
+    (tmp_path / 'good.txt').write_text("好", encoding='utf-8')
+    (tmp_path / 'bad.txt').write_bytes("壞".encode('big5'))
+    write_jsonl(tmp_path / 'lines.jsonl', ['{"id": "j", "text": "行"}'])
+    (tmp_path / 'bad.jsonl').write_bytes(b'{"id": "x", "text": "\xff\xfe"}\n')
+    documents, errors = collect([tmp_path])
+    assert sorted(documents, key=str) == sorted([(str(tmp_path / 'good.txt'), "好"), ("j", "行")], key=str)
+    assert sorted(doc_id for doc_id, _ in errors) == sorted([str(tmp_path / 'bad.txt'), str(tmp_path / 'bad.jsonl')])
+
+
+def test_errors_raise_without_on_error(tmp_path):
+    path = write_jsonl(tmp_path / 'docs.jsonl', ['{"id": 1, '])
+    with pytest.raises(ValueError):
+        list(corpus.iter_documents([str(path)]))
+
+
+def test_worker_reports_bad_documents_and_keeps_the_rest(monkeypatch):
+    monkeypatch.setattr(corpus, 'OpenCC', CharacterKeywords)
+    errors = []
+    documents = [('ok', "乙甲"), ('number', 7), ('none', None), ('also ok', "丙")]
+    results = list(corpus.extract_keywords(documents, top_k=5, jobs=1,
+                                           on_error=lambda doc_id, error: errors.append(doc_id)))
+    assert results == [('ok', ["乙", "甲"], None), ('also ok', ["丙"], None)]
+    assert errors == ['number', 'none']
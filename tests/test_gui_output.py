@@ -0,0 +1,38 @@
+import pytest
+
+import main
+import main_window
+
+
+class FakeText:
+    """The part of tk.Text output_text() uses; Tk keeps a newline of its own after the inserted text."""
+
+    def __init__(self, text):
+        self.content = text + "\n"
+
+    def get(self, start, end):
+        assert (start, end) == ("1.0", "end-1c")
+        return self.content[:-1]
+
+
+def gui_output(front_end, inserted):
+    textbox = FakeText(inserted)
+    if front_end == 'main':
+        return main.output_text(textbox)
+    app = main_window.ZhoTkApp.__new__(main_window.ZhoTkApp)
+    app.buffers = {}
+    app.destination_textbox = textbox
+    return app.output_text()
+
+
+@pytest.mark.parametrize('front_end', ['main', 'main_window'])
+@pytest.mark.parametrize('inserted, expected', [
+    # A Convert result of the widget's text, and live output, end with one newline of their own
+    ("漢語\n", "漢語"),
+    ("漢語\n\n", "漢語\n"),
+    # Converted while the source was still being loaded: its text as read, with no newline added
+    ("漢語", "漢語"),
+    ("", ""),
+])
+def test_output_keeps_the_last_character(front_end, inserted, expected):
+    assert gui_output(front_end, inserted) == expected
@@ -0,0 +1,36 @@
+import tkinter as tk
+
+import main
+
+
+class FakeWidget:
+    """Records its state, and runs after() callbacks when the test calls run_pending()."""
+
+    def __init__(self):
+        self.state = tk.NORMAL
+        self.pending = []
+
+    def config(self, state=None, text=None):
+        if state is not None:
+            self.state = state
+
+    def after(self, ms, callback, *args):
+        self.pending.append((callback, args))
+
+    def run_pending(self):
+        callbacks, self.pending = self.pending, []
+        for callback, args in callbacks:
+            callback(*args)
+
+
+def test_open_file_is_disabled_while_a_task_runs(monkeypatch):
+    monkeypatch.setattr(main, '_task', None)
+    convert_button, openfile_button, cancel_button, progress_label = (FakeWidget() for _ in range(4))
+    results = []
+    main.start_task(iter([(2, "漢語")]), 2, "Converting", results.append, convert_button, openfile_button,
+                    cancel_button, progress_label)
+    assert (convert_button.state, openfile_button.state, cancel_button.state) == (tk.DISABLED, tk.DISABLED, tk.NORMAL)
+    while progress_label.pending:
+        progress_label.run_pending()
+    assert results == ["漢語"]
+    assert (convert_button.state, openfile_button.state, cancel_button.state) == (tk.NORMAL, tk.NORMAL, tk.DISABLED)
@@ -0,0 +1,33 @@
+import importlib
+
+import pytest
+
+TEXT = "这个汉语。\n" * 20000
+
+
+@pytest.fixture(params=['opencc_rs.opencc_rs', 'opencc_jieba_rs.opencc_jieba_rs'])
+def module(request):
+    return importlib.import_module(request.param)
+
+
+def converting(module, monkeypatch, **kwargs):
+    """An OpenCC whose pieces convert to themselves without the native library; returns (instance, pieces seen)."""
+    cc = module.OpenCC('s2t', **kwargs)
+    pieces = []
+    monkeypatch.setattr(cc, '_convert', lambda text, punctuation=False: pieces.append(text) or text)
+    return cc, pieces
+
+
+def test_parallel_conversion_leaves_a_shared_pool_its_size(module, monkeypatch):
+    pool = module.HandlePool(object, lambda handle: None, size=2)
+    cc, pieces = converting(module, monkeypatch, pool=pool)
+    assert cc._convert_parallel(TEXT, False, 8) == TEXT
+    assert pool.size == 2
+    assert len(pieces) == 2
+
+
+def test_parallel_conversion_grows_an_own_pool(module, monkeypatch):
+    cc, pieces = converting(module, monkeypatch)
+    assert cc._convert_parallel(TEXT, False, 8) == TEXT
+    assert cc._pool.size == 8
+    assert len(pieces) == 8
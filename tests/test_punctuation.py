@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+import zho_helper
+from opencc_rs import OpenCC, opencc_rs
+from opencc_rs.pure_opencc import PUNCTUATION
+
+# The native library's punctuation table (opencc_convert with punctuation=True); "t" configs apply it reversed
+NATIVE_PUNCTUATION = {'“': '「', '”': '」', '‘': '『', '’': '』'}
+
+DIRECTIONS = {
+    's': ('s2t', NATIVE_PUNCTUATION),
+    't': ('t2s', {value: key for key, value in NATIVE_PUNCTUATION.items()}),
+}
+
+
+@pytest.mark.parametrize('direction', sorted(DIRECTIONS))
+def test_pure_engine_matches_native_table(direction):
+    assert PUNCTUATION[direction] == str.maketrans(DIRECTIONS[direction][1])
+
+
+@pytest.mark.parametrize('direction', sorted(DIRECTIONS))
+def test_zho_helper_covers_native_table(direction):
+    config, native = DIRECTIONS[direction]
+    mapping = zho_helper.PUNCTUATION_MAPS[direction]
+    assert {key: mapping.get(key) for key in native} == native
+    text = "".join(mapping) + "汉語"
+    assert zho_helper.convert_punctuation(text, config) == text.translate(str.maketrans(mapping))
+
+
+@pytest.mark.parametrize('direction', sorted(DIRECTIONS))
+def test_native_library_uses_the_table(direction):
+    if os.environ.get('OPENCC_RS_LIBRARY') or not opencc_rs.native_available():
+        pytest.skip("needs the native library shipped for this platform")
+    config, native = DIRECTIONS[direction]
+    # Every key and value of both directions, so a native mapping missing from the table shows up too
+    text = "".join(NATIVE_PUNCTUATION) + "".join(NATIVE_PUNCTUATION.values())
+    with OpenCC(config) as converter:
+        expected = converter.convert(text)
+        assert converter.convert(text, punctuation=True) == expected.translate(str.maketrans(native))
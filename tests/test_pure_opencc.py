@@ -0,0 +1,135 @@
+import os
+
+import pytest
+
+from opencc_rs import OpenCC, opencc_rs, pure_opencc
+from opencc_rs.pure_opencc import CONFIG_CHAINS, PureOpenCC
+
+# zh-Hans phrases, a phrase the native library never matches because a delimiter cuts it, zh-Hant variants,
+# and Japanese shinjitai
+CORPUS = (
+    "这个软件里的鼠标和内存，信息技术后来发展得很快。",
+    "乔治．布希说：“着群里的面条不够吃。”",
+    "後來發了頭髮，學校裏的台灣人說「著作」。",
+    "亜黒国の発見と沖縄県。",
+)
+
+# CORPUS converted with the bundled dictionaries; test_parity_with_native checks the native library agrees
+EXPECTED = {
+    's2t': ("這個軟件裏的鼠標和內存，信息技術後來發展得很快。", "喬治．布希說：“着羣裏的麪條不夠吃。”",
+            "後來發了頭髮，學校裏的臺灣人說「著作」。", "亜黒國の発見と沖縄県。"),
+    't2s': ("这个软件里的鼠标和内存，信息技术后来发展得很快。", "乔治．布希说：“着群里的面条不够吃。”",
+            "后来发了头发，学校里的台湾人说「著作」。", "亜黒国の発见と冲縄県。"),
+    's2tw': ("這個軟件裡的鼠標和內存，信息技術後來發展得很快。", "喬治．布希說：“著群裡的麵條不夠吃。”",
+             "後來發了頭髮，學校裡的臺灣人說「著作」。", "亜黒國の発見と沖縄県。"),
+    'tw2s': ("这个软件里的鼠标和内存，信息技术后来发展得很快。", "乔治．布希说：“着群里的面条不够吃。”",
+             "后来发了头发，学校里的台湾人说「著作」。", "亜黒国の発见と冲縄県。"),
+    's2twp': ("這個軟體裡的滑鼠和記憶體，資訊科技後來發展得很快。", "喬治．布希說：“著群裡的麵條不夠吃。”",
+              "後來發了頭髮，學校裡的臺灣人說「著作」。", "亜黒國の発見と沖縄県。"),
+    'tw2sp': ("这个软件里的鼠标和内存，信息技术后来发展得很快。", "乔治．布希说：“着群里的面条不够吃。”",
+              "后来发了头发，学校里的台湾人说「著作」。", "亜黒国の発见と冲縄県。"),
+    's2hk': ("這個軟件裏的鼠標和內存，信息技術後來發展得很快。", "喬治．布希説：“着羣裏的麪條不夠吃。”",
+             "後來發了頭髮，學校裏的台灣人説「著作」。", "亜黒國の発見と沖縄県。"),
+    'hk2s': ("这个软件里的鼠标和内存，信息技术后来发展得很快。", "乔治．布希说：“着群里的面条不够吃。”",
+             "后来发了头发，学校里的台湾人说「著作」。", "亜黒国の発见と冲縄県。"),
+    't2tw': ("这个软件里的鼠标和内存，信息技术后来发展得很快。", "乔治．布希说：“著群里的面条不够吃。”",
+             "後來發了頭髮，學校裡的台灣人說「著作」。", "亜黒国の発見と沖縄県。"),
+    'tw2t': ("这个软件里的鼠标和内存，信息技术后来发展得很快。", "乔治．布希说：“着羣里的面条不够喫。”",
+             "後來發了頭髮，學校裏的台灣人說「著作」。", "亜黒国の発見と沖縄県。"),
+    't2twp': ("这个软件里的鼠标和内存，資訊技术后来发展得很快。", "乔治．布希说：“著群里的面条不够吃。”",
+              "後來發了頭髮，學校裡的台灣人說「著作」。", "亜黒国の発見と沖縄県。"),
+    'tw2tp': ("这个软件里的鼠标和内存，信息技术后来发展得很快。", "乔治．布希说：“着羣里的面条不够喫。”",
+              "後來發了頭髮，學校裏的台灣人說「著作」。", "亜黒国の発見と沖縄県。"),
+    't2hk': ("这个软件里的鼠标和内存，信息技术后来发展得很快。", "乔治．布希说：“着群里的面条不够吃。”",
+             "後來發了頭髮，學校裏的台灣人説「著作」。", "亜黒国の発見と沖縄県。"),
+    'hk2t': ("这个软件里的鼠标和内存，信息技术后来发展得很快。", "乔治．布希说：“着群里的面条不够喫。”",
+             "後來發了頭髮，學校裏的臺灣人說「著作」。", "亜黒国の発見と沖縄県。"),
+    't2jp': ("这个软件里的鼠标和内存，信息技术后来发展得很快。", "乔治．布希说：“着群里的面条不够吃。”",
+             "後来発了頭髪，学校裏的台湾人説「著作」。", "亜黒国の発見と沖縄県。"),
+    'jp2t': ("这个软件里的鼠标和內存，信息技术后來发展得很快。", "乔治．布希说：“着羣里的面條不够吃。”",
+             "後來發了頭髮，學校裏的台灣人說「著作」。", "亞黑國の發見と沖繩縣。"),
+}
+
+ZHO_CHECK_CASES = [
+    ("汉语", 2),
+    ("漢語", 1),
+    ("hello, world 123", 0),
+    ("", 0),
+    ("a" * 10000 + "漢語", 1),
+]
+
+
+def native_converter(config):
+    if os.environ.get('OPENCC_RS_LIBRARY') or not opencc_rs.native_available():
+        pytest.skip("needs the native library shipped for this platform")
+    return OpenCC(config)
+
+
+@pytest.mark.parametrize('config', sorted(CONFIG_CHAINS))
+def test_expected_output(config):
+    converter = PureOpenCC(config)
+    assert tuple(converter.convert(line) for line in CORPUS) == EXPECTED[config]
+
+
+@pytest.mark.parametrize('config', sorted(CONFIG_CHAINS))
+def test_parity_with_native(config):
+    with native_converter(config) as native:
+        pure = PureOpenCC(config)
+        for line in CORPUS:
+            assert pure.convert(line) == native.convert(line)
+            assert pure.convert(line, punctuation=True) == native.convert(line, punctuation=True)
+        text = "\n".join(CORPUS)
+        assert pure.convert(text) == native.convert(text)
+
+
+@pytest.mark.parametrize('text, code', ZHO_CHECK_CASES)
+def test_zho_check(text, code):
+    assert PureOpenCC().zho_check(text) == code
+
+
+@pytest.mark.parametrize('text, code', ZHO_CHECK_CASES)
+def test_zho_check_parity_with_native(text, code):
+    with native_converter('s2t') as native:
+        assert PureOpenCC().zho_check(text) == native.zho_check(text) == code
+
+
+def test_punctuation():
+    assert PureOpenCC('s2t').convert("“汉”‘语’", punctuation=True) == "「漢」『語』"
+    assert PureOpenCC('t2s').convert("「漢」『語』", punctuation=True) == "“汉”‘语’"
+
+
+def test_fallback_follows_config_changes(no_native):
+    converter = OpenCC('s2t')
+    assert converter.convert("汉") == "漢"
+    converter.config = 't2s'
+    assert converter.convert("漢") == "汉"
+    assert converter.zho_check("漢語") == 1
+
+
+def test_text_dictionaries_override_bundled(monkeypatch, tmp_path):
+    (tmp_path / 'STPhrases.txt').write_text("测试\t測試X\n", encoding='utf-8')
+    (tmp_path / 'STCharacters.txt').write_text("测\t測\n试\t試 试\n", encoding='utf-8')
+    monkeypatch.setenv('OPENCC_RS_DICT_DIR', str(tmp_path))
+    assert PureOpenCC('s2t').convert("测试测汉") == "測試X測汉"
+
+
+def test_missing_dictionaries_reported_on_construction(monkeypatch, tmp_path):
+    monkeypatch.delenv('OPENCC_RS_DICT_DIR', raising=False)
+    monkeypatch.setattr(pure_opencc, 'BUNDLED_DICTIONARY', str(tmp_path / 'missing.json'))
+    monkeypatch.setattr(pure_opencc, 'DICT_DIRS', [str(tmp_path)])
+    with pytest.raises(FileNotFoundError, match='OPENCC_RS_DICT_DIR'):
+        PureOpenCC('s2t')
+
+
+def test_failed_load_raises_a_new_error_each_time(monkeypatch, tmp_path):
+    monkeypatch.setattr(opencc_rs, '_lib', None)
+    monkeypatch.setattr(opencc_rs, '_lib_error', None)
+    monkeypatch.setenv('OPENCC_RS_LIBRARY', str(tmp_path / 'missing.so'))
+    with pytest.raises(OSError) as first:
+        opencc_rs.load_library()
+    with pytest.raises(OSError) as second:
+        opencc_rs.load_library()
+    with pytest.raises(OSError) as third:
+        opencc_rs.load_library()
+    assert second.value is not third.value
+    assert second.value.__cause__ is third.value.__cause__ is first.value
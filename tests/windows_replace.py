@@ -0,0 +1,33 @@
+"""
+`python -m tests.windows_replace <module> <args>` runs `python -m <module> <args>` with os.replace refusing, as on
+Windows, to replace a file that the process still has open or mapped; `replace` is that os.replace.
+"""
+import os
+import runpy
+import sys
+
+_replace = os.replace
+
+
+def _open_files():
+    for fd in os.listdir('/proc/self/fd'):
+        try:
+            yield os.fstat(int(fd))
+        except OSError:
+            # The descriptor listdir itself used
+            pass
+
+
+def replace(src, dst):
+    if os.path.exists(dst):
+        target = os.stat(dst)
+        if any(os.path.samestat(st, target) for st in _open_files()):
+            raise PermissionError(13, "The process cannot access the file because it is being used by another "
+                                      "process", dst)
+    _replace(src, dst)
+
+
+if __name__ == '__main__':
+    os.replace = replace
+    del sys.argv[0]
+    runpy.run_module(sys.argv[0], run_name='__main__', alter_sys=True)
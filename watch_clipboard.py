@@ -0,0 +1,206 @@
+import argparse
+import functools
+import os
+import signal
+import sys
+import threading
+import time
+
+from clipboard_backends import ClipboardError, get_clipboard
+from opencc_rs import OpenCC
+from zho_helper import check_text_code, iter_convert
+
+# Seconds between clipboard checks right after a change ...
+MIN_INTERVAL = 0.2
+# ... backing off by this factor per unchanged check, up to MAX_INTERVAL, so an idle watcher barely wakes up
+BACKOFF = 1.5
+MAX_INTERVAL = 2.0
+# Seconds the clipboard must stay the same before it is converted, so rapid successive copies convert once
+DEBOUNCE = 0.3
+# Larger clipboard texts are left alone
+MAX_CHARS = 1 << 24
+
+
+@functools.lru_cache(maxsize=None)
+def get_converter(config):
+    # One converter per config for the watcher's lifetime, so its native instance is reused for every copy
+    return OpenCC(config)
+
+
+class ClipboardWatcher:
+    """
+    Converts each new clipboard text to the other script (zh-Hans to zh-Hant and back) and puts the result back.
+    Contents are compared by hash, so its own output and repeated copies of the same text are not processed again.
+    """
+
+    def __init__(self, backend, s2t_config="s2t", t2s_config="t2s", punctuation=False, debounce=DEBOUNCE,
+                 min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, max_chars=MAX_CHARS, log=None):
+        self.backend = backend
+        self.configs = {2: s2t_config, 1: t2s_config}
+        self.punctuation = punctuation
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.max_chars = max_chars
+        self.log = log or (lambda message: None)
+        self.interval = min_interval
+        self.conversions = 0
+        self._seen = None
+        self._last_count = None
+        # (hash, first seen) of a new text waiting out the debounce
+        self._pending = None
+
+    def start(self):
+        """Take the current clipboard as already seen, so only texts copied from now on are converted."""
+        try:
+            self._last_count = self.backend.change_count()
+            self._seen = hash(self.backend.get_text())
+        except ClipboardError as e:
+            # E.g. locked by another application; whatever the first successful poll reads counts as new
+            self.log(f"Error reading clipboard: {e}")
+            self._seen = None
+
+    def poll(self):
+        """Check the clipboard once, converting if due; returns the seconds to wait before the next check."""
+        count = self.backend.change_count()
+        if count is not None and count == self._last_count and self._pending is None:
+            # Nothing changed, and the backend could tell without reading the clipboard
+            return self._back_off()
+        try:
+            text = self.backend.get_text()
+        except ClipboardError as e:
+            self.log(f"Error reading clipboard: {e}")
+            return self._back_off()
+        self._last_count = count
+        digest = hash(text)
+        now = time.monotonic()
+
+        if digest == self._seen:
+            self._pending = None
+            return self._back_off()
+        if self._pending is None or self._pending[0] != digest:
+            self._pending = (digest, now)
+            self.interval = self.min_interval
+            return self.debounce
+        waited = now - self._pending[1]
+        if waited < self.debounce:
+            return self.debounce - waited
+
+        self._pending = None
+        self._seen = digest
+        self.interval = self.min_interval
+        self._convert(text)
+        return self.interval
+
+    def _back_off(self):
+        self.interval = min(self.max_interval, self.interval * BACKOFF)
+        return self.interval
+
+    def _convert(self, text):
+        if len(text) > self.max_chars:
+            self.log(f"Skipped {len(text):,} chars: over {self.max_chars:,}")
+            return
+        config = self.configs.get(check_text_code(text))
+        if config is None:
+            return
+        converted = "".join(iter_convert(get_converter(config), text, config if self.punctuation else None))
+        if converted == text:
+            return
+        try:
+            self.backend.set_text(converted)
+        except ClipboardError as e:
+            self.log(f"Error writing clipboard: {e}")
+            return
+        # Our own output must not count as a new copy
+        self._seen = hash(converted)
+        self._last_count = self.backend.change_count()
+        self.conversions += 1
+        self.log(f"Converted {len(text):,} chars ({config})")
+
+    def run(self, stop=None):
+        """Poll until `stop` (a threading.Event) is set, sleeping between checks."""
+        stop = stop or threading.Event()
+        self.start()
+        while not stop.wait(self.poll()):
+            pass
+
+    def run_tk(self, root):
+        """Poll from `root`'s event loop, which also hands text set through Tk to other applications, until Ctrl+C."""
+        def check():
+            root.after(max(1, round(self.poll() * 1000)), check)
+
+        # Tk reports exceptions raised in its callbacks instead of propagating them, KeyboardInterrupt included
+        previous = signal.signal(signal.SIGINT, lambda signum, frame: root.quit())
+        try:
+            self.start()
+            root.after(max(1, round(self.min_interval * 1000)), check)
+            root.mainloop()
+        finally:
+            signal.signal(signal.SIGINT, previous)
+
+
+def hidden_root():
+    """
+    A withdrawn Tk root for reading the X11 clipboard in process, or None where there is no X display, a faster
+    backend exists (Windows API, NSPasteboard change count, wl-paste --watch) or tkinter is missing.
+    """
+    if sys.platform in ("win32", "darwin") or os.environ.get("WAYLAND_DISPLAY") or not os.environ.get("DISPLAY"):
+        return None
+    try:
+        import tkinter
+    except ImportError:
+        return None
+    try:
+        root = tkinter.Tk()
+    except tkinter.TclError:
+        # E.g. the display cannot be opened
+        return None
+    root.withdraw()
+    return root
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+                                     description="Watch the clipboard and replace each copied zh-Hans text with its "
+                                                 "zh-Hant conversion, and zh-Hant with zh-Hans.")
+    parser.add_argument("-s", "--s2t-config", metavar="<conversion>", default="s2t",
+                        help="Conversion for zh-Hans text: [s2t|s2tw|s2twp|s2hk]")
+    parser.add_argument("-t", "--t2s-config", metavar="<conversion>", default="t2s",
+                        help="Conversion for zh-Hant text: [t2s|tw2s|tw2sp|hk2s]")
+    parser.add_argument("-p", "--punct", action="store_true", default=False,
+                        help="Convert quote punctuation too")
+    parser.add_argument("--debounce", metavar="<seconds>", type=float, default=DEBOUNCE,
+                        help="Time the clipboard must stay unchanged before converting")
+    parser.add_argument("--interval", metavar="<seconds>", type=float, default=MIN_INTERVAL,
+                        help="Time between checks after a change")
+    parser.add_argument("--max-interval", metavar="<seconds>", type=float, default=MAX_INTERVAL,
+                        help="Time between checks once the clipboard has been idle for a while")
+    parser.add_argument("--max-chars", metavar="<chars>", type=int, default=MAX_CHARS,
+                        help="Leave larger clipboard texts unconverted")
+    args = parser.parse_args(argv)
+
+    # xclip and xsel start a process for every read, so on X11 Tk reads the clipboard instead when it can
+    root = hidden_root()
+    try:
+        backend = get_clipboard(root)
+    except ClipboardError as e:
+        print(e, file=sys.stderr)
+        return 1
+    watcher = ClipboardWatcher(backend, args.s2t_config, args.t2s_config, args.punct, args.debounce, args.interval,
+                               args.max_interval, args.max_chars, log=lambda message: print(message, file=sys.stderr))
+    print(f"Watching the clipboard ({backend.name}); Ctrl+C to stop", file=sys.stderr)
+    try:
+        if root is not None:
+            watcher.run_tk(root)
+        else:
+            watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        backend.close()
+    print(f"{watcher.conversions} conversions", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
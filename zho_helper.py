@@ -1,38 +1,296 @@
+import codecs
+import collections
+import functools
+import io
+import queue
 import re
+import threading
 from opencc_rs import OpenCC
+from opencc_rs.chunking import split_safe
+from opencc_rs.subtitles import iter_convert_subtitles
 
+# Shared for the process lifetime, so each check reuses the same native instances
+_t2s_converter = OpenCC("t2s")
+_s2t_converter = OpenCC("s2t")
 
-def check_text_code(text):
+# CJK Unified Ideographs and Extension A, where the Hans/Hant distinction lives
+_CJK_RANGES = ((0x3400, 0x4DBF), (0x4E00, 0x9FFF))
+# Bounded runs, so a long unbroken CJK passage cannot defeat the early stop
+_CJK_RUN = re.compile('[\u3400-\u4dbf\u4e00-\u9fff]{1,256}')
+# Stop once this many script-specific characters were seen
+DETECT_SAMPLE_SIZE = 30
+# ... or this many CJK characters in total, when most are common to both scripts
+DETECT_MAX_SCAN = 4096
+# Fewer script-specific characters than this lowers the confidence proportionally
+_MIN_EVIDENCE = 8
+
+_script_tables = None
+_script_tables_lock = threading.Lock()
+
+
+def _get_script_tables():
+    """(Hant-only, Hans-only) character sets, built once from the converters on first use."""
+    global _script_tables
+    if _script_tables is None:
+        with _script_tables_lock:
+            if _script_tables is None:
+                chars = [chr(c) for low, high in _CJK_RANGES for c in range(low, high + 1)]
+                # One native call per direction; the batch separator keeps characters from forming phrases
+                to_hans = _t2s_converter.convert_many(chars, batch_size=len(chars))
+                to_hant = _s2t_converter.convert_many(chars, batch_size=len(chars))
+                hant_only = {c for c, converted in zip(chars, to_hans) if converted != c}
+                hans_only = {c for c, converted in zip(chars, to_hant) if converted != c}
+                both = hant_only & hans_only
+                _script_tables = frozenset(hant_only - both), frozenset(hans_only - both)
+    return _script_tables
+
+
+def detect_script(text, sample_size=DETECT_SAMPLE_SIZE, max_scan=DETECT_MAX_SCAN):
+    """Return (code, confidence): code 1 is zh-Hant, 2 zh-Hans, 0 other; stops scanning once sure enough."""
     if not text:
-        return 0
-    # return OpenCC().zho_check(text)
-    strip_text = re.sub(r'[\WA-Za-z0-9_]', "", text)
-    test_text = strip_text if len(strip_text) < 30 else strip_text[0:30]
-    if test_text != OpenCC("t2s").convert(test_text):
-        return 1
-    else:
-        if test_text != OpenCC("s2t").convert(test_text):
-            return 2
-        else:
-            return 0
+        return 0, 0.0
+    hant_only, hans_only = _get_script_tables()
+    hant = hans = scanned = 0
+    for match in _CJK_RUN.finditer(text):
+        for char in match.group():
+            if char in hant_only:
+                hant += 1
+            elif char in hans_only:
+                hans += 1
+        scanned += len(match.group())
+        if hant + hans >= sample_size or scanned >= max_scan:
+            break
+    evidence = hant + hans
+    if evidence == 0:
+        return 0, 0.0
+    code = 1 if hant >= hans else 2
+    confidence = max(hant, hans) / evidence * min(1.0, evidence / _MIN_EVIDENCE)
+    return code, confidence
+
+
+def check_text_code(text):
+    return detect_script(text)[0]
+
+
+# Quote and bracket punctuation per conversion direction, keyed by the config's first letter; the curly quote pairs
+# are the native library's whole table, the corner bracket forms beyond them apply to the GUIs only
+PUNCTUATION_MAPS = {
+    "s": {
+        '“': '「', '”': '」', '‘': '『', '’': '』',
+    },
+    "t": {
+        '「': '“', '」': '”', '『': '‘', '』': '’',
+        # Vertical and halfwidth forms of the corner brackets
+        '﹁': '“', '﹂': '”', '﹃': '‘', '﹄': '’',
+        '｢': '“', '｣': '”',
+    },
+}
+
+# Characters per chunk when conversion and punctuation run in one pass
+CONVERT_CHUNK_SIZE = 1 << 18
+# Bytes per read when loading a file in the background
+READ_BLOCK_SIZE = 1 << 22
+# Converted lines remembered by a LiveConverter
+LIVE_CACHE_SIZE = 1 << 14
+
+
+def _replace_each(text, pairs):
+    for old, new in pairs:
+        text = text.replace(old, new)
+    return text
+
+
+@functools.lru_cache(maxsize=None)
+def compile_punctuation(config):
+    """Text -> text function for the punctuation direction of `config`, compiled once per direction."""
+    mapping = PUNCTUATION_MAPS["s" if config[0] == "s" else "t"]
+    table = str.maketrans(mapping)
+    if any(key in value for value in mapping.values() for key in mapping):
+        # Replacements feed into other keys, so only a single simultaneous pass is correct
+        return lambda text: text.translate(table)
+    # Otherwise chained str.replace is equivalent, and much faster than translate on non-ASCII text
+    pairs = tuple(mapping.items())
+    return lambda text: _replace_each(text, pairs)
+
+
+def add_punctuation(direction, mapping):
+    """Extend PUNCTUATION_MAPS[direction] ("s" or "t") and drop the compiled functions."""
+    PUNCTUATION_MAPS[direction].update(mapping)
+    compile_punctuation.cache_clear()
 
 
 def convert_punctuation(input_text, config):
-    # Declare a dictionary to store the characters and their mappings
-    s2t_punctuation = {
-        '“': '「',
-        '”': '」',
-        '‘': '『',
-        '’': '』'
-    }
-    if config[0] == "s":
-        mapping = s2t_punctuation
-    else:
-        mapping = {v: k for k, v in s2t_punctuation.items()}
-
-    # Correct and safe way to build the pattern:
-    escaped_chars = [re.escape(char) for char in mapping.keys()]
-    pattern = f"[{''.join(escaped_chars)}]"
-
-    output_text = re.sub(pattern, lambda m: mapping[m.group(0)], input_text)
-    return output_text
+    return compile_punctuation(config)(input_text)
+
+
+def iter_convert_chunks(converter, text, punctuation_config=None, chunk_size=CONVERT_CHUNK_SIZE):
+    """
+    Yield (input chars consumed, output) for `text` converted in chunks cut at safe boundaries, with punctuation
+    (for `punctuation_config`) applied to each chunk right after its conversion instead of in a second pass.
+    """
+    punctuate = compile_punctuation(punctuation_config) if punctuation_config else None
+    for chunk in split_safe(text, max(1, len(text) // chunk_size)):
+        output = converter.convert(chunk)
+        yield len(chunk), punctuate(output) if punctuate is not None else output
+
+
+def iter_convert(converter, text, punctuation_config=None, chunk_size=CONVERT_CHUNK_SIZE):
+    """Yield the converted chunks of `text`, see iter_convert_chunks."""
+    for _, output in iter_convert_chunks(converter, text, punctuation_config, chunk_size):
+        yield output
+
+
+def iter_convert_subtitle_chunks(converter, text, fmt, punctuation=False):
+    """Yield (input chars consumed, output) for subtitle file contents, converting only the dialogue text."""
+    consumed = 0
+
+    def lines():
+        nonlocal consumed
+        for line in io.StringIO(text, newline=""):
+            consumed += len(line)
+            yield line
+
+    reported = 0
+    for output in iter_convert_subtitles(converter, lines(), fmt, punctuation):
+        yield consumed - reported, output
+        reported = consumed
+
+
+def iter_cut_chunks(segmentor, text, delimiter="/", chunk_size=CONVERT_CHUNK_SIZE):
+    """Yield (input chars consumed, output) for jieba segmentation of `text`, joining all tokens by `delimiter`."""
+    first = True
+    for chunk in split_safe(text, max(1, len(text) // chunk_size)):
+        output = delimiter.join(segmentor.jieba_cut(chunk))
+        yield len(chunk), output if first else delimiter + output
+        first = False
+
+
+def line_converter(converter, punctuation_config=None):
+    """Lines -> converted lines in one convert_many call, with punctuation; for LiveConverter."""
+    punctuate = compile_punctuation(punctuation_config) if punctuation_config else None
+
+    def convert_lines(lines):
+        output = converter.convert_many(lines)
+        return [punctuate(line) for line in output] if punctuate is not None else output
+
+    return convert_lines
+
+
+def line_segmenter(segmentor, delimiter="/"):
+    """Lines -> jieba-segmented lines, tokens joined by `delimiter`; for LiveConverter."""
+    return lambda lines: [delimiter.join(segmentor.jieba_cut(line)) if line else line for line in lines]
+
+
+def iter_read_chunks(path, encoding="utf-8", block_size=READ_BLOCK_SIZE):
+    """
+    Yield (bytes consumed, text) for the file at `path` read in blocks, decoded incrementally with universal
+    newlines like open() in text mode, so a ConversionTask can load it with progress by file size.
+    """
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(), translate=True)
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                yield 0, decoder.decode(b"", final=True)
+                return
+            yield len(block), decoder.decode(block)
+
+
+class ConversionTask:
+    """
+    Runs a chunk generator such as iter_convert_chunks on a worker thread, so a GUI stays responsive.
+    The GUI thread calls poll() periodically (e.g. from Tk's after()) to collect its messages.
+    """
+
+    def __init__(self, chunks, total):
+        self.total = max(1, total)
+        self._messages = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(chunks,), daemon=True)
+        self._thread.start()
+
+    def _run(self, chunks):
+        parts = []
+        done = 0
+        try:
+            for consumed, output in chunks:
+                if self._cancel.is_set():
+                    self._messages.put(("cancelled", None))
+                    return
+                parts.append(output)
+                done += consumed
+                self._messages.put(("progress", done / self.total))
+            self._messages.put(("done", "".join(parts)))
+        except Exception as e:
+            self._messages.put(("error", e))
+
+    def cancel(self):
+        # Takes effect after the chunk in progress, since a native call cannot be interrupted
+        self._cancel.set()
+
+    def poll(self):
+        """
+        Return the messages since the last poll: ("progress", fraction) per chunk, then one of ("done", text),
+        ("cancelled", None) or ("error", exception).
+        """
+        messages = []
+        while True:
+            try:
+                messages.append(self._messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+
+class LiveConverter:
+    """
+    Converted lines of a text being edited: update() converts only the lines that changed since the previous
+    call, looking up unchanged content in a per-line cache, and says which output lines to replace.
+    """
+
+    def __init__(self, convert_lines, cache_size=LIVE_CACHE_SIZE):
+        # convert_lines maps a list of lines to the list of their conversions, e.g. in one convert_many call
+        self._convert_lines = convert_lines
+        self._cache = collections.OrderedDict()
+        self._cache_size = cache_size
+        self.source = []
+        self.output = []
+
+    def update(self, text):
+        """
+        Return (start, stop, lines): output lines [start, stop) of the previous call are to be replaced by `lines`.
+        Both ranges are non-empty, so the replacement never has to add or remove a line separator by itself.
+        """
+        old, new = self.source, text.split("\n")
+        start = 0
+        limit = min(len(old), len(new))
+        while start < limit and old[start] == new[start]:
+            start += 1
+        old_stop, new_stop = len(old), len(new)
+        while old_stop > start and new_stop > start and old[old_stop - 1] == new[new_stop - 1]:
+            old_stop -= 1
+            new_stop -= 1
+        if old and (start == old_stop or start == new_stop):
+            # Pure insertion or deletion of lines: widen to a neighbouring unchanged line
+            if start > 0:
+                start -= 1
+            else:
+                old_stop += 1
+                new_stop += 1
+
+        lines = self._convert_cached(new[start:new_stop])
+        self.output[start:old_stop] = lines
+        self.source = new
+        return start, old_stop, lines
+
+    def _convert_cached(self, lines):
+        cache = self._cache
+        missing = list(dict.fromkeys(line for line in lines if line not in cache))
+        if missing:
+            cache.update(zip(missing, self._convert_lines(missing)))
+        result = []
+        for line in lines:
+            cache.move_to_end(line)
+            result.append(cache[line])
+        while len(cache) > self._cache_size:
+            cache.popitem(last=False)
+        return result